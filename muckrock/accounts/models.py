@@ -28,6 +28,7 @@ from phonenumber_field.modelfields import PhoneNumberField
 
 # MuckRock
 from muckrock.accounts.querysets import ProfileQuerySet
+from muckrock.core.models import LoadedValuesMixin
 from muckrock.core.utils import cache_get_or_set, squarelet_get, stripe_retry_on_error
 from muckrock.organization.models import Organization
 
@@ -48,7 +49,7 @@ ACCT_TYPES = [
 PAYMENT_FEE = 0.05
 
 
-class Profile(models.Model):
+class Profile(LoadedValuesMixin, models.Model):
     """User profile information for muckrock"""
 
     objects = ProfileQuerySet.as_manager()
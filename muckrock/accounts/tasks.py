@@ -7,12 +7,14 @@ from celery import shared_task
 from celery.exceptions import SoftTimeLimitExceeded
 from django.contrib.auth.models import User
 from django.core.management import call_command
-from django.db.models import Count, F, Sum
+from django.db.models import Count, DurationField, Exists, F, OuterRef, Q, Sum
+from django.db.models.functions import Cast, Now
 from django.utils import timezone
 
 # Standard Library
 import logging
 from datetime import date, datetime, time, timedelta
+from time import perf_counter
 
 # MuckRock
 from muckrock.accounts.mail import PermissionsDigest
@@ -21,10 +23,13 @@ from muckrock.accounts.utils import mailchimp_donor_tag
 from muckrock.agency.models import Agency
 from muckrock.communication.models import (
     EmailCommunication,
+    EmailOpen,
     FaxCommunication,
     MailCommunication,
+    MailEvent,
     PortalCommunication,
 )
+from muckrock.core.models import ExtractDay
 from muckrock.crowdfund.models import Crowdfund, CrowdfundPayment
 from muckrock.crowdsource.models import Crowdsource, CrowdsourceResponse
 from muckrock.foia.models import FOIACommunication, FOIAComposer, FOIAFile, FOIARequest
@@ -32,535 +37,431 @@ from muckrock.foiamachine.models import FoiaMachineRequest
 from muckrock.jurisdiction.models import ExampleAppeal, Exemption, InvokedExemption
 from muckrock.news.models import Article
 from muckrock.project.models import Project
-from muckrock.task.models import (
-    CrowdfundTask,
-    FailedFaxTask,
-    FlaggedTask,
-    NewAgencyTask,
-    OrphanTask,
-    PortalTask,
-    RejectedEmailTask,
-    ResponseTask,
-    ReviewAgencyTask,
-    SnailMailTask,
-    Task,
-)
+from muckrock.task.models import Task
 
 logger = logging.getLogger(__name__)
 
 
-@shared_task
-def store_statistics():
-    """Store the daily statistics"""
-    # pylint: disable=too-many-statements
+# statuses recorded for both requests and FOIA machine requests
+REQUEST_STATUSES = [
+    ("success", "done"),
+    ("denied", "rejected"),
+    ("submitted", "submitted"),
+    ("awaiting_ack", "ack"),
+    ("awaiting_response", "processed"),
+    ("awaiting_appeal", "appealing"),
+    ("fix_required", "fix"),
+    ("payment_required", "payment"),
+    ("no_docs", "no_docs"),
+    ("partial", "partial"),
+    ("abandoned", "abandoned"),
+    ("consolidated", "consolidated"),
+    ("lawsuit", "lawsuit"),
+]
 
-    cutoff_time = time(hour=7, tzinfo=timezone.get_current_timezone())
-    today_time = datetime.combine(date.today(), cutoff_time)
-    yesterday = date.today() - timedelta(1)
-    yesterday_time = today_time - timedelta(1)
+# entitlement slugs broken out in the statistics
+ENTITLEMENTS = [
+    ("pro", "professional"),
+    ("basic", "free"),
+    ("beta", "beta"),
+    ("proxy", "proxy"),
+    ("admin", "admin"),
+]
 
-    kwargs = {}
-    kwargs["date"] = yesterday
-    kwargs["total_requests"] = FOIARequest.objects.count()
-    kwargs["total_requests_success"] = FOIARequest.objects.filter(status="done").count()
-    kwargs["total_requests_denied"] = FOIARequest.objects.filter(
-        status="rejected"
-    ).count()
-    kwargs["total_requests_draft"] = 0  # draft is no longer a valid status
-    kwargs["total_requests_submitted"] = FOIARequest.objects.filter(
-        status="submitted"
-    ).count()
-    kwargs["total_requests_awaiting_ack"] = FOIARequest.objects.filter(
-        status="ack"
-    ).count()
-    kwargs["total_requests_awaiting_response"] = FOIARequest.objects.filter(
-        status="processed"
-    ).count()
-    kwargs["total_requests_awaiting_appeal"] = FOIARequest.objects.filter(
-        status="appealing"
-    ).count()
-    kwargs["total_requests_fix_required"] = FOIARequest.objects.filter(
-        status="fix"
-    ).count()
-    kwargs["total_requests_payment_required"] = FOIARequest.objects.filter(
-        status="payment"
-    ).count()
-    kwargs["total_requests_no_docs"] = FOIARequest.objects.filter(
-        status="no_docs"
-    ).count()
-    kwargs["total_requests_partial"] = FOIARequest.objects.filter(
-        status="partial"
-    ).count()
-    kwargs["total_requests_abandoned"] = FOIARequest.objects.filter(
-        status="abandoned"
-    ).count()
-    kwargs["total_requests_consolidated"] = FOIARequest.objects.filter(
-        status="consolidated"
-    ).count()
-    kwargs["total_requests_lawsuit"] = FOIARequest.objects.filter(
-        status="lawsuit"
-    ).count()
-    kwargs["requests_processing_days"] = FOIARequest.objects.get_processing_days()
-    kwargs["total_composers"] = FOIAComposer.objects.count()
-    kwargs["total_composers_draft"] = FOIAComposer.objects.filter(
-        status="started"
-    ).count()
-    kwargs["total_composers_submitted"] = FOIAComposer.objects.filter(
-        status="submitted"
-    ).count()
-    kwargs["total_composers_filed"] = FOIAComposer.objects.filter(
-        status="filed"
-    ).count()
-    kwargs["sent_communications_portal"] = PortalCommunication.objects.filter(
-        communication__datetime__range=(yesterday_time, today_time),
-        communication__response=False,
-    ).count()
-    kwargs["sent_communications_email"] = EmailCommunication.objects.filter(
-        communication__datetime__range=(yesterday_time, today_time),
-        communication__response=False,
-    ).count()
-    kwargs["sent_communications_fax"] = FaxCommunication.objects.filter(
-        communication__datetime__range=(yesterday_time, today_time),
-        communication__response=False,
-    ).count()
-    kwargs["sent_communications_mail"] = MailCommunication.objects.filter(
-        communication__datetime__range=(yesterday_time, today_time),
-        communication__response=False,
-    ).count()
+# task types with a related name on the base task model
+TASK_TYPES = [
+    ("orphan", "orphantask"),
+    ("snailmail", "snailmailtask"),
+    ("rejected", "rejectedemailtask"),
+    ("flagged", "flaggedtask"),
+    ("newagency", "newagencytask"),
+    ("response", "responsetask"),
+    ("faxfail", "failedfaxtask"),
+    ("crowdfundpayment", "crowdfundtask"),
+    ("reviewagency", "reviewagencytask"),
+    ("portal", "portaltask"),
+]
 
-    range_max = 7
-    range_min = 0
-    for weekly, range_min, range_max in [("weekly", 0, 7), ("weekly2", 7, 14)]:
-        kwargs[f"email_communications_{weekly}_total"] = (
-            EmailCommunication.objects.filter(
-                communication__response=False,
-                sent_datetime__gt=timezone.now() - timedelta(days=range_max),
-                sent_datetime__lt=timezone.now() - timedelta(days=range_min),
-            ).count()
-        )
-        kwargs[f"email_communications_{weekly}_confirmed"] = (
-            EmailCommunication.objects.filter(
-                communication__response=False,
-                sent_datetime__gt=timezone.now() - timedelta(days=range_max),
-                sent_datetime__lt=timezone.now() - timedelta(days=range_min),
-            )
-            .exclude(opens=None)
-            .count()
-        )
-        kwargs[f"fax_communications_{weekly}_total"] = FaxCommunication.objects.filter(
-            sent_datetime__gt=timezone.now() - timedelta(days=range_max),
-            sent_datetime__lt=timezone.now() - timedelta(days=range_min),
-        ).count()
-        kwargs[f"fax_communications_{weekly}_confirmed"] = (
-            FaxCommunication.objects.filter(
-                sent_datetime__gt=timezone.now() - timedelta(days=range_max),
-                sent_datetime__lt=timezone.now() - timedelta(days=range_min),
-            )
-            .exclude(confirmed_datetime=None)
-            .count()
-        )
-        kwargs[f"mail_communications_{weekly}_total"] = (
-            MailCommunication.objects.filter(
-                communication__response=False,
-                sent_datetime__gt=timezone.now() - timedelta(days=range_max),
-                sent_datetime__lt=timezone.now() - timedelta(days=range_min),
-            ).count()
+# crowdfund percentage funded buckets, (name, lower bound, upper bound)
+CROWDFUND_BUCKETS = [
+    ("0_25", 0, 0.25),
+    ("25_50", 0.25, 0.50),
+    ("50_75", 0.50, 0.75),
+    ("75_100", 0.75, 1.00),
+    ("100_125", 1.00, 1.25),
+    ("125_150", 1.25, 1.50),
+    ("150_175", 1.50, 1.75),
+    ("175_200", 1.75, 2.00),
+]
+
+
+class StatisticsTimer:
+    """Time the statistics queries for each table"""
+
+    def __init__(self):
+        self.timings = {}
+
+    def __call__(self, name, func):
+        start = perf_counter()
+        result = func()
+        self.timings[name] = self.timings.get(name, 0) + perf_counter() - start
+        return result
+
+    def log(self):
+        """Log the timing breakdown"""
+        logger.info(
+            "Statistics computed in %.2fs: %s",
+            sum(self.timings.values()),
+            ", ".join(
+                f"{name} {seconds:.2f}s"
+                for name, seconds in sorted(
+                    self.timings.items(), key=lambda t: t[1], reverse=True
+                )
+            ),
         )
-        kwargs[f"mail_communications_{weekly}_confirmed"] = (
-            MailCommunication.objects.filter(
-                communication__response=False,
-                sent_datetime__gt=timezone.now() - timedelta(days=range_max),
-                sent_datetime__lt=timezone.now() - timedelta(days=range_min),
-                events__event__endswith=".processed_for_delivery",
+
+
+def _request_stats(yesterday_time, today_time):
+    """Statistics for FOIA requests, computed in a single pass over the table"""
+    stats = FOIARequest.objects.aggregate(
+        total_requests=Count("pk"),
+        total_fees=Sum("price"),
+        requests_processing_days=ExtractDay(
+            Sum(
+                date.today() - F("date_processing"),
+                filter=Q(status="submitted", date_processing__isnull=False),
             )
-            .distinct()
-            .count()
-        )
+        ),
+        **{
+            f"total_requests_{name}": Count("pk", filter=Q(status=status))
+            for name, status in REQUEST_STATUSES
+        },
+    )
+    stats["total_requests_draft"] = 0  # draft is no longer a valid status
 
-    kwargs["machine_requests"] = FoiaMachineRequest.objects.count()
-    kwargs["machine_requests_success"] = FoiaMachineRequest.objects.filter(
-        status="done"
-    ).count()
-    kwargs["machine_requests_denied"] = FoiaMachineRequest.objects.filter(
-        status="rejected"
-    ).count()
-    kwargs["machine_requests_draft"] = FoiaMachineRequest.objects.filter(
-        status="started"
-    ).count()
-    kwargs["machine_requests_submitted"] = FoiaMachineRequest.objects.filter(
-        status="submitted"
-    ).count()
-    kwargs["machine_requests_awaiting_ack"] = FoiaMachineRequest.objects.filter(
-        status="ack"
-    ).count()
-    kwargs["machine_requests_awaiting_response"] = FoiaMachineRequest.objects.filter(
-        status="processed"
-    ).count()
-    kwargs["machine_requests_awaiting_appeal"] = FoiaMachineRequest.objects.filter(
-        status="appealing"
-    ).count()
-    kwargs["machine_requests_fix_required"] = FoiaMachineRequest.objects.filter(
-        status="fix"
-    ).count()
-    kwargs["machine_requests_payment_required"] = FoiaMachineRequest.objects.filter(
-        status="payment"
-    ).count()
-    kwargs["machine_requests_no_docs"] = FoiaMachineRequest.objects.filter(
-        status="no_docs"
-    ).count()
-    kwargs["machine_requests_partial"] = FoiaMachineRequest.objects.filter(
-        status="partial"
-    ).count()
-    kwargs["machine_requests_abandoned"] = FoiaMachineRequest.objects.filter(
-        status="abandoned"
-    ).count()
-    kwargs["machine_requests_consolidated"] = FoiaMachineRequest.objects.filter(
-        status="consolidated"
-    ).count()
-    kwargs["machine_requests_lawsuit"] = FoiaMachineRequest.objects.filter(
-        status="lawsuit"
-    ).count()
-    kwargs["total_pages"] = FOIAFile.objects.aggregate(Sum("pages"))["pages__sum"]
-    # user stats will now be kept on squarelet
-    kwargs["total_users"] = 0
-    kwargs["total_users_excluding_agencies"] = 0
-    kwargs["total_users_filed"] = (
-        User.objects.annotate(num_foia=Count("composers")).exclude(num_foia=0).count()
-    )  # this is still on muckrock since it deals with foia composers
-    kwargs["total_agencies"] = Agency.objects.count()
-    kwargs["total_fees"] = FOIARequest.objects.aggregate(Sum("price"))["price__sum"]
-    kwargs["pro_users"] = 0  # squarelet
-    kwargs["pro_user_names"] = ""  # squarelet
-    kwargs["daily_requests_pro"] = (
-        FOIARequest.objects.filter(
-            composer__organization__entitlement__slug="professional"
+    daily = (
+        FOIARequest.objects.get_submitted_range(yesterday_time, today_time)
+        .order_by()
+        .values_list(
+            "composer__organization__entitlement__slug",
+            "composer__organization__individual",
         )
-        .get_submitted_range(yesterday_time, today_time)
-        .exclude_org_users()
-        .count()
+        .annotate(count=Count("pk"))
     )
-    kwargs["daily_requests_basic"] = (
-        FOIARequest.objects.filter(composer__organization__entitlement__slug="free")
-        .get_submitted_range(yesterday_time, today_time)
-        .exclude_org_users()
-        .count()
-    )
-    kwargs["daily_requests_beta"] = (
-        FOIARequest.objects.filter(composer__organization__entitlement__slug="beta")
-        .get_submitted_range(yesterday_time, today_time)
-        .exclude_org_users()
-        .count()
-    )
-    kwargs["daily_requests_proxy"] = (
-        FOIARequest.objects.filter(composer__organization__entitlement__slug="proxy")
-        .get_submitted_range(yesterday_time, today_time)
-        .exclude_org_users()
-        .count()
+    slugs = [slug for _, slug in ENTITLEMENTS] + ["organization"]
+    for name, slug in ENTITLEMENTS:
+        stats[f"daily_requests_{name}"] = sum(
+            count for slug_, individual, count in daily if slug_ == slug and individual
+        )
+    stats["daily_requests_org"] = sum(
+        count for slug, _, count in daily if slug == "organization"
     )
-    kwargs["daily_requests_admin"] = (
-        FOIARequest.objects.filter(composer__organization__entitlement__slug="admin")
-        .get_submitted_range(yesterday_time, today_time)
-        .exclude_org_users()
-        .count()
+    stats["daily_requests_other"] = sum(
+        count for slug, _, count in daily if slug not in slugs
     )
-    kwargs["daily_requests_org"] = (
-        FOIARequest.objects.filter(
-            composer__organization__entitlement__slug="organization"
+    return stats
+
+
+def _weekly_communication_stats(kind, confirmed, outgoing_only):
+    """Counts of a type of communication sent in each of the past two weeks,
+    in total and confirmed delivered"""
+    now = timezone.now()
+    stats = {}
+    for weekly, range_min, range_max in [("weekly", 0, 7), ("weekly2", 7, 14)]:
+        sent = Q(
+            sent_datetime__gt=now - timedelta(days=range_max),
+            sent_datetime__lt=now - timedelta(days=range_min),
         )
-        .get_submitted_range(yesterday_time, today_time)
-        .count()
-    )
-    kwargs["daily_requests_other"] = (
-        FOIARequest.objects.exclude(
-            composer__organization__entitlement__slug__in=[
-                "professional",
-                "free",
-                "beta",
-                "proxy",
-                "admin",
-                "organization",
-            ]
+        if outgoing_only:
+            sent &= Q(communication__response=False)
+        stats[f"{kind}_communications_{weekly}_total"] = Count("pk", filter=sent)
+        stats[f"{kind}_communications_{weekly}_confirmed"] = Count(
+            "pk", filter=sent & Q(confirmed)
         )
-        .get_submitted_range(yesterday_time, today_time)
-        .count()
-    )
-    kwargs["daily_articles"] = Article.objects.filter(
-        pub_date__range=(yesterday_time, today_time)
-    ).count()
-    kwargs["orphaned_communications"] = FOIACommunication.objects.filter(
-        foia=None
-    ).count()
-    kwargs["stale_agencies"] = 0  # stake agencies no longer exist
-    kwargs["unapproved_agencies"] = Agency.objects.filter(status="pending").count()
-    kwargs["portal_agencies"] = Agency.objects.exclude(portal=None).count()
-    kwargs["total_tasks"] = Task.objects.count()
-    kwargs["total_unresolved_tasks"] = (
-        Task.objects.filter(resolved=False).get_undeferred().count()
-    )
-    kwargs["total_deferred_tasks"] = Task.objects.get_deferred().count()
-    # we no longer use generic tasks
-    kwargs["total_generic_tasks"] = 0
-    kwargs["total_unresolved_generic_tasks"] = 0
-    kwargs["total_deferred_generic_tasks"] = 0
-    kwargs["total_orphan_tasks"] = OrphanTask.objects.count()
-    kwargs["total_unresolved_orphan_tasks"] = (
-        OrphanTask.objects.filter(resolved=False).get_undeferred().count()
-    )
-    kwargs["total_deferred_orphan_tasks"] = OrphanTask.objects.get_deferred().count()
-    kwargs["total_snailmail_tasks"] = SnailMailTask.objects.count()
-    kwargs["total_unresolved_snailmail_tasks"] = (
-        SnailMailTask.objects.filter(resolved=False).get_undeferred().count()
-    )
-    kwargs["total_deferred_snailmail_tasks"] = (
-        SnailMailTask.objects.get_deferred().count()
-    )
-    kwargs["total_rejected_tasks"] = RejectedEmailTask.objects.count()
-    kwargs["total_unresolved_rejected_tasks"] = (
-        RejectedEmailTask.objects.filter(resolved=False).get_undeferred().count()
-    )
-    kwargs["total_deferred_rejected_tasks"] = (
-        RejectedEmailTask.objects.get_deferred().count()
-    )
-    kwargs["total_staleagency_tasks"] = 0
-    kwargs["total_unresolved_staleagency_tasks"] = 0
-    kwargs["total_deferred_staleagency_tasks"] = 0
-    kwargs["total_flagged_tasks"] = FlaggedTask.objects.count()
-    kwargs["total_unresolved_flagged_tasks"] = (
-        FlaggedTask.objects.filter(resolved=False).get_undeferred().count()
-    )
-    kwargs["total_deferred_flagged_tasks"] = FlaggedTask.objects.get_deferred().count()
-    kwargs["total_newagency_tasks"] = NewAgencyTask.objects.count()
-    kwargs["total_unresolved_newagency_tasks"] = (
-        NewAgencyTask.objects.filter(resolved=False).get_undeferred().count()
-    )
-    kwargs["total_deferred_newagency_tasks"] = (
-        NewAgencyTask.objects.get_deferred().count()
-    )
-    kwargs["total_response_tasks"] = ResponseTask.objects.count()
-    kwargs["total_unresolved_response_tasks"] = (
-        ResponseTask.objects.filter(resolved=False).get_undeferred().count()
-    )
-    kwargs["total_deferred_response_tasks"] = (
-        ResponseTask.objects.get_deferred().count()
-    )
-    kwargs["total_faxfail_tasks"] = FailedFaxTask.objects.count()
-    kwargs["total_unresolved_faxfail_tasks"] = (
-        FailedFaxTask.objects.filter(resolved=False).get_undeferred().count()
-    )
-    kwargs["total_deferred_faxfail_tasks"] = (
-        FailedFaxTask.objects.get_deferred().count()
-    )
-    kwargs["total_crowdfundpayment_tasks"] = CrowdfundTask.objects.count()
-    kwargs["total_unresolved_crowdfundpayment_tasks"] = (
-        CrowdfundTask.objects.filter(resolved=False).get_undeferred().count()
-    )
-    kwargs["total_deferred_crowdfundpayment_tasks"] = (
-        CrowdfundTask.objects.get_deferred().count()
-    )
-    kwargs["total_reviewagency_tasks"] = ReviewAgencyTask.objects.count()
-    kwargs["total_unresolved_reviewagency_tasks"] = (
-        ReviewAgencyTask.objects.filter(resolved=False).get_undeferred().count()
-    )
-    kwargs["total_deferred_reviewagency_tasks"] = (
-        ReviewAgencyTask.objects.get_deferred().count()
-    )
-    kwargs["total_portal_tasks"] = PortalTask.objects.count()
-    kwargs["total_unresolved_portal_tasks"] = (
-        PortalTask.objects.filter(resolved=False).get_undeferred().count()
-    )
-    kwargs["total_deferred_portal_tasks"] = PortalTask.objects.get_deferred().count()
-    kwargs["daily_robot_response_tasks"] = ResponseTask.objects.filter(
-        date_done__gte=yesterday_time,
-        date_done__lt=today_time,
-        resolved_by__username="gloo",
-    ).count()
-    kwargs["flag_processing_days"] = FlaggedTask.objects.get_processing_days()
-    kwargs["unresolved_snailmail_appeals"] = (
-        SnailMailTask.objects.filter(resolved=False, category="a")
-        .get_undeferred()
-        .count()
-    )
-    # squarelet
-    kwargs["total_active_org_members"] = 0
-    kwargs["total_active_orgs"] = 0
-    kwargs["total_crowdfunds"] = Crowdfund.objects.count()
-    kwargs["total_crowdfunds_pro"] = Crowdfund.objects.filter_by_entitlement(
-        "professional"
-    ).count()
-    kwargs["total_crowdfunds_basic"] = Crowdfund.objects.filter_by_entitlement(
-        "free"
-    ).count()
-    kwargs["total_crowdfunds_beta"] = Crowdfund.objects.filter_by_entitlement(
-        "beta"
-    ).count()
-    kwargs["total_crowdfunds_proxy"] = Crowdfund.objects.filter_by_entitlement(
-        "proxy"
-    ).count()
-    kwargs["total_crowdfunds_admin"] = Crowdfund.objects.filter_by_entitlement(
-        "admin"
-    ).count()
-    kwargs["open_crowdfunds"] = Crowdfund.objects.filter(closed=False).count()
-    kwargs["open_crowdfunds_pro"] = (
-        Crowdfund.objects.filter_by_entitlement("professional")
-        .filter(closed=False)
-        .count()
-    )
-    kwargs["open_crowdfunds_basic"] = (
-        Crowdfund.objects.filter_by_entitlement("free").filter(closed=False).count()
-    )
-    kwargs["open_crowdfunds_beta"] = (
-        Crowdfund.objects.filter_by_entitlement("beta").filter(closed=False).count()
-    )
-    kwargs["open_crowdfunds_proxy"] = (
-        Crowdfund.objects.filter_by_entitlement("proxy").filter(closed=False).count()
-    )
-    kwargs["open_crowdfunds_admin"] = (
-        Crowdfund.objects.filter_by_entitlement("admin").filter(closed=False).count()
+    return stats
+
+
+def _communication_stats(yesterday_time, today_time):
+    """Statistics for each communication type, one query per type"""
+    sent_yesterday = Q(
+        communication__datetime__range=(yesterday_time, today_time),
+        communication__response=False,
     )
-    kwargs["closed_crowdfunds_0"] = (
-        Crowdfund.objects.annotate(
-            percent=F("payment_received") / F("payment_required")
+    stats = PortalCommunication.objects.aggregate(
+        sent_communications_portal=Count("pk", filter=sent_yesterday)
+    )
+    stats.update(
+        EmailCommunication.objects.aggregate(
+            sent_communications_email=Count("pk", filter=sent_yesterday),
+            **_weekly_communication_stats(
+                "email",
+                Exists(EmailOpen.objects.filter(email=OuterRef("pk"))),
+                outgoing_only=True,
+            ),
         )
-        .filter(closed=True, percent=0)
-        .count()
     )
-    kwargs["closed_crowdfunds_0_25"] = (
-        Crowdfund.objects.annotate(
-            percent=F("payment_received") / F("payment_required")
+    stats.update(
+        FaxCommunication.objects.aggregate(
+            sent_communications_fax=Count("pk", filter=sent_yesterday),
+            **_weekly_communication_stats(
+                "fax", Q(confirmed_datetime__isnull=False), outgoing_only=False
+            ),
         )
-        .filter(closed=True, percent__gt=0, percent__lte=0.25)
-        .count()
     )
-    kwargs["closed_crowdfunds_25_50"] = (
-        Crowdfund.objects.annotate(
-            percent=F("payment_received") / F("payment_required")
+    stats.update(
+        MailCommunication.objects.aggregate(
+            sent_communications_mail=Count("pk", filter=sent_yesterday),
+            **_weekly_communication_stats(
+                "mail",
+                Exists(
+                    MailEvent.objects.filter(
+                        mail=OuterRef("pk"), event__endswith=".processed_for_delivery"
+                    )
+                ),
+                outgoing_only=True,
+            ),
         )
-        .filter(closed=True, percent__gt=0.25, percent__lte=0.50)
-        .count()
     )
-    kwargs["closed_crowdfunds_50_75"] = (
-        Crowdfund.objects.annotate(
-            percent=F("payment_received") / F("payment_required")
+    return stats
+
+
+def _task_stats(yesterday_time, today_time):
+    """Statistics for all task types, in a single pass over the task table"""
+    unresolved = Q(resolved=False) & (
+        Q(date_deferred__lte=date.today()) | Q(date_deferred=None)
+    )
+    deferred = Q(date_deferred__gt=date.today())
+    task_stats = {
+        "total_tasks": Count("pk"),
+        "total_unresolved_tasks": Count("pk", filter=unresolved),
+        "total_deferred_tasks": Count("pk", filter=deferred),
+        "daily_robot_response_tasks": Count(
+            "pk",
+            filter=Q(
+                responsetask__isnull=False,
+                date_done__gte=yesterday_time,
+                date_done__lt=today_time,
+                resolved_by__username="gloo",
+            ),
+        ),
+        "flag_processing_days": ExtractDay(
+            Cast(
+                Sum(
+                    Now() - F("date_created"),
+                    filter=Q(flaggedtask__isnull=False) & unresolved,
+                ),
+                DurationField(),
+            )
+        ),
+        "unresolved_snailmail_appeals": Count(
+            "pk", filter=Q(snailmailtask__category="a") & unresolved
+        ),
+    }
+    for name, related_name in TASK_TYPES:
+        is_type = Q(**{f"{related_name}__isnull": False})
+        task_stats[f"total_{name}_tasks"] = Count("pk", filter=is_type)
+        task_stats[f"total_unresolved_{name}_tasks"] = Count(
+            "pk", filter=is_type & unresolved
         )
-        .filter(closed=True, percent__gt=0.50, percent__lte=0.75)
-        .count()
-    )
-    kwargs["closed_crowdfunds_75_100"] = (
-        Crowdfund.objects.annotate(
-            percent=F("payment_received") / F("payment_required")
+        task_stats[f"total_deferred_{name}_tasks"] = Count(
+            "pk", filter=is_type & deferred
+        )
+    stats = Task.objects.aggregate(**task_stats)
+    # we no longer use generic or stale agency tasks
+    for name in ["generic", "staleagency"]:
+        stats[f"total_{name}_tasks"] = 0
+        stats[f"total_unresolved_{name}_tasks"] = 0
+        stats[f"total_deferred_{name}_tasks"] = 0
+    return stats
+
+
+def _crowdfund_stats():
+    """Statistics for crowdfunds and their payments"""
+    crowdfund_stats = {
+        "total_crowdfunds": Count("pk", distinct=True),
+        "open_crowdfunds": Count("pk", distinct=True, filter=Q(closed=False)),
+        "closed_crowdfunds_0": Count(
+            "pk", distinct=True, filter=Q(closed=True, percent=0)
+        ),
+        "closed_crowdfunds_200": Count(
+            "pk", distinct=True, filter=Q(closed=True, percent__gt=2.00)
+        ),
+    }
+    for name, lower, upper in CROWDFUND_BUCKETS:
+        crowdfund_stats[f"closed_crowdfunds_{name}"] = Count(
+            "pk",
+            distinct=True,
+            filter=Q(closed=True, percent__gt=lower, percent__lte=upper),
+        )
+    for name, slug in ENTITLEMENTS:
+        # the entitlement counts are not distinct, to match
+        # Crowdfund.objects.filter_by_entitlement(...).count()
+        entitlement = Q(foia__composer__organization__entitlement__slug=slug) | Q(
+            projects__contributors__organizations__entitlement__slug=slug
+        )
+        crowdfund_stats[f"total_crowdfunds_{name}"] = Count("pk", filter=entitlement)
+        crowdfund_stats[f"open_crowdfunds_{name}"] = Count(
+            "pk", filter=entitlement & Q(closed=False)
+        )
+    stats = Crowdfund.objects.annotate(
+        percent=F("payment_received") / F("payment_required")
+    ).aggregate(**crowdfund_stats)
+    stats.update(
+        CrowdfundPayment.objects.aggregate(
+            total_crowdfund_payments=Count("pk"),
+            total_crowdfund_payments_loggedin=Count("pk", filter=Q(user__isnull=False)),
+            total_crowdfund_payments_loggedout=Count("pk", filter=Q(user=None)),
         )
-        .filter(closed=True, percent__gt=0.75, percent__lte=1.00)
-        .count()
     )
-    kwargs["closed_crowdfunds_100_125"] = (
-        Crowdfund.objects.annotate(
-            percent=F("payment_received") / F("payment_required")
+    return stats
+
+
+def _project_stats():
+    """Statistics for projects and their contributors"""
+    stats = Project.objects.aggregate(
+        public_projects=Count(
+            "pk", distinct=True, filter=Q(private=False, approved=True)
+        ),
+        private_projects=Count(
+            "pk", distinct=True, filter=Q(private=True, approved=True)
+        ),
+        unapproved_projects=Count("pk", distinct=True, filter=Q(approved=False)),
+        crowdfund_projects=Count(
+            "pk", distinct=True, filter=Q(crowdfunds__isnull=False)
+        ),
+    )
+    stats.update(
+        User.objects.exclude(projects=None).aggregate(
+            project_users=Count("pk", distinct=True),
+            **{
+                f"project_users_{name}": Count(
+                    "pk", filter=Q(organizations__entitlement__slug=slug)
+                )
+                for name, slug in ENTITLEMENTS
+            },
         )
-        .filter(closed=True, percent__gt=1.00, percent__lte=1.25)
-        .count()
     )
-    kwargs["closed_crowdfunds_125_150"] = (
-        Crowdfund.objects.annotate(
-            percent=F("payment_received") / F("payment_required")
+    return stats
+
+
+def _crowdsource_stats():
+    """Statistics for crowdsources and their responses"""
+    stats = Crowdsource.objects.aggregate(
+        total_crowdsources=Count("pk"),
+        total_draft_crowdsources=Count("pk", filter=Q(status="draft")),
+        total_open_crowdsources=Count("pk", filter=Q(status="open")),
+        total_close_crowdsources=Count("pk", filter=Q(status="close")),
+    )
+    stats.update(
+        CrowdsourceResponse.objects.aggregate(
+            num_crowdsource_responded_users=Count("user", distinct=True),
+            total_crowdsource_responses=Count("pk", distinct=True),
+            **{
+                f"crowdsource_responses_{name}": Count(
+                    "pk", filter=Q(user__organizations__entitlement__slug=slug)
+                )
+                for name, slug in ENTITLEMENTS
+            },
         )
-        .filter(closed=True, percent__gt=1.25, percent__lte=1.50)
-        .count()
     )
-    kwargs["closed_crowdfunds_150_175"] = (
-        Crowdfund.objects.annotate(
-            percent=F("payment_received") / F("payment_required")
+    return stats
+
+
+@shared_task
+def store_statistics():
+    """Store the daily statistics
+
+    Each table is scanned once, using conditional aggregation to compute all
+    of its statistics together
+    """
+
+    cutoff_time = time(hour=7, tzinfo=timezone.get_current_timezone())
+    today_time = datetime.combine(date.today(), cutoff_time)
+    yesterday = date.today() - timedelta(1)
+    yesterday_time = today_time - timedelta(1)
+    timer = StatisticsTimer()
+
+    kwargs = {}
+    kwargs["date"] = yesterday
+    kwargs.update(
+        timer("foia_request", lambda: _request_stats(yesterday_time, today_time))
+    )
+    kwargs.update(
+        timer(
+            "foia_composer",
+            lambda: FOIAComposer.objects.aggregate(
+                total_composers=Count("pk"),
+                total_composers_draft=Count("pk", filter=Q(status="started")),
+                total_composers_submitted=Count("pk", filter=Q(status="submitted")),
+                total_composers_filed=Count("pk", filter=Q(status="filed")),
+                # this is still on muckrock since it deals with foia composers
+                total_users_filed=Count("user", distinct=True),
+            ),
         )
-        .filter(closed=True, percent__gt=1.50, percent__lte=1.75)
-        .count()
     )
-    kwargs["closed_crowdfunds_175_200"] = (
-        Crowdfund.objects.annotate(
-            percent=F("payment_received") / F("payment_required")
+    kwargs.update(
+        timer(
+            "communications",
+            lambda: _communication_stats(yesterday_time, today_time),
         )
-        .filter(closed=True, percent__gt=1.75, percent__lte=2.00)
-        .count()
     )
-    kwargs["closed_crowdfunds_200"] = (
-        Crowdfund.objects.annotate(
-            percent=F("payment_received") / F("payment_required")
+    kwargs.update(
+        timer(
+            "foia_machine_request",
+            lambda: FoiaMachineRequest.objects.aggregate(
+                machine_requests=Count("pk"),
+                **{
+                    f"machine_requests_{name}": Count("pk", filter=Q(status=status))
+                    for name, status in REQUEST_STATUSES + [("draft", "started")]
+                },
+            ),
         )
-        .filter(closed=True, percent__gt=2.00)
-        .count()
     )
-    kwargs["total_crowdfund_payments"] = CrowdfundPayment.objects.count()
-    kwargs["total_crowdfund_payments_loggedin"] = CrowdfundPayment.objects.exclude(
-        user=None
-    ).count()
-    kwargs["total_crowdfund_payments_loggedout"] = CrowdfundPayment.objects.filter(
-        user=None
-    ).count()
-    kwargs["public_projects"] = Project.objects.filter(
-        private=False, approved=True
-    ).count()
-    kwargs["private_projects"] = Project.objects.filter(
-        private=True, approved=True
-    ).count()
-    kwargs["unapproved_projects"] = Project.objects.filter(approved=False).count()
-    kwargs["crowdfund_projects"] = Project.objects.exclude(crowdfunds=None).count()
-    kwargs["project_users"] = User.objects.exclude(projects=None).count()
-    kwargs["project_users_pro"] = (
-        User.objects.filter(organizations__entitlement__slug="professional")
-        .exclude(projects=None)
-        .count()
+    kwargs.update(
+        timer(
+            "foia_file",
+            lambda: FOIAFile.objects.aggregate(total_pages=Sum("pages")),
+        )
     )
-    kwargs["project_users_basic"] = (
-        User.objects.filter(organizations__entitlement__slug="free")
-        .exclude(projects=None)
-        .count()
+    # user stats will now be kept on squarelet
+    kwargs["total_users"] = 0
+    kwargs["total_users_excluding_agencies"] = 0
+    kwargs.update(
+        timer(
+            "agency",
+            lambda: Agency.objects.aggregate(
+                total_agencies=Count("pk"),
+                unapproved_agencies=Count("pk", filter=Q(status="pending")),
+                portal_agencies=Count("pk", filter=Q(portal__isnull=False)),
+            ),
+        )
     )
-    kwargs["project_users_beta"] = (
-        User.objects.filter(organizations__entitlement__slug="beta")
-        .exclude(projects=None)
-        .count()
+    kwargs["stale_agencies"] = 0  # stake agencies no longer exist
+    kwargs["pro_users"] = 0  # squarelet
+    kwargs["pro_user_names"] = ""  # squarelet
+    kwargs["daily_articles"] = timer(
+        "article",
+        Article.objects.filter(pub_date__range=(yesterday_time, today_time)).count,
     )
-    kwargs["project_users_proxy"] = (
-        User.objects.filter(organizations__entitlement__slug="proxy")
-        .exclude(projects=None)
-        .count()
+    kwargs["orphaned_communications"] = timer(
+        "foia_communication", FOIACommunication.objects.filter(foia=None).count
     )
-    kwargs["project_users_admin"] = (
-        User.objects.filter(organizations__entitlement__slug="admin")
-        .exclude(projects=None)
-        .count()
+    kwargs.update(timer("task", lambda: _task_stats(yesterday_time, today_time)))
+    # squarelet
+    kwargs["total_active_org_members"] = 0
+    kwargs["total_active_orgs"] = 0
+    kwargs.update(timer("crowdfund", _crowdfund_stats))
+    kwargs.update(timer("project", _project_stats))
+    kwargs["total_exemptions"] = timer("exemption", Exemption.objects.count)
+    kwargs["total_invoked_exemptions"] = timer(
+        "invoked_exemption", InvokedExemption.objects.count
     )
-    kwargs["total_exemptions"] = Exemption.objects.count()
-    kwargs["total_invoked_exemptions"] = InvokedExemption.objects.count()
-    kwargs["total_example_appeals"] = ExampleAppeal.objects.count()
-    kwargs["total_crowdsources"] = Crowdsource.objects.count()
-    kwargs["total_draft_crowdsources"] = Crowdsource.objects.filter(
-        status="draft"
-    ).count()
-    kwargs["total_open_crowdsources"] = Crowdsource.objects.filter(
-        status="open"
-    ).count()
-    kwargs["total_close_crowdsources"] = Crowdsource.objects.filter(
-        status="close"
-    ).count()
-    kwargs["num_crowdsource_responded_users"] = (
-        CrowdsourceResponse.objects.get_user_count()
+    kwargs["total_example_appeals"] = timer(
+        "example_appeal", ExampleAppeal.objects.count
     )
-    kwargs["total_crowdsource_responses"] = CrowdsourceResponse.objects.count()
-    kwargs["crowdsource_responses_pro"] = CrowdsourceResponse.objects.filter(
-        user__organizations__entitlement__slug="professional"
-    ).count()
-    kwargs["crowdsource_responses_basic"] = CrowdsourceResponse.objects.filter(
-        user__organizations__entitlement__slug="free"
-    ).count()
-    kwargs["crowdsource_responses_beta"] = CrowdsourceResponse.objects.filter(
-        user__organizations__entitlement__slug="beta"
-    ).count()
-    kwargs["crowdsource_responses_proxy"] = CrowdsourceResponse.objects.filter(
-        user__organizations__entitlement__slug="proxy"
-    ).count()
-    kwargs["crowdsource_responses_admin"] = CrowdsourceResponse.objects.filter(
-        user__organizations__entitlement__slug="admin"
-    ).count()
+    kwargs.update(timer("crowdsource", _crowdsource_stats))
 
+    timer.log()
     Statistics.objects.create(**kwargs)
 
 
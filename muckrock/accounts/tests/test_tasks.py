@@ -3,7 +3,9 @@ Tests tasks for the Accounts application
 """
 
 # Django
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 # MuckRock
 from muckrock.accounts import models, tasks
@@ -20,3 +22,9 @@ class TestStatisticsTask(TestCase):
         assert (
             new_stat_count == stat_count + 1
         ), "A new Statistics object should be created."
+
+    def test_stats_query_budget(self):
+        """Statistics should be computed with a fixed number of queries"""
+        with CaptureQueriesContext(connection) as queries:
+            tasks.store_statistics()
+        assert len(queries) <= 30, f"{len(queries)} queries used for statistics"
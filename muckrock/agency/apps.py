@@ -18,6 +18,14 @@ class AgencyConfig(AppConfig):
         from actstream import registry as action
         from watson import search
 
+        # MuckRock
+        import muckrock.agency.signals  # pylint: disable=unused-import
+        from muckrock.core import fulltext
+
         Agency = self.get_model("Agency")
         action.register(Agency)
         search.register(Agency.objects.get_approved())
+        fulltext.register(
+            Agency.objects.get_approved(),
+            {"name": "A", "aliases": "B", "public_notes": "C"},
+        )
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.15 on 2026-10-18 14:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agency", "0034_agency_portal_payment_url"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AgencyRequestStats",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("num_requests", models.PositiveIntegerField(default=0)),
+                ("num_done", models.PositiveIntegerField(default=0)),
+                ("num_fee", models.PositiveIntegerField(default=0)),
+                (
+                    "average_fee",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("average_response_time", models.IntegerField(default=0)),
+                ("total_pages", models.PositiveIntegerField(default=0)),
+                ("datetime_updated", models.DateTimeField(auto_now=True)),
+                (
+                    "agency",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="request_stats",
+                        to="agency.agency",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+    ]
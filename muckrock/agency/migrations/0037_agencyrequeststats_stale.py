@@ -0,0 +1,22 @@
+# Generated by Django 5.2.15 on 2026-10-18 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agency", "0036_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="agencyrequeststats",
+            name="stale",
+            field=models.BooleanField(
+                default=False,
+                help_text="A request has changed since these statistics were "
+                "computed, and a refresh is pending",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.15 on 2026-10-18 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agency", "0037_agencyrequeststats_stale"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="agency",
+            name="datetime_modified",
+            field=models.DateTimeField(
+                auto_now=True,
+                help_text="Timestamp of the latest change to this agency, used "
+                "for conditional requests for pages showing it",
+                null=True,
+            ),
+        ),
+    ]
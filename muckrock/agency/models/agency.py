@@ -4,6 +4,8 @@ Agency Model
 
 # Django
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models, transaction
 from django.db.models import Q
 from django.db.models.expressions import F, Value
@@ -21,9 +23,12 @@ from easy_thumbnails.fields import ThumbnailerImageField
 
 # MuckRock
 from muckrock.accounts.models import Profile
+from muckrock.communication import allowlist
+from muckrock.core.models import LoadedValuesMixin
 from muckrock.core.utils import squarelet_post
+from muckrock.foia.models.access import FOIARequestAccess
 from muckrock.foia.models.log import FOIALog
-from muckrock.jurisdiction.models import Jurisdiction, RequestHelper
+from muckrock.jurisdiction.models import Jurisdiction, RequestHelper, RequestStats
 from muckrock.task.models import NewAgencyTask
 
 logger = logging.getLogger(__name__)
@@ -92,7 +97,7 @@ class AgencyQuerySet(models.QuerySet):
         return agency
 
 
-class Agency(models.Model, RequestHelper):
+class Agency(LoadedValuesMixin, models.Model, RequestHelper):
     """An agency for a particular jurisdiction that has at least one agency type"""
 
     name = models.CharField(max_length=255)
@@ -210,6 +215,13 @@ class Agency(models.Model, RequestHelper):
     has_appeal = models.BooleanField(default=True)
 
     last_log_update = models.DateField(blank=True, null=True)
+    datetime_modified = models.DateTimeField(
+        auto_now=True,
+        null=True,
+        help_text="Timestamp of the latest change to this agency, used for "
+        "conditional requests for pages showing it",
+    )
+    search_vector = SearchVectorField(null=True, editable=False)
 
     objects = AgencyQuerySet.as_manager()
 
@@ -365,8 +377,10 @@ class Agency(models.Model, RequestHelper):
             "staleagencytask_set",
             "foialog_set",
         ]
+        foia_pks = list(agency.foiarequest_set.values_list("pk", flat=True))
         for relation in replace_relations:
             getattr(agency, relation).update(agency=self)
+        FOIARequestAccess.objects.rebuild(foia_pks)
         # appeal jurisdictions attribute it appeal agency
         agency.appeal_jurisdictions.update(appeal_agency=self)
 
@@ -388,6 +402,7 @@ class Agency(models.Model, RequestHelper):
         agency.agencyemail_set.exclude(email__in=self.emails.all()).update(
             request_type="none", email_type="none", agency=self
         )
+        allowlist.invalidate_agencies([self.pk, agency.pk])
         agency.agencyphone_set.exclude(phone__in=self.phones.all()).update(
             request_type="none", agency=self
         )
@@ -431,8 +446,25 @@ class Agency(models.Model, RequestHelper):
 
     class Meta:
         verbose_name_plural = "agencies"
+        indexes = [GinIndex(fields=["search_vector"], name="agency_search_idx")]
         permissions = (
             ("view_emails", "Can view private contact information"),
             ("merge_agency", "Can merge two agencies together"),
             ("mass_import", "Can mass import a CSV of agencies"),
         )
+
+
+class AgencyRequestStats(RequestStats):
+    """Materialized request statistics for an agency"""
+
+    agency = models.OneToOneField(
+        Agency, related_name="request_stats", on_delete=models.CASCADE
+    )
+    stale = models.BooleanField(
+        default=False,
+        help_text="A request has changed since these statistics were computed, "
+        "and a refresh is pending",
+    )
+
+    def __str__(self):
+        return f"Request statistics for {self.agency}"
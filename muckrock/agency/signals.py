@@ -0,0 +1,71 @@
+"""Signal handlers for the agency app"""
+
+# Django
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+# MuckRock
+from muckrock.agency.models import Agency
+from muckrock.agency.tasks import (
+    schedule_jurisdiction_request_stats_update,
+    schedule_request_stats_update,
+)
+from muckrock.foia.models import FOIAComposer, FOIAFile, FOIARequest
+
+# changes to these fields on a request may change its agency's statistics
+REQUEST_STATS_FIELDS = ["agency_id", "status", "price", "datetime_done"]
+
+
+@receiver(pre_save, sender=FOIARequest)
+def request_stats_request_changed(instance, **kwargs):
+    """Refresh the agency statistics when a request's status or price changes"""
+    # pylint: disable=unused-argument, protected-access
+    if instance._state.adding:
+        schedule_request_stats_update(instance.agency_id)
+        return
+    changed = instance.get_changed_fields(REQUEST_STATS_FIELDS)
+    if changed:
+        schedule_request_stats_update(instance.agency_id)
+    if "agency_id" in changed:
+        schedule_request_stats_update(instance.get_loaded_value("agency_id"))
+
+
+@receiver(pre_save, sender=FOIAComposer)
+def request_stats_composer_changed(instance, **kwargs):
+    """Refresh the agency statistics when a composer's submission time changes,
+    as it is the start of its requests' response times"""
+    # pylint: disable=unused-argument, protected-access
+    if instance._state.adding or not instance.get_changed_fields(
+        ["datetime_submitted"]
+    ):
+        return
+    for agency_id in (
+        instance.foias.order_by().values_list("agency_id", flat=True).distinct()
+    ):
+        schedule_request_stats_update(agency_id)
+
+
+@receiver(pre_save, sender=Agency)
+def request_stats_agency_changed(instance, **kwargs):
+    """Refresh the jurisdiction statistics when an agency changes jurisdiction"""
+    # pylint: disable=unused-argument, protected-access
+    if instance._state.adding or not instance.get_changed_fields(["jurisdiction_id"]):
+        return
+    schedule_request_stats_update(instance.pk)
+    schedule_jurisdiction_request_stats_update(
+        instance.get_loaded_value("jurisdiction_id")
+    )
+
+
+@receiver(post_save, sender=FOIAFile)
+def request_stats_file_changed(instance, **kwargs):
+    """Refresh the agency statistics when a file's pages are counted"""
+    # pylint: disable=unused-argument
+    if instance.pages and instance.comm_id:
+        agency_id = (
+            FOIARequest.objects.filter(communications=instance.comm_id)
+            .values_list("agency_id", flat=True)
+            .first()
+        )
+        if agency_id:
+            schedule_request_stats_update(agency_id)
@@ -2,6 +2,7 @@
 
 # Django
 from celery import shared_task
+from django.db import transaction
 
 # Standard Library
 import csv
@@ -11,8 +12,10 @@ from smart_open.smart_open_lib import smart_open
 
 # MuckRock
 from muckrock.agency.importer import CSVReader, Importer
+from muckrock.agency.models import Agency, AgencyRequestStats
 from muckrock.core.tasks import AsyncFileDownloadTask
 from muckrock.foia.models import FOIARequest
+from muckrock.jurisdiction.models import Jurisdiction
 from muckrock.task.models import ReviewAgencyTask
 
 
@@ -25,6 +28,76 @@ def stale():
         )
 
 
+# wait this many seconds before refreshing an agency's request statistics,
+# so that a burst of changes only refreshes them once
+REQUEST_STATS_DELAY = 60
+
+
+def schedule_request_stats_update(agency_pk):
+    """Refresh an agency's request statistics after the current transaction
+
+    The statistics are flagged as stale in the database, and a refresh is only
+    queued when they were not stale already.  Statistics which have not been
+    computed yet are refreshed without the flag.
+    """
+    if agency_pk is None:
+        return
+    flagged = AgencyRequestStats.objects.filter(
+        agency_id=agency_pk, stale=False
+    ).update(stale=True)
+    if flagged or not AgencyRequestStats.objects.filter(agency_id=agency_pk).exists():
+        transaction.on_commit(
+            lambda: update_request_stats.apply_async(
+                args=[agency_pk], countdown=REQUEST_STATS_DELAY
+            )
+        )
+
+
+def schedule_jurisdiction_request_stats_update(jurisdiction_pk):
+    """Refresh a jurisdiction's request statistics after the current transaction"""
+    if jurisdiction_pk is not None:
+        transaction.on_commit(
+            lambda: update_jurisdiction_request_stats.apply_async(
+                args=[jurisdiction_pk], countdown=REQUEST_STATS_DELAY
+            )
+        )
+
+
+def _update_jurisdiction_request_stats(jurisdiction):
+    """Refresh the request statistics for a jurisdiction and its state"""
+    jurisdiction.update_request_stats()
+    # state jurisdictions include the requests from their localities
+    if jurisdiction.level == "l":
+        jurisdiction.parent.update_request_stats()
+
+
+@shared_task
+def update_request_stats(agency_pk):
+    """Refresh the request statistics for an agency and its jurisdictions"""
+    # clear the flag first, so changes made while refreshing queue a new refresh
+    AgencyRequestStats.objects.filter(agency_id=agency_pk).update(stale=False)
+    agency = Agency.objects.select_related("jurisdiction__parent").get(pk=agency_pk)
+    agency.update_request_stats()
+    _update_jurisdiction_request_stats(agency.jurisdiction)
+
+
+@shared_task
+def update_jurisdiction_request_stats(jurisdiction_pk):
+    """Refresh the request statistics for a jurisdiction"""
+    _update_jurisdiction_request_stats(
+        Jurisdiction.objects.select_related("parent").get(pk=jurisdiction_pk)
+    )
+
+
+@shared_task
+def update_stale_request_stats():
+    """Refresh any stale request statistics whose refresh was lost"""
+    for agency_pk in AgencyRequestStats.objects.filter(stale=True).values_list(
+        "agency_id", flat=True
+    ):
+        update_request_stats.delay(agency_pk)
+
+
 class MassImport(AsyncFileDownloadTask):
     """Do a mass import of agency data"""
 
@@ -485,6 +485,7 @@ class AgencyFOIALogAutocomplete(MRAutocompleteView):
     search_fields = ["name", "aliases"]
     split_words = "and"
     template = "autocomplete/agency.html"
+    full_text_search = True
 
 
 class MassImportAgency(PermissionRequiredMixin, FormView):
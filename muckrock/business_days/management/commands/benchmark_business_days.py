@@ -0,0 +1,68 @@
+"""Compare the business day index against walking the calendar day by day"""
+
+# Django
+from django.core.management.base import BaseCommand
+
+# Standard Library
+import time
+from datetime import date, timedelta
+
+# MuckRock
+from muckrock.business_days.models import SAT, SUN, HolidayCalendar
+from muckrock.jurisdiction.models import Jurisdiction
+
+
+def walk_between(calendar, date_a, date_b):
+    """Count business days by checking every day, as was done before indexing"""
+    num = 0
+    while date_a < date_b:
+        date_a += timedelta(1)
+        if date_a.weekday() not in (SAT, SUN) and not calendar.is_holiday(date_a):
+            num += 1
+    return num
+
+
+class Command(BaseCommand):
+    """Benchmark business day calculations"""
+
+    help = "Benchmark the business day index against the day by day walk"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jurisdiction", type=int, help="Jurisdiction ID")
+        parser.add_argument("--years", type=int, default=10)
+        parser.add_argument("--iterations", type=int, default=100)
+
+    def handle(self, *args, **kwargs):
+        if kwargs["jurisdiction"]:
+            jurisdiction = Jurisdiction.objects.get(pk=kwargs["jurisdiction"])
+        else:
+            jurisdiction = Jurisdiction.objects.get(level="f")
+        legal = jurisdiction.legal
+        calendar = HolidayCalendar(legal.holidays.all(), legal.observe_sat)
+        start = date(2010, 1, 1)
+        end = start + timedelta(365 * kwargs["years"])
+        iterations = kwargs["iterations"]
+
+        before = time.perf_counter()
+        for _ in range(iterations):
+            walked = walk_between(calendar, start, end)
+        walk_time = time.perf_counter() - before
+
+        before = time.perf_counter()
+        indexed = calendar.business_days_between(start, end)
+        build_time = time.perf_counter() - before
+
+        before = time.perf_counter()
+        for _ in range(iterations):
+            indexed = calendar.business_days_between(start, end)
+            calendar.business_days_from(start, indexed)
+        index_time = time.perf_counter() - before
+
+        if walked != indexed:
+            self.stderr.write(f"Mismatch: walked {walked}, indexed {indexed}")
+        self.stdout.write(
+            f"{jurisdiction} - {kwargs['years']} years, {iterations} iterations\n"
+            f"Day by day walk: {walk_time / iterations * 1000:.3f} ms per span\n"
+            f"Index build: {build_time * 1000:.3f} ms (once per process)\n"
+            f"Indexed lookup: {index_time / iterations * 1000:.3f} ms per span"
+        )
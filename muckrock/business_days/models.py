@@ -3,11 +3,14 @@ Models for the Business Days application
 """
 
 # Django
+from django.core.cache import cache
 from django.db import models
 
 # Standard Library
+from bisect import bisect_left, bisect_right
 from calendar import monthrange
-from datetime import timedelta
+from datetime import date, timedelta
+from uuid import uuid4
 
 # Third Party
 from dateutil.easter import easter
@@ -134,11 +137,18 @@ class Holiday(models.Model):
 
 
 class HolidayCalendar:
-    """A set of holidays"""
+    """A set of holidays
+
+    Business days are indexed a year at a time as a sorted list of date
+    ordinals, so date arithmetic is a bisect instead of a day by day walk
+    """
 
     def __init__(self, holidays, observe_sat):
-        self.holidays = holidays
+        self.holidays = list(holidays)
         self.observe_sat = observe_sat
+        self._first_year = None
+        self._last_year = None
+        self._ordinals = []
 
     def is_holiday(self, date_):
         """Is given date a holiday?"""
@@ -151,41 +161,80 @@ class HolidayCalendar:
     def is_business_day(self, date_):
         """Is the given date a business day?"""
 
-        weekday = date_.weekday()
-        if weekday in (SAT, SUN):
-            return False
-
-        return not self.is_holiday(date_)
+        if self._first_year is None or not (
+            self._first_year <= date_.year <= self._last_year
+        ):
+            # a single check does not need a whole year indexed
+            return date_.weekday() not in (SAT, SUN) and not self.is_holiday(date_)
+        ordinal = date_.toordinal()
+        index = bisect_left(self._ordinals, ordinal)
+        return index < len(self._ordinals) and self._ordinals[index] == ordinal
 
     def business_days_from(self, date_, num):
         """Returns the date n business days from the given date"""
 
-        # could be optimized
-        delta = timedelta(1 if num >= 0 else -1)
-        num = abs(num)
-
-        while num:
-            date_ += delta
-            if self.is_business_day(date_):
-                num -= 1
-        return date_
+        if num == 0:
+            return date_
+
+        ordinal = date_.toordinal()
+        self._index_years(date_.year, date_.year)
+        if num > 0:
+            index = bisect_right(self._ordinals, ordinal) + num - 1
+            while index >= len(self._ordinals):
+                self._index_years(self._first_year, self._last_year + 1)
+                index = bisect_right(self._ordinals, ordinal) + num - 1
+        else:
+            index = bisect_left(self._ordinals, ordinal) + num
+            while index < 0:
+                self._index_years(self._first_year - 1, self._last_year)
+                index = bisect_left(self._ordinals, ordinal) + num
+        return date.fromordinal(self._ordinals[index])
 
     def business_days_between(self, date_a, date_b):
         """How many business days are between the given dates?"""
 
-        # could be optimized
         sign = 1
         if date_a > date_b:
             date_a, date_b = date_b, date_a
             sign = -1
 
-        num = 0
-        while date_a < date_b:
-            date_a += timedelta(1)
-            if self.is_business_day(date_a):
-                num += 1
+        self._index_years(date_a.year, date_b.year)
+        num = bisect_right(self._ordinals, date_b.toordinal()) - bisect_right(
+            self._ordinals, date_a.toordinal()
+        )
         return num * sign
 
+    def _index_years(self, first, last):
+        """Make sure business days from first through last year are indexed"""
+        if self._first_year is None:
+            self._ordinals = self._business_ordinals(first, last)
+            self._first_year, self._last_year = first, last
+            return
+        if first < self._first_year:
+            self._ordinals = (
+                self._business_ordinals(first, self._first_year - 1) + self._ordinals
+            )
+            self._first_year = first
+        if last > self._last_year:
+            self._ordinals = self._ordinals + self._business_ordinals(
+                self._last_year + 1, last
+            )
+            self._last_year = last
+
+    def _business_ordinals(self, first, last):
+        """Sorted ordinals of every business day from first through last year"""
+        days = (
+            date.fromordinal(ordinal)
+            for ordinal in range(
+                date(first, 1, 1).toordinal(), date(last, 12, 31).toordinal() + 1
+            )
+        )
+        return [
+            day.toordinal()
+            for day in days
+            if day.weekday() not in (SAT, SUN) and not self.is_holiday(day)
+        ]
+
 
 class Calendar:
     """A set of holidays"""
@@ -205,3 +254,27 @@ class Calendar:
     def business_days_between(self, date_a, date_b):
         """How many business days are between the given dates?"""
         return abs((date_a - date_b).days)
+
+
+# Calendars are cached per process, keyed by legal jurisdiction.  The version
+# stored in the shared cache lets a change in one process invalidate the
+# calendars held by every other process.
+CALENDAR_VERSION_KEY = "business_days:calendar_version"
+_calendar_cache = {}
+
+
+def get_cached_calendar(key, build):
+    """Get a calendar from the process cache, building it if it is stale"""
+    version = cache.get_or_set(CALENDAR_VERSION_KEY, lambda: uuid4().hex, None)
+    cached = _calendar_cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    calendar = build()
+    _calendar_cache[key] = (version, calendar)
+    return calendar
+
+
+def clear_calendar_cache():
+    """Invalidate all cached calendars, in this and all other processes"""
+    _calendar_cache.clear()
+    cache.set(CALENDAR_VERSION_KEY, uuid4().hex, None)
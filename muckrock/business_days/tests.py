@@ -6,10 +6,10 @@ Tests for the business_days application
 from django.test import TestCase
 
 # Standard Library
-from datetime import date
+from datetime import date, timedelta
 
 # MuckRock
-from muckrock.business_days.models import Calendar, Holiday
+from muckrock.business_days.models import Calendar, Holiday, HolidayCalendar
 from muckrock.jurisdiction.factories import FederalJurisdictionFactory
 
 
@@ -82,6 +82,17 @@ class TestBusinessDayUnit(TestCase):
         # weekend
         assert not self.usa_cal.is_business_day(date(2011, 7, 10))
 
+    def test_is_business_day_index(self):
+        """Single day checks do not build the index, but use it once built"""
+        # pylint: disable=protected-access
+        cal = HolidayCalendar(self.usa_cal.holidays, observe_sat=False)
+        assert not cal.is_business_day(date(2011, 7, 4))
+        assert cal._first_year is None
+        cal.business_days_from(date(2011, 7, 1), 1)
+        assert cal._first_year == 2011
+        assert not cal.is_business_day(date(2011, 7, 4))
+        assert cal.is_business_day(date(2011, 7, 5))
+
     def test_business_days_from(self):
         """Test business_days_from"""
 
@@ -111,3 +122,35 @@ class TestBusinessDayUnit(TestCase):
             self.gen_cal.business_days_between(date(2010, 11, 1), date(2010, 12, 1))
             == 30
         )
+
+    def test_business_days_index(self):
+        """The business day index should agree with walking day by day"""
+
+        def walk_from(date_, num):
+            delta = timedelta(1 if num >= 0 else -1)
+            for _ in range(abs(num)):
+                date_ += delta
+                while date_.weekday() >= 5 or self.usa_cal.is_holiday(date_):
+                    date_ += delta
+            return date_
+
+        start = date(2010, 12, 30)
+        for num in (0, 1, 5, 30, 365, 2520, -1, -30, -400):
+            assert self.usa_cal.business_days_from(start, num) == walk_from(start, num)
+
+        end = date(2020, 12, 31)
+        num = sum(
+            1
+            for i in range(1, (end - start).days + 1)
+            if self.usa_cal.is_business_day(start + timedelta(i))
+        )
+        assert self.usa_cal.business_days_between(start, end) == num
+        assert self.usa_cal.business_days_between(end, start) == -num
+
+    def test_calendar_cache_invalidation(self):
+        """Changing the holidays should rebuild the calendar"""
+
+        usa = self.mlk_day.jurisdiction_set.get()
+        assert not usa.get_calendar().is_business_day(date(2011, 7, 4))
+        self.independence_day.delete()
+        assert usa.get_calendar().is_business_day(date(2011, 7, 4))
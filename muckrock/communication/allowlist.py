@@ -0,0 +1,72 @@
+"""
+Precomputed lookups for deciding who may send us email
+
+The government TLDs are computed once, while the addresses known for each
+agency and the whitelisted domains are cached, and invalidated when they
+change, so most inbound messages are allowed or rejected without a query
+"""
+
+# Django
+from django.core.cache import cache
+from django.db import transaction
+
+# Third Party
+from localflavor.us.us_states import STATE_CHOICES
+
+# MuckRock
+from muckrock.mailgun.models import WhitelistDomain
+
+# territories do not have their own state level TLD
+TERRITORIES = ("AS", "DC", "GU", "MP", "PR", "VI")
+ALLOWED_TLDS = tuple(
+    ".%s.us" % abbrev.lower()
+    for abbrev, _ in STATE_CHOICES
+    if abbrev not in TERRITORIES
+) + (".gov", ".mil")
+
+ALLOWLIST_TIMEOUT = 24 * 60 * 60
+WHITELIST_KEY = "allowlist:whitelist"
+
+
+def agency_key(agency_id):
+    """Cache key for the addresses known for an agency"""
+    return f"allowlist:agency:{agency_id}"
+
+
+def get_agency_email_ids(agency_id):
+    """The IDs of the email addresses known for an agency"""
+    # pylint: disable=import-outside-toplevel
+    # MuckRock
+    from muckrock.agency.models import AgencyEmail
+
+    email_ids = cache.get(agency_key(agency_id))
+    if email_ids is None:
+        email_ids = frozenset(
+            AgencyEmail.objects.filter(agency_id=agency_id).values_list(
+                "email_id", flat=True
+            )
+        )
+        cache.set(agency_key(agency_id), email_ids, ALLOWLIST_TIMEOUT)
+    return email_ids
+
+
+def get_whitelist_domains():
+    """The whitelisted domains, lower cased"""
+    domains = cache.get(WHITELIST_KEY)
+    if domains is None:
+        domains = frozenset(
+            d.lower() for d in WhitelistDomain.objects.values_list("domain", flat=True)
+        )
+        cache.set(WHITELIST_KEY, domains, ALLOWLIST_TIMEOUT)
+    return domains
+
+
+def invalidate_agencies(agency_ids):
+    """Forget the known addresses for agencies, once the change is committed"""
+    keys = [agency_key(agency_id) for agency_id in agency_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_whitelist():
+    """Forget the whitelisted domains, once the change is committed"""
+    transaction.on_commit(lambda: cache.delete(WHITELIST_KEY))
@@ -11,3 +11,9 @@ class CommunicationConfig(AppConfig):
     """Communication app config"""
 
     name = "muckrock.communication"
+
+    def ready(self):
+        """Connect signal handlers"""
+        # pylint: disable=import-outside-toplevel, unused-import
+        # MuckRock
+        import muckrock.communication.signals
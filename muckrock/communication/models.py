@@ -7,24 +7,26 @@ Models for keeping track of how we send and receive communications
 from django.conf import settings
 from django.core.mail.message import EmailMessage
 from django.core.validators import validate_email
-from django.db import models
+from django.db import models, transaction
 from django.forms import ValidationError
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
 
 # Standard Library
+import threading
+import time
+from collections import OrderedDict
 from datetime import date
 from email.utils import getaddresses, parseaddr
 
 # Third Party
 import phonenumbers
 from localflavor.us.models import USStateField, USZipCodeField
-from localflavor.us.us_states import STATE_CHOICES
 from phonenumber_field.modelfields import PhoneNumberField
 
 # MuckRock
-from muckrock.mailgun.models import WhitelistDomain
+from muckrock.communication import allowlist
 
 PHONE_TYPES = (("fax", "Fax"), ("phone", "Phone"))
 CHECK_STATUS = (
@@ -38,20 +40,74 @@ CHECK_STATUS = (
 # Address models
 
 
+class AddressCache:
+    """A bounded, thread safe LRU cache of email address rows
+
+    Inbound and outbound mail resolve the same agency addresses over and
+    over, so recently used rows are kept in process.  Rows are only cached
+    once the transaction they were read or created in commits.  Entries
+    expire after `timeout` seconds, as other processes may change an
+    address' status, and are dropped whenever an address is saved or deleted
+    in this process.
+    """
+
+    fields = ["id", "email", "name", "status"]
+
+    def __init__(self, maxsize=1000, timeout=300):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, email):
+        """Get a fresh instance for a cached address, or None"""
+        with self._lock:
+            entry = self._data.get(email)
+            if entry is None:
+                return None
+            expires, values = entry
+            if expires < time.monotonic():
+                del self._data[email]
+                return None
+            self._data.move_to_end(email)
+        return EmailAddress.from_db("default", self.fields, values)
+
+    def set_many(self, email_addresses):
+        """Cache addresses"""
+        if not self.maxsize:
+            return
+        expires = time.monotonic() + self.timeout
+        with self._lock:
+            for email_address in email_addresses:
+                self._data[email_address.email] = (
+                    expires,
+                    [getattr(email_address, field) for field in self.fields],
+                )
+                self._data.move_to_end(email_address.email)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, email):
+        """Remove an address from the cache"""
+        with self._lock:
+            self._data.pop(email, None)
+
+    def clear(self):
+        """Empty the cache"""
+        with self._lock:
+            self._data.clear()
+
+
+address_cache = AddressCache(settings.EMAIL_ADDRESS_CACHE_SIZE)
+
+
 class EmailAddressQuerySet(models.QuerySet):
     """QuerySet for EmailAddresses"""
 
     def fetch(self, address, user=None):
         """Fetch an email address object based on an email header"""
-        name, email = parseaddr(address)
-        try:
-            email = self._normalize_email(email)
-        except ValidationError:
-            return None
-        email_address, created = self.update_or_create(
-            email=email, defaults={"name": name}
-        )
-        if created and user:
+        (email_address,), created = self._resolve([parseaddr(address)])
+        if email_address is not None and email_address.email in created and user:
             email_address.sources.create(
                 datetime=timezone.now(),
                 user=user,
@@ -61,21 +117,71 @@ class EmailAddressQuerySet(models.QuerySet):
 
     def fetch_many(self, *addresses, **kwargs):
         """Fetch multiple email address objects based on an email header"""
-        name_emails = getaddresses(addresses)
-        addresses = []
+        return [
+            e
+            for e in self.resolve(
+                getaddresses(addresses), ignore_errors=kwargs.get("ignore_errors", True)
+            )
+            if e is not None
+        ]
+
+    def resolve(self, name_emails, ignore_errors=True):
+        """Fetch or create the email addresses for a list of (name, email) pairs
+
+        Returns a list the same length as `name_emails`, with None in place of
+        any invalid addresses.  Existing addresses are fetched in a single
+        query, missing ones are created in bulk and names are only written
+        when they have changed
+        """
+        return self._resolve(name_emails, ignore_errors)[0]
+
+    def _resolve(self, name_emails, ignore_errors=True):
+        """Resolve the addresses, also returning the set of emails created"""
+        # pylint: disable=too-many-locals
+        normalized = []
         for name, email in name_emails:
             try:
-                email = self._normalize_email(email)
+                normalized.append((name, self._normalize_email(email)))
             except ValidationError:
-                if kwargs.get("ignore_errors", True):
-                    continue
-                else:
+                if not ignore_errors:
                     raise
-            email_address, _ = self.update_or_create(
-                email=email, defaults={"name": name}
+                normalized.append(None)
+        # as with update or create, the last name given for an email wins
+        names = {email: name for name, email in filter(None, normalized)}
+
+        found = {}
+        for email in names:
+            email_address = address_cache.get(email)
+            if email_address is not None:
+                found[email] = email_address
+        missing = [email for email in names if email not in found]
+        if missing:
+            found.update({e.email: e for e in self.filter(email__in=missing)})
+
+        created = {email for email in names if email not in found}
+        if created:
+            self.bulk_create(
+                [EmailAddress(email=email, name=names[email]) for email in created],
+                ignore_conflicts=True,
             )
-            addresses.append(email_address)
-        return addresses
+            # primary keys are not returned when conflicts are ignored
+            found.update({e.email: e for e in self.filter(email__in=created)})
+
+        changed = [
+            found[email]
+            for email, name in names.items()
+            if email not in created and found[email].name != name
+        ]
+        for email_address in changed:
+            email_address.name = names[email_address.email]
+        if changed:
+            self.bulk_update(changed, ["name"])
+
+        if found:
+            transaction.on_commit(lambda: address_cache.set_many(found.values()))
+        return [
+            found[pair[1]] if pair is not None else None for pair in normalized
+        ], created
 
     @staticmethod
     def _normalize_email(email):
@@ -131,27 +237,20 @@ class EmailAddress(models.Model):
         # MuckRock
         from muckrock.agency.models import AgencyEmail
 
-        allowed_tlds = [
-            ".%s.us" % a.lower()
-            for (a, _) in list(STATE_CHOICES)
-            if a not in ("AS", "DC", "GU", "MP", "PR", "VI")
-        ]
-        allowed_tlds.extend([".gov", ".mil"])
-
         # This requests primary email address
-        if foia and foia.email == self:
+        if foia and foia.email_id == self.pk:
             return True
 
-        # the email is a known email for this FOIA's agency
-        if foia and self.agencies.filter(pk=foia.agency_id).exists():
+        # it is from any known government TLD
+        if self.email.endswith(allowlist.ALLOWED_TLDS):
             return True
 
-        # the email is a known email for this FOIA
-        if foia and foia.cc_emails.filter(email=self).exists():
+        # the email is a known email for this FOIA's agency
+        if foia and self.pk in allowlist.get_agency_email_ids(foia.agency_id):
             return True
 
-        # it is from any known government TLD
-        if any(self.email.endswith(tld) for tld in allowed_tlds):
+        # the email is a known email for this FOIA
+        if foia and foia.cc_emails.filter(pk=self.pk).exists():
             return True
 
         # if not associated with any FOIA,
@@ -160,7 +259,7 @@ class EmailAddress(models.Model):
             return True
 
         # check the email domain against the whitelist
-        if WhitelistDomain.objects.filter(domain__iexact=self.domain).exists():
+        if self.domain.lower() in allowlist.get_whitelist_domains():
             return True
 
         return False
@@ -0,0 +1,79 @@
+"""
+Signals for the communication application
+"""
+
+# Django
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+# MuckRock
+from muckrock.agency.models import AgencyEmail
+from muckrock.communication import allowlist
+from muckrock.communication.models import EmailAddress, address_cache
+from muckrock.mailgun.models import WhitelistDomain
+
+
+def discard_cached_address(sender, instance, **kwargs):
+    """Drop an email address from the in process cache when it changes"""
+    # pylint: disable=unused-argument
+    address_cache.discard(instance.email)
+
+
+def agency_email_changed(sender, instance, **kwargs):
+    """An agency's known addresses changed"""
+    # pylint: disable=unused-argument
+    allowlist.invalidate_agencies([instance.agency_id])
+
+
+def agency_emails_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """An agency's known addresses changed through the many to many field"""
+    # pylint: disable=unused-argument, too-many-arguments
+    # pylint: disable=too-many-positional-arguments
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        allowlist.invalidate_agencies([instance.pk])
+    elif reverse and action in ("post_add", "post_remove"):
+        allowlist.invalidate_agencies(pk_set)
+    elif reverse and action == "pre_clear":
+        allowlist.invalidate_agencies(instance.agencies.values_list("pk", flat=True))
+
+
+def whitelist_changed(sender, instance, **kwargs):
+    """The whitelisted domains changed"""
+    # pylint: disable=unused-argument
+    allowlist.invalidate_whitelist()
+
+
+post_save.connect(
+    discard_cached_address,
+    sender=EmailAddress,
+    dispatch_uid="muckrock.communication.signals.discard_cached_address_save",
+)
+post_delete.connect(
+    discard_cached_address,
+    sender=EmailAddress,
+    dispatch_uid="muckrock.communication.signals.discard_cached_address_delete",
+)
+post_save.connect(
+    agency_email_changed,
+    sender=AgencyEmail,
+    dispatch_uid="muckrock.communication.signals.agency_email_changed_save",
+)
+post_delete.connect(
+    agency_email_changed,
+    sender=AgencyEmail,
+    dispatch_uid="muckrock.communication.signals.agency_email_changed_delete",
+)
+m2m_changed.connect(
+    agency_emails_changed,
+    sender=AgencyEmail,
+    dispatch_uid="muckrock.communication.signals.agency_emails_changed",
+)
+post_save.connect(
+    whitelist_changed,
+    sender=WhitelistDomain,
+    dispatch_uid="muckrock.communication.signals.whitelist_changed_save",
+)
+post_delete.connect(
+    whitelist_changed,
+    sender=WhitelistDomain,
+    dispatch_uid="muckrock.communication.signals.whitelist_changed_delete",
+)
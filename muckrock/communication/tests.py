@@ -5,13 +5,14 @@ Tests for communication
 
 # Django
 from django.forms import ValidationError
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 # Third Party
 import pytest
 
 # MuckRock
-from muckrock.communication.models import EmailAddress
+from muckrock.communication.models import AddressCache, EmailAddress
+from muckrock.core.factories import AgencyEmailFactory
 from muckrock.foia.factories import FOIARequestFactory
 from muckrock.mailgun.models import WhitelistDomain
 
@@ -30,6 +31,48 @@ class TestEmailAddress(TestCase):
         with pytest.raises(ValidationError):
             EmailAddress.objects.fetch_many("a@a.comn, foobar", ignore_errors=False)
 
+    def test_fetch_many_queries(self):
+        """A 20 recipient email is resolved in bulk"""
+        for i in range(10):
+            EmailAddress.objects.create(email=f"old{i}@agency.gov", name=f"Old {i}")
+        header = ", ".join(
+            [f'"Old {i}" <old{i}@agency.gov>' for i in range(10)]
+            + [f'"New {i}" <new{i}@agency.gov>' for i in range(10)]
+        )
+        with self.assertNumQueries(3):
+            emails = EmailAddress.objects.fetch_many(header)
+        assert [e.email for e in emails[8:12]] == [
+            "old8@agency.gov",
+            "old9@agency.gov",
+            "new0@agency.gov",
+            "new1@agency.gov",
+        ]
+        assert all(e.pk for e in emails)
+        assert EmailAddress.objects.get(email="new3@agency.gov").name == "New 3"
+
+    def test_fetch_name(self):
+        """Names are only written when they change"""
+        EmailAddress.objects.create(email="a@a.com", name="A")
+        with self.assertNumQueries(1):
+            assert EmailAddress.objects.fetch('"A" <a@a.com>').name == "A"
+        EmailAddress.objects.fetch('"Aye" <a@a.com>')
+        assert EmailAddress.objects.get(email="a@a.com").name == "Aye"
+
+    def test_address_cache(self):
+        """The address cache is bounded, least recently used first"""
+        cache = AddressCache(maxsize=2)
+        emails = [
+            EmailAddress.objects.create(email=f"{i}@a.com", name=str(i))
+            for i in range(3)
+        ]
+        cache.set_many(emails[:2])
+        assert cache.get("0@a.com") == emails[0]
+        cache.set_many(emails[2:])
+        assert cache.get("1@a.com") is None
+        assert cache.get("0@a.com").name == "0"
+        cache.discard("0@a.com")
+        assert cache.get("0@a.com") is None
+
     def test_allowed(self):
         """Test allowed email function"""
         foia = FOIARequestFactory(
@@ -66,6 +109,33 @@ class TestEmailAddress(TestCase):
         # non foia test - any agency email
         assert EmailAddress.objects.fetch("main@agency.com").allowed()
 
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_allowed_cached(self):
+        """Agency addresses and whitelisted domains are cached until they change"""
+        foia = FOIARequestFactory(agency__email__email__email="main@agency.com")
+        WhitelistDomain.objects.create(domain="whitehat.edu")
+        agency_email = EmailAddress.objects.fetch("foo@agency.com")
+        white_email = EmailAddress.objects.fetch("foo@WhiteHat.edu")
+        assert not agency_email.allowed(foia)
+        assert white_email.allowed(foia)
+
+        with self.assertNumQueries(1):
+            # only the request's cc emails are not cached
+            assert not agency_email.allowed(foia)
+        with self.assertNumQueries(1):
+            assert white_email.allowed(foia)
+        with self.assertNumQueries(0):
+            assert EmailAddress(email="any@domain.ma.us").allowed(foia)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AgencyEmailFactory(agency=foia.agency, email=agency_email)
+        assert agency_email.allowed(foia)
+        with self.captureOnCommitCallbacks(execute=True):
+            foia.agency.emails.remove(agency_email)
+        assert not agency_email.allowed(foia)
+
     def test_domain(self):
         """Test the domain method"""
         assert EmailAddress.objects.fetch("a@a.com").domain == "a.com"
@@ -0,0 +1,198 @@
+"""
+Mixins for APIv2 viewsets
+"""
+
+# Django
+from django.http.response import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+# Standard Library
+from datetime import datetime, time
+from itertools import islice
+
+# Third Party
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.encoders import JSONEncoder
+
+# MuckRock
+from muckrock.core.serializers import get_requested_fields
+from muckrock.core.utils import get_etag, get_not_modified, set_validators
+
+
+class EagerLoadingMixin:
+    """
+    Mixin for APIv2 viewsets to load the relations their serializer needs,
+    for only the fields which were requested.
+    """
+
+    def eager_load(self, queryset):
+        """Apply the serializer's select and prefetch related to the queryset"""
+        serializer_class = self.get_serializer_class()
+        if not hasattr(serializer_class, "setup_eager_loading"):
+            return queryset
+        return serializer_class.setup_eager_loading(
+            queryset, get_requested_fields(self.request)
+        )
+
+
+class NotModified(Exception):
+    """Raised to answer a conditional GET with a 304 partway through a view"""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    Mixin for APIv2 viewsets to answer conditional GETs with a 304 before
+    anything is serialized.
+
+    The validators are built from the `modified_fields` timestamps, looked up
+    for the single object on retrieves.  On lists, they are built from the
+    timestamps of the rows on the page, once it has been fetched, along with
+    the paginator's state, such as the total count for page numbers, but not
+    for cursors, which never count.  They also cover the user and the query
+    string, as those may change the response.
+    """
+
+    modified_fields = ()
+    validators = None
+
+    def get_validators(self, *values):
+        """Build the ETag and last modified time from the looked up values"""
+        etag = get_etag(
+            self.request.user.pk, self.request.get_full_path(), self.action, *values
+        )
+        last_modified = max(
+            (v for v in values if hasattr(v, "timestamp")), default=None
+        )
+        return etag, last_modified
+
+    def check_not_modified(self, values):
+        """Return a 304 if the client's copy is current"""
+        if values is None:
+            return None
+        self.validators = self.get_validators(*values)
+        return get_not_modified(self.request, *self.validators)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        values = (
+            self.get_queryset()
+            .select_related(None)
+            .prefetch_related(None)
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .values_list(*self.modified_fields)
+            .first()
+        )
+        not_modified = self.check_not_modified(values)
+        if not_modified is not None:
+            return not_modified
+        return super().retrieve(request, *args, **kwargs)
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None and self.action == "list":
+            values = [*self.paginator.get_page_state()]
+            for obj in page:
+                values.append(obj.pk)
+                values.extend(getattr(obj, f) for f in self.modified_fields)
+            not_modified = self.check_not_modified(values)
+            if not_modified is not None:
+                # stop the list before the page is serialized
+                raise NotModified(not_modified)
+        return page
+
+    def list(self, request, *args, **kwargs):
+        try:
+            return super().list(request, *args, **kwargs)
+        except NotModified as exc:
+            return exc.response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.validators is not None:
+            set_validators(response, *self.validators)
+        return response
+
+
+class ExportMixin:
+    """
+    Mixin for APIv2 viewsets to stream every viewable object as newline
+    delimited JSON, for mirroring our data in a single request.
+
+    Objects are read from a server side cursor in `keyset_ordering` order and
+    serialized a chunk at a time, so memory use does not grow with the
+    export.  `updated_since` limits the export to objects updated on or after
+    the given time, for incremental syncs, which by default is their
+    datetime, and may be changed by overriding `filter_updated_since`.
+    """
+
+    export_chunk_size = 500
+
+    def get_updated_since(self):
+        """Parse the `updated_since` parameter"""
+        value = self.request.query_params.get("updated_since")
+        if not value:
+            return None
+        updated_since = parse_datetime(value)
+        if updated_since is None:
+            date = parse_date(value)
+            if date is None:
+                raise ValidationError(
+                    {"updated_since": "Enter a valid date or date and time."}
+                )
+            updated_since = datetime.combine(
+                date, time(tzinfo=timezone.get_current_timezone())
+            )
+        elif timezone.is_naive(updated_since):
+            updated_since = timezone.make_aware(updated_since)
+        return updated_since
+
+    def filter_updated_since(self, queryset, updated_since):
+        """Limit the export to objects updated on or after the given time"""
+        field, _pk_field = self.keyset_ordering
+        return queryset.filter(**{f"{field}__gte": updated_since})
+
+    def iter_export(self, queryset):
+        """Serialize the queryset a chunk at a time, one object per line"""
+        encoder = JSONEncoder(ensure_ascii=False)
+        objects = queryset.iterator(chunk_size=self.export_chunk_size)
+        while True:
+            chunk = list(islice(objects, self.export_chunk_size))
+            if not chunk:
+                return
+            for data in self.get_serializer(chunk, many=True).data:
+                yield encoder.encode(data) + "\n"
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "updated_since",
+                OpenApiTypes.DATETIME,
+                description="Only export objects updated on or after this time",
+            )
+        ],
+        responses={
+            (200, "application/x-ndjson"): OpenApiResponse(
+                description="One JSON object per line, oldest first"
+            )
+        },
+    )
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def export(self, request):
+        """Stream every object as newline delimited JSON"""
+        field, pk_field = self.keyset_ordering
+        queryset = self.filter_queryset(self.get_queryset())
+        updated_since = self.get_updated_since()
+        if updated_since is not None:
+            queryset = self.filter_updated_since(queryset, updated_since)
+        queryset = queryset.order_by(field, pk_field)
+        return StreamingHttpResponse(
+            self.iter_export(queryset), content_type="application/x-ndjson"
+        )
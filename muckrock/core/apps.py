@@ -14,11 +14,14 @@ class CoreConfig(AppConfig):
     name = "muckrock.core"
 
     def ready(self):
-        """Register flatpages with Watson"""
+        """Register flatpages for searching"""
         # pylint: disable=invalid-name, import-outside-toplevel
         # Third Party
         from watson import search
 
+        # MuckRock
+        from muckrock.core import fulltext
+
         FlatPage = apps.get_model("flatpages", "FlatPage")
 
         if "//" in settings.MUCKROCK_URL:
@@ -26,3 +29,7 @@ class CoreConfig(AppConfig):
         else:
             domain = ""
         search.register(FlatPage.objects.filter(sites__domain=domain))
+        fulltext.register(
+            FlatPage.objects.filter(sites__domain=domain),
+            {"title": "A", "content": "C"},
+        )
@@ -0,0 +1,215 @@
+"""
+Postgres full text search
+
+Models register the fields to search along with their weights.  Models with a
+`search_vector` column store their vector, which is kept up to date on save
+and backfilled with the `update_search_vectors` management command, and is
+indexed with a GIN index.  Other models, such as small tables or models we do
+not control, have their vectors computed at query time.
+"""
+
+# Django
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, IntegerField, Value
+from django.db.models.signals import post_save
+
+# Standard Library
+import re
+from functools import reduce
+from operator import add
+
+# MuckRock
+from muckrock.core.models import LoadedValuesMixin
+
+CONFIG = "english"
+
+_registry = {}
+
+
+class Searchable:
+    """A registered model, its searchable queryset and weighted fields"""
+
+    def __init__(self, queryset, fields):
+        self.queryset = queryset
+        self.model = queryset.model
+        self.fields = fields
+        self.stored = any(
+            f.name == "search_vector" for f in self.model._meta.get_fields()
+        )
+
+    def vector(self):
+        """The weighted search vector expression for this model"""
+        return reduce(
+            add,
+            [
+                SearchVector(field, weight=weight, config=CONFIG)
+                for field, weight in self.fields.items()
+            ],
+        )
+
+    def with_vector(self, queryset):
+        """Make `search_vector` available on the queryset"""
+        if self.stored:
+            return queryset
+        return queryset.annotate(search_vector=self.vector())
+
+
+def register(queryset, fields):
+    """Register a model for searching
+
+    `queryset` limits what is shown in site wide search, and `fields` maps
+    field names to their weights, from A (most important) to D
+    """
+    searchable = Searchable(queryset, fields)
+    _registry[searchable.model] = searchable
+    if searchable.stored:
+        post_save.connect(
+            _update_vector,
+            sender=searchable.model,
+            dispatch_uid=f"muckrock.core.fulltext.{searchable.model._meta.label}",
+        )
+
+
+def is_registered(model):
+    """Is this model registered for searching"""
+    return model in _registry
+
+
+def is_stored(model):
+    """Does this model store its search vector"""
+    return _registry[model].stored
+
+
+def get_registered_models():
+    """All models registered for searching"""
+    return list(_registry)
+
+
+def get_query(query, prefix=False):
+    """Parse a user's query
+
+    Web search syntax is supported for full searches, while prefix searches
+    match any word beginning with each of the given words, for autocompletes
+    """
+    if prefix:
+        words = re.findall(r"\w+", query)
+        if not words:
+            return None
+        return SearchQuery(
+            " & ".join(f"{word}:*" for word in words), search_type="raw", config=CONFIG
+        )
+    return SearchQuery(query, search_type="websearch", config=CONFIG)
+
+
+def filter_queryset(queryset, query, prefix=False, ranked=True):
+    """Filter a queryset of a registered model to those matching the query
+
+    If `ranked`, the results are ordered by relevance, with the rank
+    available as `search_rank`
+    """
+    searchable = _registry[queryset.model]
+    search_query = get_query(query, prefix)
+    if search_query is None:
+        return queryset.none()
+    queryset = searchable.with_vector(queryset).filter(search_vector=search_query)
+    if ranked:
+        queryset = queryset.annotate(
+            search_rank=SearchRank(F("search_vector"), search_query)
+        ).order_by("-search_rank")
+    return queryset
+
+
+def search(query, models=None):
+    """Search across registered models
+
+    Returns a queryset of content type ID, object ID and rank, most relevant
+    first, suitable for paginating.  Use `load_results` to fetch the objects.
+    """
+    search_query = get_query(query)
+    querysets = []
+    for model, searchable in _registry.items():
+        if models is not None and model not in models:
+            continue
+        content_type = ContentType.objects.get_for_model(model)
+        querysets.append(
+            searchable.with_vector(searchable.queryset)
+            .filter(search_vector=search_query)
+            .annotate(
+                search_content_type=Value(content_type.pk, output_field=IntegerField()),
+                search_rank=SearchRank(F("search_vector"), search_query),
+            )
+            .values_list("search_content_type", "pk", "search_rank")
+            .order_by()
+        )
+    if not querysets:
+        return ContentType.objects.none()
+    return querysets[0].union(*querysets[1:], all=True).order_by("-search_rank")
+
+
+class SearchResult:
+    """A single site search result"""
+
+    def __init__(self, obj, content_type, rank):
+        self.object = obj
+        self.content_type = content_type
+        self.rank = rank
+        self.url = obj.get_absolute_url() if hasattr(obj, "get_absolute_url") else ""
+
+    def __str__(self):
+        return str(self.object)
+
+
+def load_results(rows):
+    """Load the objects for a page of rows returned from `search`"""
+    rows = list(rows)
+    pks = {}
+    for content_type_id, pk, _rank in rows:
+        pks.setdefault(content_type_id, []).append(pk)
+    objects = {}
+    for content_type_id, type_pks in pks.items():
+        content_type = ContentType.objects.get_for_id(content_type_id)
+        model = content_type.model_class()
+        for pk, obj in model.objects.in_bulk(type_pks).items():
+            objects[content_type_id, pk] = (obj, content_type)
+    return [
+        SearchResult(*objects[content_type_id, pk], rank)
+        for content_type_id, pk, rank in rows
+        if (content_type_id, pk) in objects
+    ]
+
+
+def update_vectors(model, pks=None, batch_size=1000):
+    """Update the stored search vectors for a model, in batches
+
+    Returns the number of rows updated
+    """
+    searchable = _registry[model]
+    if pks is None:
+        pks = model.objects.order_by("pk").values_list("pk", flat=True)
+    pks = list(pks)
+    updated = 0
+    for i in range(0, len(pks), batch_size):
+        updated += model.objects.filter(pk__in=pks[i : i + batch_size]).update(
+            search_vector=searchable.vector()
+        )
+    return updated
+
+
+def _update_vector(sender, instance, created, update_fields=None, **kwargs):
+    """Update a single object's search vector after it is saved
+
+    Saves which did not change any of the searched fields are skipped, for
+    models using `LoadedValuesMixin`, which know which of their fields changed
+    """
+    # pylint: disable=unused-argument
+    fields = set(_registry[sender].fields)
+    if update_fields is not None and not set(update_fields) & fields:
+        return
+    if (
+        not created
+        and isinstance(instance, LoadedValuesMixin)
+        and not instance.get_changed_fields(fields)
+    ):
+        return
+    update_vectors(sender, [instance.pk])
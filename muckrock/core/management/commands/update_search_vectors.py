@@ -0,0 +1,29 @@
+"""Backfill the stored full text search vectors"""
+
+# Django
+from django.core.management.base import BaseCommand
+
+# MuckRock
+from muckrock.core import fulltext
+
+
+class Command(BaseCommand):
+    """Update the stored search vectors for registered models"""
+
+    help = "Update the stored full text search vectors, optionally for given models"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models", nargs="*", help="Model labels to update, such as foia.FOIARequest"
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **kwargs):
+        labels = {label.lower() for label in kwargs["models"]}
+        for model in fulltext.get_registered_models():
+            if not fulltext.is_stored(model):
+                continue
+            if labels and model._meta.label_lower not in labels:
+                continue
+            updated = fulltext.update_vectors(model, batch_size=kwargs["batch_size"])
+            self.stdout.write(f"{model._meta.label}: {updated} search vectors updated")
@@ -39,6 +39,48 @@ class NullIf(Func):
     function = "NULLIF"
 
 
+class LoadedValuesMixin:
+    """
+    Remember the field values a model instance was loaded or last saved with,
+    so that a save can tell which fields changed without querying for them
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # pylint: disable=protected-access
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = {
+            f.attname: self.__dict__[f.attname]
+            for f in self._meta.concrete_fields
+            if f.attname in self.__dict__
+        }
+
+    def get_loaded_value(self, field):
+        """The value of the field when loaded, or None if it is not known"""
+        return getattr(self, "_loaded_values", {}).get(field)
+
+    def get_changed_fields(self, fields):
+        """Which of the given fields have changed since the instance was loaded
+
+        Every field counts as changed on an instance not loaded from the
+        database, and deferred fields count as changed once they are set
+        """
+        loaded = getattr(self, "_loaded_values", None)
+        if loaded is None:
+            return set(fields)
+        return {
+            f
+            for f in fields
+            if (f in loaded and loaded[f] != getattr(self, f))
+            or (f not in loaded and f in self.__dict__)
+        }
+
+
 class SingletonModel(Model):
     """
     Abstract base class for singleton models.
@@ -1,12 +1,37 @@
 """
-Provides a pagination class for the API
+Provides pagination classes for the API and list views
 """
 
 # Django
 from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.template import loader
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+# Standard Library
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
 
 # Third Party
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _positive_int(integer_string, strict=False, cutoff=None):
+    """Cast a string to a positive integer, capped at the cutoff if given"""
+    value = int(integer_string)
+    if value < 0 or (value == 0 and strict):
+        raise ValueError()
+    if cutoff:
+        return min(value, cutoff)
+    return value
 
 
 class StandardPagination(PageNumberPagination):
@@ -15,3 +40,277 @@ class StandardPagination(PageNumberPagination):
     page_size = 50
     max_page_size = settings.MAX_PAGE_SIZE
     page_size_query_param = "page_size"
+
+    def get_page_state(self):
+        """What the response depends on, besides the rows on the page"""
+        return (self.page.paginator.count,)
+
+
+class KeysetPagination(BasePagination):
+    """Forward only pagination on a (datetime, id) key, for syncing large lists
+
+    The view sets `keyset_ordering` to the datetime field and the primary key.
+    Rows are returned oldest first, with rows missing a datetime last, and
+    each page is fetched by filtering on the key of the last row of the
+    previous page, which is encoded in the `cursor` parameter.  Nothing is
+    counted and there is no offset, so every page costs the same to fetch.
+    """
+
+    page_size = StandardPagination.page_size
+    max_page_size = StandardPagination.max_page_size
+    page_size_query_param = StandardPagination.page_size_query_param
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+    template = "rest_framework/pagination/previous_and_next.html"
+
+    def __init__(self):
+        self.base_url = None
+        self.page_size_value = None
+        self.next_position = None
+
+    def get_page_size(self, request):
+        """Get the page size, capped at the maximum"""
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def encode_cursor(self, position):
+        """Encode a (datetime, pk) position as a cursor"""
+        value, pk = position
+        value = value.isoformat() if value is not None else None
+        return urlsafe_b64encode(json.dumps([value, pk]).encode()).decode()
+
+    def decode_cursor(self, request):
+        """Decode the position from the cursor parameter, if there is one"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            value, pk = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            if value is not None:
+                value = parse_datetime(value)
+                if value is None:
+                    raise ValueError
+            return value, int(pk)
+        except (BinasciiError, TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        field, pk_field = view.keyset_ordering
+        self.base_url = request.build_absolute_uri()
+        self.page_size_value = self.get_page_size(request)
+        self.display_page_controls = self.template is not None
+        position = self.decode_cursor(request)
+        queryset = queryset.order_by(field, pk_field)
+        limit = self.page_size_value + 1
+
+        if position is None:
+            # the first page
+            results = list(queryset.filter(**{f"{field}__isnull": False})[:limit])
+            nulls = Q(**{f"{field}__isnull": True})
+        elif position[0] is not None:
+            # the redundant >= lets the datetime index bound the scan
+            value, pk = position
+            results = list(
+                queryset.filter(**{f"{field}__gte": value}).filter(
+                    Q(**{f"{field}__gt": value}) | Q(**{pk_field + "__gt": pk})
+                )[:limit]
+            )
+            nulls = Q(**{f"{field}__isnull": True})
+        else:
+            # we have moved on to the rows without a datetime
+            results = []
+            nulls = Q(**{f"{field}__isnull": True, f"{pk_field}__gt": position[1]})
+
+        if len(results) < limit and queryset.model._meta.get_field(field).null:
+            results.extend(queryset.filter(nulls)[: limit - len(results)])
+
+        if len(results) == limit:
+            del results[-1]
+            last = results[-1]
+            self.next_position = (getattr(last, field), getattr(last, pk_field))
+        else:
+            self.next_position = None
+        return results
+
+    def get_page_state(self):
+        """What the response depends on, besides the rows on the page"""
+        return (self.next_position is not None,)
+
+    def get_next_link(self):
+        """The link to the next page, if there is one"""
+        if self.next_position is None:
+            return None
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            self.encode_cursor(self.next_position),
+        )
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_html_context(self):
+        """Links for the browsable API, which can only go forward"""
+        return {"previous_url": None, "next_url": self.get_next_link()}
+
+    def to_html(self):
+        return loader.get_template(self.template).render(self.get_html_context())
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class SelectablePagination(BasePagination):
+    """Page numbers by default, or keyset pagination if the client asks for it
+
+    Clients pass `pagination=cursor` for the first page, after which the next
+    links carry the cursor.  Page number pagination counts the full list on
+    every page and gets slower the deeper the page, so clients walking the
+    whole list should use the cursor.
+    """
+
+    selector_query_param = "pagination"
+
+    def __init__(self):
+        self.paginator = None
+
+    @property
+    def display_page_controls(self):
+        """Show the controls of the pagination chosen for this request"""
+        return self.paginator is not None and self.paginator.display_page_controls
+
+    def use_keyset(self, request, view):
+        """Should this request use keyset pagination"""
+        return getattr(view, "keyset_ordering", None) is not None and (
+            request.query_params.get(self.selector_query_param) == "cursor"
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset(request, view):
+            self.paginator = KeysetPagination()
+        else:
+            self.paginator = StandardPagination()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_page_state(self):
+        """What the response depends on, besides the rows on the page"""
+        return self.paginator.get_page_state()
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_paginated_response_schema(self, schema):
+        return StandardPagination().get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = StandardPagination().get_schema_operation_parameters(view)
+        if getattr(view, "keyset_ordering", None) is None:
+            return parameters
+        return parameters + [
+            {
+                "name": self.selector_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to `cursor` to page through the results with "
+                "a cursor instead of page numbers.  Results are then ordered "
+                "oldest first, no count is returned and the next link carries "
+                "the cursor.",
+                "schema": {"type": "string", "enum": ["cursor"]},
+            },
+            {
+                "name": KeysetPagination.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+        ]
+
+
+def estimate_count(queryset):
+    """Get the query planner's estimate of the number of rows in a queryset"""
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]["Plan Rows"]
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator which avoids counting the full list on every page load
+
+    Exact counts are cached under `count_key` for `count_timeout` seconds.
+    If `estimate` is set, the planner's estimate is used instead when it is
+    at least `estimate_threshold`, as an exact count is slow for large lists
+    and not needed to be precise.  `estimated` is set when that happens, so
+    the template may display the count as approximate.
+    """
+
+    def __init__(
+        self,
+        object_list,
+        per_page,
+        count_key,
+        *,
+        count_timeout=60,
+        estimate=False,
+        estimate_threshold=10000,
+        **kwargs,
+    ):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+        self.count_timeout = count_timeout
+        self.estimate = estimate
+        self.estimate_threshold = estimate_threshold
+        self.estimated = False
+
+    @cached_property
+    def count(self):
+        """Get the cached or estimated number of objects"""
+        if self.estimate and connection.vendor == "postgresql":
+            estimate = estimate_count(self.object_list)
+            if estimate >= self.estimate_threshold:
+                self.estimated = True
+                return estimate
+        return cache.get_or_set(
+            self.count_key,
+            lambda: Paginator.count.func(self),
+            self.count_timeout,
+        )
@@ -0,0 +1,53 @@
+"""
+Shared serializer helpers for the API
+"""
+
+FIELDS_QUERY_PARAM = "fields"
+
+
+def get_requested_fields(request):
+    """The field names listed in the `fields` parameter, or None for all fields"""
+    if request is None or request.method != "GET":
+        return None
+    fields = request.query_params.get(FIELDS_QUERY_PARAM)
+    if not fields:
+        return None
+    return {field.strip() for field in fields.split(",") if field.strip()}
+
+
+class SparseFieldsMixin:
+    """Only serialize the fields listed in the `fields` parameter, if given
+
+    The serializer's `Meta` may declare `select_related` and
+    `prefetch_related`, mapping field names to the relations those fields need,
+    which `setup_eager_loading` applies to a queryset for the fields which will
+    actually be serialized.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = get_requested_fields(self.context.get("request"))
+        if fields is not None:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None):
+        """Load the relations needed to serialize the given fields"""
+        selects = [
+            relation
+            for name, relations in getattr(cls.Meta, "select_related", {}).items()
+            if fields is None or name in fields
+            for relation in relations
+        ]
+        prefetches = [
+            relation
+            for name, relations in getattr(cls.Meta, "prefetch_related", {}).items()
+            if fields is None or name in fields
+            for relation in relations
+        ]
+        if selects:
+            queryset = queryset.select_related(*dict.fromkeys(selects))
+        if prefetches:
+            queryset = queryset.prefetch_related(*dict.fromkeys(prefetches))
+        return queryset
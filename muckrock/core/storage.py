@@ -5,6 +5,8 @@ Storage classes that extend S3
 # Django
 from django.conf import settings
 from django.contrib.staticfiles.storage import StaticFilesStorage
+from django.utils.encoding import filepath_to_uri
+from django.utils.functional import cached_property
 
 # Third Party
 from storages.backends.s3boto3 import S3Boto3Storage
@@ -45,11 +47,33 @@ class MediaRootS3BotoStorage(S3Boto3Storage):
     querystring_auth = settings.AWS_MEDIA_QUERYSTRING_AUTH
     custom_domain = settings.AWS_MEDIA_CUSTOM_DOMAIN
 
+    @cached_property
+    def url_prefix(self):
+        """The bucket URL which unsigned links start with"""
+        url = self.bucket.meta.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket.name, "Key": "_"}
+        )
+        return self._strip_signing_parameters(url)[:-1]
+
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        """Unsigned links only differ by their key, so rather than having boto
+        generate and then strip a signed link for every file, generate the
+        bucket URL once and append the key to it
+        """
+        if self.querystring_auth or self.custom_domain or parameters or http_method:
+            return super().url(name, parameters, expire, http_method)
+        name = self._normalize_name(self._clean_name(name))
+        return self.url_prefix + filepath_to_uri(name)
+
 
 class PrivateMediaRootS3BotoStorage(MediaRootS3BotoStorage):
     """S3 storage backend that always uploads files as private"""
 
     default_acl = "private"
+    # private files may only be accessed through signed links, which the
+    # custom domain would not sign
+    querystring_auth = True
+    custom_domain = None
 
 
 class QueuedS3DietStorage:
@@ -6,12 +6,14 @@ Tests for site level functionality and helper functions for application tests
 from django.conf import settings
 from django.contrib.sites.models import Site
 from django.core.exceptions import ValidationError
-from django.test import Client, RequestFactory, TestCase
+from django.test import Client, RequestFactory, TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 
 # Standard Library
 import hashlib
 import logging
+from datetime import timedelta
 from unittest import mock
 from unittest.mock import ANY, Mock, patch
 
@@ -21,6 +23,7 @@ from actstream.models import Action
 
 # MuckRock
 from muckrock.accounts.models import Notification
+from muckrock.core import fulltext
 from muckrock.core.context_processors import banner
 from muckrock.core.factories import (
     AgencyFactory,
@@ -33,12 +36,15 @@ from muckrock.core.fields import EmailsListField
 from muckrock.core.forms import NewsletterSignupForm
 from muckrock.core.helpers import get_allowed
 from muckrock.core.models import HomePage
+from muckrock.core.pagination import CachedCountPaginator
 from muckrock.core.templatetags import tags
 from muckrock.core.test_utils import http_get_response, http_post_response
 from muckrock.core.utils import new_action, notify, parse_header
 from muckrock.core.views import NewsletterSignupView
 from muckrock.crowdsource.factories import CrowdsourceResponseFactory
 from muckrock.foia.factories import FOIARequestFactory
+from muckrock.foia.models import FOIARequest
+from muckrock.foia.views.list import RequestList
 from muckrock.task.factories import (
     FlaggedTaskFactory,
     NewAgencyTaskFactory,
@@ -133,6 +139,105 @@ class TestUnit(TestCase):
         field.clean("a@example.com,an.email@foo.net", model_instance)
 
 
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestCachedCountPaginator(TestCase):
+    """List counts are cached per normalized set of filters"""
+
+    def test_count_cached(self):
+        """The count is only queried once while it is cached"""
+        FOIARequestFactory.create_batch(3)
+        queryset = FOIARequest.objects.order_by("pk")
+        assert CachedCountPaginator(queryset, 2, count_key="test").count == 3
+        FOIARequestFactory()
+        with self.assertNumQueries(0):
+            paginator = CachedCountPaginator(queryset, 2, count_key="test")
+            assert paginator.count == 3
+            assert paginator.num_pages == 2
+            assert not paginator.estimated
+
+    def test_count_key(self):
+        """Paging and sorting do not change the count key, filters do"""
+        user = UserFactory()
+
+        def count_key(query):
+            view = RequestList()
+            view.setup(RequestFactory().get(f"/foi/list/?{query}"))
+            view.request.user = user
+            return view.get_count_key()
+
+        assert count_key("status=done&page=2") == count_key("sort=title&status=done")
+        assert count_key("status=done&agency=") == count_key("status=done")
+        assert count_key("status=done") != count_key("status=ack")
+
+
+class TestFullTextSearch(TestCase):
+    """Registered models are searched by their stored vectors"""
+
+    def test_filter_queryset(self):
+        """Vectors are kept up to date on save and matches are ranked"""
+        FOIARequestFactory(title="Police budget")
+        FOIARequestFactory(title="Police use of force policy")
+        FOIARequestFactory(title="School lunches")
+        titles = [
+            foia.title
+            for foia in fulltext.filter_queryset(FOIARequest.objects.all(), "police")
+        ]
+        assert sorted(titles) == ["Police budget", "Police use of force policy"]
+        assert list(
+            fulltext.filter_queryset(FOIARequest.objects.all(), "lunch").values_list(
+                "title", flat=True
+            )
+        ) == ["School lunches"]
+
+    def test_prefix(self):
+        """Prefix searches match the start of words, for autocompletes"""
+        FOIARequestFactory(title="Police budget")
+        queryset = FOIARequest.objects.all()
+        assert fulltext.filter_queryset(queryset, "budg", prefix=True).exists()
+        assert not fulltext.filter_queryset(queryset, "budg").exists()
+        assert not fulltext.filter_queryset(queryset, "...", prefix=True).exists()
+
+    def test_update_vectors(self):
+        """The backfill fills in missing vectors"""
+        foia = FOIARequestFactory(title="Police budget")
+        FOIARequest.objects.update(search_vector=None)
+        assert fulltext.update_vectors(FOIARequest) == 1
+        assert (
+            fulltext.filter_queryset(FOIARequest.objects.all(), "budget").get() == foia
+        )
+
+    def test_unchanged_save(self):
+        """Saves which do not change the searched fields keep the vector"""
+        foia = FOIARequest.objects.get(pk=FOIARequestFactory(title="Police budget").pk)
+        with patch("muckrock.core.fulltext.update_vectors") as mock_update:
+            foia.status = "done"
+            foia.save()
+            mock_update.assert_not_called()
+            foia.title = "School budget"
+            foia.save()
+            mock_update.assert_called_once_with(FOIARequest, [foia.pk])
+
+    def test_list_ranked(self):
+        """List views order search results by rank unless a sort is given"""
+        ranked = FOIARequestFactory(title="Police police police")
+        newer = FOIARequestFactory(title="Police budget")
+        FOIARequest.objects.filter(pk=ranked.pk).update(
+            datetime_updated=timezone.now() - timedelta(days=1)
+        )
+        FOIARequest.objects.filter(pk=newer.pk).update(datetime_updated=timezone.now())
+
+        def sort(query):
+            view = RequestList()
+            view.setup(RequestFactory().get(f"/foi/list/?{query}"))
+            queryset = fulltext.filter_queryset(FOIARequest.objects.all(), "police")
+            return list(view.sort_queryset(queryset))
+
+        assert sort("q=police") == [ranked, newer]
+        assert sort("q=police&sort=date_updated") == [newer, ranked]
+
+
 class TestNewsletterSignupView(TestCase):
     """By submitting an email, users can subscribe to our MailChimp newsletter list."""
 
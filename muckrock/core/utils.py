@@ -8,6 +8,8 @@ from django.contrib.auth.models import Group, User
 from django.core.cache import cache, caches
 from django.template import Context
 from django.template.loader_tags import BlockNode, ExtendsNode
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 
 # Standard Library
 import datetime
@@ -468,3 +470,35 @@ def get_dc_client():
         f"{existing_ua} {settings.SERVICE_USER_AGENT}".strip()
     )
     return client
+
+
+def get_etag(*parts):
+    """A weak ETag identifying a response by everything it depends on"""
+    return 'W/"%s"' % md5(repr(parts).encode("utf8")).hexdigest()
+
+
+def get_not_modified(request, etag, last_modified=None):
+    """Get a 304 response if the client's copy is still current, else None"""
+    if request.method not in ("GET", "HEAD"):
+        return None
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+def set_validators(response, etag, last_modified=None):
+    """Add the validators to a full response, so the client may revalidate it
+
+    The response is marked no-cache so clients revalidate every time, rather
+    than guessing how long it stays fresh from the Last-Modified header
+    """
+    if response.status_code == 200:
+        response.headers.setdefault("ETag", etag)
+        if last_modified:
+            response.headers.setdefault(
+                "Last-Modified", http_date(last_modified.timestamp())
+            )
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -24,13 +24,16 @@ from django.views.generic import FormView, ListView, TemplateView, View
 
 # Standard Library
 import csv
+import json
 import logging
 import operator
 import sys
 from functools import reduce
+from hashlib import md5
 
 # Third Party
 import stripe
+from constance import config
 from dal import autocomplete
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.pagination import CursorPagination
@@ -49,8 +52,10 @@ from muckrock.accounts.utils import (
     stripe_get_customer,
 )
 from muckrock.agency.models import Agency
+from muckrock.core import fulltext
 from muckrock.core.forms import DonateForm, NewsletterSignupForm, SearchForm
 from muckrock.core.models import HomePage
+from muckrock.core.pagination import CachedCountPaginator
 from muckrock.core.utils import stripe_retry_on_error
 from muckrock.foia.models import FOIAFile, FOIARequest
 from muckrock.jurisdiction.models import Jurisdiction
@@ -83,6 +88,8 @@ class OrderedSortMixin:
 
         We need to make sure the field to sort by is allowed.
         If the field isn't allowed, return the default order queryset.
+        Full text search results are ordered by relevance unless a sort
+        is given.
         """
         sort = self.request.GET.get("sort", self.default_sort)
         order = self.request.GET.get("order", self.default_order)
@@ -91,6 +98,11 @@ class OrderedSortMixin:
             sort = F(sort).desc()
         else:
             sort = F(sort).asc()
+        if (
+            "sort" not in self.request.GET
+            and "search_rank" in queryset.query.annotations
+        ):
+            return queryset.order_by(F("search_rank").desc(), sort)
         return queryset.order_by(sort)
 
     def get_queryset(self):
@@ -150,6 +162,13 @@ class PaginationMixin:
     paginate_by = 25
     min_per_page = 5
     max_per_page = 100
+    # cache the total count instead of counting on every page load
+    cache_count = False
+    count_timeout = 60
+    # estimate the count from the query plan for large unfiltered lists
+    estimate_count = False
+    # query parameters which do not change the number of results
+    count_ignore_params = ("page", "per_page", "sort", "order")
 
     def get_paginate_by(self, queryset):
         """Allows paginate_by to be set by a query argument."""
@@ -166,6 +185,38 @@ class PaginationMixin:
         context["per_page"] = self.get_paginate_by(self.get_queryset())
         return context
 
+    def get_count_params(self):
+        """Get the normalized query parameters which affect the count"""
+        return sorted(
+            (key, value)
+            for key, values in self.request.GET.lists()
+            for value in values
+            if value and key not in self.count_ignore_params
+        )
+
+    def get_count_key(self):
+        """Get the cache key for the count of this list for this user"""
+        user = self.request.user
+        scope = user.pk if user.is_authenticated else "anonymous"
+        key = json.dumps(
+            [type(self).__name__, self.kwargs, scope, self.get_count_params()],
+            sort_keys=True,
+        )
+        return "list_count:{}".format(md5(key.encode("utf8")).hexdigest())
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        """Use a paginator with a cached or estimated count if enabled"""
+        if not self.cache_count:
+            return super().get_paginator(queryset, per_page, **kwargs)
+        return CachedCountPaginator(
+            queryset,
+            per_page,
+            count_key=self.get_count_key(),
+            count_timeout=self.count_timeout,
+            estimate=self.estimate_count and not self.get_count_params(),
+            **kwargs,
+        )
+
     def paginate_queryset(self, queryset, page_size):
         """Redirect to last page if over the limit"""
         paginator = self.get_paginator(
@@ -217,7 +268,8 @@ class CursorPaginationMixin(PaginationMixin):
 class ModelSearchMixin:
     """
     The ModelSearchMixin allows a queryset provided by a list view to be
-    searched, using the watson library.
+    searched, using Postgres full text search if it is enabled and the model
+    is registered for it, or the watson library otherwise.
     """
 
     search_form = SearchForm
@@ -233,7 +285,13 @@ class ModelSearchMixin:
         """
         queryset = super().get_queryset()
         query = self.get_query()
-        if query:
+        if (
+            query
+            and config.ENABLE_FULLTEXT_SEARCH
+            and fulltext.is_registered(queryset.model)
+        ):
+            queryset = fulltext.filter_queryset(queryset, query)
+        elif query:
             queryset = watson.filter(queryset.model, query)
         return queryset
 
@@ -312,8 +370,17 @@ class SearchView(SearchMixin, MRListView):
 
     def get_queryset(self):
         """Select related content types"""
+        if config.ENABLE_FULLTEXT_SEARCH and self.query:
+            return fulltext.search(self.query)
         return super().get_queryset().order_by("id").select_related("content_type")
 
+    def get_context_data(self, **kwargs):
+        """Load the objects for the current page of full text results"""
+        context = super().get_context_data(**kwargs)
+        if config.ENABLE_FULLTEXT_SEARCH and self.query:
+            context["object_list"] = fulltext.load_results(context["object_list"])
+        return context
+
 
 class NewsletterSignupView(View):
     """Allows users to signup for our MailChimp newsletter."""
@@ -655,6 +722,8 @@ class MRAutocompleteView(autocomplete.Select2QuerySetView):
     search_fields = []
     split_words = None
     template = None
+    # search the stored full text vector by word prefix, if it is enabled
+    full_text_search = False
 
     def get_queryset(self):
         """Get the queryset"""
@@ -691,6 +760,14 @@ class MRAutocompleteView(autocomplete.Select2QuerySetView):
             else:
                 return "{}__icontains".format(field_name)
 
+        if (
+            self.full_text_search
+            and search_term
+            and config.ENABLE_FULLTEXT_SEARCH
+            and fulltext.is_registered(queryset.model)
+        ):
+            return fulltext.filter_queryset(queryset, search_term, prefix=True)
+
         search_fields = self.get_search_fields()
         if search_fields and search_term:
             orm_lookups = [
@@ -11,3 +11,9 @@ class CrowdsourceConfig(AppConfig):
     """Crowdsource config"""
 
     name = "muckrock.crowdsource"
+
+    def ready(self):
+        """Connect the signal handlers"""
+        # pylint: disable=import-outside-toplevel
+        # MuckRock
+        import muckrock.crowdsource.signals  # pylint: disable=unused-import
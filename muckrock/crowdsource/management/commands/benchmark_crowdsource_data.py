@@ -0,0 +1,123 @@
+"""Compare picking crowdsource data by aggregating responses against sampling"""
+
+# Django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from django.db.models import Case, Sum, Value, When
+from django.test.utils import CaptureQueriesContext
+
+# Standard Library
+import time
+from random import choice
+
+# MuckRock
+from muckrock.crowdsource.models import (
+    Crowdsource,
+    CrowdsourceData,
+    CrowdsourceResponse,
+)
+
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    """Benchmark picking the data to show for an assignment
+
+    The data is created in a transaction which is rolled back afterwards
+    """
+
+    help = "Time picking a datum to show from a large generated assignment"
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("--rows", type=int, default=500000)
+        parser.add_argument("--data-limit", type=int, default=3)
+        parser.add_argument(
+            "--closed",
+            type=float,
+            default=0.5,
+            help="The fraction of the data which already has enough responses",
+        )
+        parser.add_argument("--iterations", type=int, default=5)
+
+    def handle(self, *args, **kwargs):
+        user = User.objects.get(username=kwargs["username"])
+        with transaction.atomic():
+            crowdsource = self._generate(user, kwargs)
+            cases = [
+                ("Aggregate", self._legacy_choice),
+                ("Sampled", self._sampled_choice),
+            ]
+            for name, pick in cases:
+                start = time.perf_counter()
+                for _ in range(kwargs["iterations"]):
+                    with CaptureQueriesContext(connection) as queries:
+                        datum = pick(crowdsource, user)
+                elapsed = (time.perf_counter() - start) / kwargs["iterations"]
+                self.stdout.write(
+                    f"{name}: picked {datum.pk if datum else None}, "
+                    f"{len(queries)} queries, {elapsed * 1000:.1f}ms per pick"
+                )
+            transaction.set_rollback(True)
+
+    def _generate(self, user, kwargs):
+        """Create an assignment with the given number of data rows"""
+        crowdsource = Crowdsource.objects.create(
+            title="Benchmark",
+            slug="benchmark",
+            user=user,
+            status="open",
+            data_limit=kwargs["data_limit"],
+        )
+        rows = kwargs["rows"]
+        for start in range(0, rows, BATCH_SIZE):
+            CrowdsourceData.objects.bulk_create(
+                CrowdsourceData(crowdsource=crowdsource, url=f"https://example.com/{i}")
+                for i in range(start, min(start + BATCH_SIZE, rows))
+            )
+        closed = list(
+            crowdsource.data.order_by("pk").values_list("pk", flat=True)[
+                : int(rows * kwargs["closed"])
+            ]
+        )
+        for start in range(0, len(closed), BATCH_SIZE):
+            CrowdsourceResponse.objects.bulk_create(
+                CrowdsourceResponse(
+                    crowdsource=crowdsource,
+                    data_id=data_id,
+                    ip_address=f"10.0.0.{i}",
+                )
+                for data_id in closed[start : start + BATCH_SIZE]
+                for i in range(kwargs["data_limit"])
+            )
+        # bulk creation bypasses the signals which maintain the counts
+        crowdsource.data.update_response_counts()
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE crowdsource_crowdsourcedata")
+            cursor.execute("ANALYZE crowdsource_crowdsourceresponse")
+        self.stdout.write(
+            f"Generated {rows} data rows, {len(closed)} with enough responses"
+        )
+        return crowdsource
+
+    def _legacy_choice(self, crowdsource, user):
+        """Count every datum's responses and choose from all of the choices"""
+        choices = list(
+            crowdsource.data.annotate(
+                count=Sum(
+                    Case(
+                        When(responses__number=1, then=Value(1)),
+                        default=0,
+                        output_field=models.IntegerField(),
+                    )
+                )
+            )
+            .filter(count__lt=crowdsource.data_limit)
+            .exclude(responses__user=user)
+        )
+        return choice(choices) if choices else None
+
+    def _sampled_choice(self, crowdsource, user):
+        """Sample from the open data index"""
+        return crowdsource.get_data_to_show(user, None)
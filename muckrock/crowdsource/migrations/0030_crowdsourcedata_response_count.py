@@ -0,0 +1,68 @@
+# Generated by Django 5.2.15 on 2026-10-18 19:05
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.models import Case, Count, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+
+def count_responses(apps, schema_editor):
+    Crowdsource = apps.get_model("crowdsource", "Crowdsource")
+    CrowdsourceData = apps.get_model("crowdsource", "CrowdsourceData")
+    CrowdsourceResponse = apps.get_model("crowdsource", "CrowdsourceResponse")
+    counts = (
+        CrowdsourceResponse.objects.filter(data=OuterRef("pk"), number=1)
+        .order_by()
+        .values("data")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    CrowdsourceData.objects.update(response_count=Coalesce(Subquery(counts), 0))
+    data_limit = Crowdsource.objects.filter(pk=OuterRef("crowdsource_id")).values(
+        "data_limit"
+    )
+    CrowdsourceData.objects.update(
+        is_open=Case(
+            When(response_count__lt=Subquery(data_limit), then=Value(True)),
+            default=Value(False),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("crowdsource", "0029_alter_crowdsourcedata_metadata"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="crowdsourcedata",
+            name="response_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="The number of responses to this datum, not counting "
+                "additional submissions by the same user",
+            ),
+        ),
+        migrations.AddField(
+            model_name="crowdsourcedata",
+            name="is_open",
+            field=models.BooleanField(
+                default=True,
+                help_text="Does this datum still need responses - it is open "
+                "while it has fewer responses than the data limit",
+            ),
+        ),
+        migrations.RunPython(count_responses, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name="crowdsourcedata",
+            index=models.Index(
+                condition=models.Q(("is_open", True)),
+                fields=["crowdsource", "id"],
+                name="crowdsource_data_open_idx",
+            ),
+        ),
+    ]
@@ -19,7 +19,6 @@ from django.utils.safestring import mark_safe
 import json
 import logging
 from html import unescape
-from random import choice
 
 # Third Party
 from bleach.sanitizer import Cleaner
@@ -126,11 +125,7 @@ class Crowdsource(models.Model):
 
     def get_data_to_show(self, user, ip_address):
         """Get the crowdsource data to show"""
-        options = self.data.get_choices(self.data_limit, user, ip_address)
-        if options:
-            return choice(options)
-        else:
-            return None
+        return self.data.get_random_choice(user, ip_address)
 
     @transaction.atomic
     def create_form(self, form_json):
@@ -289,6 +284,16 @@ class CrowdsourceData(models.Model):
     )
     url = models.URLField(max_length=255, verbose_name="Data URL", blank=True)
     metadata = models.JSONField(default=dict, blank=True)
+    response_count = models.PositiveIntegerField(
+        default=0,
+        help_text="The number of responses to this datum, not counting "
+        "additional submissions by the same user",
+    )
+    is_open = models.BooleanField(
+        default=True,
+        help_text="Does this datum still need responses - it is open while it has "
+        "fewer responses than the data limit",
+    )
 
     objects = CrowdsourceDataQuerySet.as_manager()
 
@@ -308,6 +313,14 @@ class CrowdsourceData(models.Model):
 
     class Meta:
         verbose_name = "assignment data"
+        indexes = [
+            # for picking a random open datum to show
+            models.Index(
+                fields=["crowdsource", "id"],
+                condition=models.Q(is_open=True),
+                name="crowdsource_data_open_idx",
+            )
+        ]
 
 
 class CrowdsourceField(models.Model):
@@ -2,7 +2,27 @@
 
 # Django
 from django.db import models
-from django.db.models import Case, Count, Q, Sum, Value, When
+from django.db.models import (
+    Case,
+    Count,
+    Exists,
+    F,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+
+# Standard Library
+from random import randint
+
+# how many random seeks to make before accepting a datum which is more likely
+# to be picked than others
+RANDOM_CHOICE_TRIES = 10
 
 
 class CrowdsourceQuerySet(models.QuerySet):
@@ -27,21 +47,106 @@ class CrowdsourceDataQuerySet(models.QuerySet):
 
     def get_choices(self, data_limit, user, ip_address):
         """Get choices for data to show"""
-        choices = self.annotate(
-            count=Sum(
-                Case(
-                    When(responses__number=1, then=Value(1)),
-                    default=0,
-                    output_field=models.IntegerField(),
-                )
+        return self._exclude_responded(
+            self.filter(response_count__lt=data_limit), user, ip_address
+        )
+
+    def get_random_choice(self, user, ip_address):
+        """Pick a random open datum which the user has not responded to
+
+        Rather than loading or counting every choice, this seeks to a random
+        ID in the open data index and takes the first open datum at or after
+        it.  A datum is found this way in proportion to the gap before it in
+        the index, so it is only accepted with the inverse of that chance,
+        which makes every open datum equally likely.  If no datum is accepted
+        after a few tries, an open datum the user has not responded to which
+        was found is used, so a pick is never more than a few index seeks.
+        """
+        open_data = self.filter(is_open=True)
+        bounds = open_data.aggregate(min=Min("pk"), max=Max("pk"))
+        if bounds["min"] is None:
+            return None
+        candidates = open_data.annotate(
+            previous=Subquery(
+                open_data.filter(pk__lt=OuterRef("pk")).order_by("-pk").values("pk")[:1]
             )
-        ).filter(count__lt=data_limit)
+        ).order_by("pk")
+        responded = self._responded(user, ip_address)
+        if responded is not None:
+            candidates = candidates.annotate(responded=responded)
+        found = None
+        for _ in range(RANDOM_CHOICE_TRIES):
+            pivot = randint(bounds["min"], bounds["max"])
+            datum = candidates.filter(pk__gte=pivot).first()
+            if datum is None or getattr(datum, "responded", False):
+                continue
+            gap = datum.pk - datum.previous if datum.previous is not None else 1
+            if randint(1, gap) == 1:
+                return datum
+            found = found or datum
+        if found is not None:
+            return found
+        # the user has responded to all of the data found, so only seek
+        # through the data they have not responded to
+        pivot = randint(bounds["min"], bounds["max"])
+        choices = self._exclude_responded(open_data, user, ip_address)
+        return (
+            choices.filter(pk__gte=pivot).order_by("pk").first()
+            or choices.filter(pk__lt=pivot).order_by("-pk").first()
+        )
+
+    def _responded(self, user, ip_address):
+        """An expression for whether the user has responded to the datum"""
         if user is not None:
-            choices = choices.exclude(responses__user=user)
+            responses = Q(responses__user=user)
         elif ip_address is not None:
-            choices = choices.exclude(responses__ip_address=ip_address)
+            responses = Q(responses__ip_address=ip_address)
+        else:
+            return None
+        return Exists(self.model.objects.filter(responses, pk=OuterRef("pk")))
+
+    def _exclude_responded(self, choices, user, ip_address):
+        """Exclude data the user has already responded to"""
+        if user is not None:
+            return choices.exclude(responses__user=user)
+        elif ip_address is not None:
+            return choices.exclude(responses__ip_address=ip_address)
         return choices
 
+    def _open(self, offset=0):
+        """Is the datum open once its response count is adjusted by `offset`"""
+        crowdsource_model = self.model.crowdsource.field.related_model
+        data_limit = crowdsource_model.objects.filter(
+            pk=OuterRef("crowdsource_id")
+        ).values("data_limit")
+        return Case(
+            When(response_count__lt=Subquery(data_limit) - offset, then=Value(True)),
+            default=Value(False),
+        )
+
+    def add_responses(self, count):
+        """Adjust the response counts, closing or reopening the data as needed"""
+        return self.update(
+            response_count=F("response_count") + count, is_open=self._open(count)
+        )
+
+    def update_open(self):
+        """Open or close the data, after the data limit has changed"""
+        return self.update(is_open=self._open())
+
+    def update_response_counts(self):
+        """Recount the responses, for data created or changed in bulk"""
+        response_model = self.model.responses.field.model
+        counts = (
+            response_model.objects.filter(data=OuterRef("pk"), number=1)
+            .order_by()
+            .values("data")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        self.update(response_count=Coalesce(Subquery(counts), 0))
+        return self.update_open()
+
 
 class CrowdsourceResponseQuerySet(models.QuerySet):
     """Object manager for crowdsource responses"""
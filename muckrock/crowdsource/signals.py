@@ -0,0 +1,82 @@
+"""Model signal handlers for the crowdsource application"""
+
+# Django
+from django.db.models.signals import post_delete, post_save, pre_save
+
+# MuckRock
+from muckrock.crowdsource.models import (
+    Crowdsource,
+    CrowdsourceData,
+    CrowdsourceResponse,
+)
+
+
+def response_counted(instance):
+    """Does this response count towards its datum's data limit
+
+    Additional submissions by the same user on a multiple per page assignment
+    are not counted
+    """
+    return instance.data_id is not None and instance.number == 1
+
+
+def response_post_save(sender, instance, created, **kwargs):
+    """Count a new response towards its datum"""
+    # pylint: disable=unused-argument
+    if created and response_counted(instance):
+        CrowdsourceData.objects.filter(pk=instance.data_id).add_responses(1)
+
+
+def response_post_delete(sender, instance, **kwargs):
+    """Stop counting a deleted response towards its datum"""
+    # pylint: disable=unused-argument
+    if response_counted(instance):
+        CrowdsourceData.objects.filter(
+            pk=instance.data_id, response_count__gt=0
+        ).add_responses(-1)
+
+
+def crowdsource_pre_save(sender, instance, **kwargs):
+    """Check if the data limit is changing"""
+    # pylint: disable=unused-argument, protected-access
+    if instance.pk is None:
+        instance._data_limit_changed = False
+        return
+    old = (
+        Crowdsource.objects.filter(pk=instance.pk)
+        .values_list("data_limit", flat=True)
+        .first()
+    )
+    instance._data_limit_changed = old != instance.data_limit
+
+
+def crowdsource_post_save(sender, instance, **kwargs):
+    """Open or close the data after the data limit has changed"""
+    # pylint: disable=unused-argument
+    if getattr(instance, "_data_limit_changed", False):
+        instance.data.update_open()
+
+
+post_save.connect(
+    response_post_save,
+    sender=CrowdsourceResponse,
+    dispatch_uid="muckrock.crowdsource.signals.response_post_save",
+)
+
+post_delete.connect(
+    response_post_delete,
+    sender=CrowdsourceResponse,
+    dispatch_uid="muckrock.crowdsource.signals.response_post_delete",
+)
+
+pre_save.connect(
+    crowdsource_pre_save,
+    sender=Crowdsource,
+    dispatch_uid="muckrock.crowdsource.signals.crowdsource_pre_save",
+)
+
+post_save.connect(
+    crowdsource_post_save,
+    sender=Crowdsource,
+    dispatch_uid="muckrock.crowdsource.signals.crowdsource_post_save",
+)
@@ -9,6 +9,7 @@ from django.utils import timezone
 # Standard Library
 import json
 from datetime import datetime
+from unittest.mock import patch
 
 # MuckRock
 from muckrock.core.factories import ProjectFactory, UserFactory
@@ -243,6 +244,118 @@ class TestCrowdsourceData(TestCase):
             [data[0], data[2]]
         )
 
+    def test_response_count(self):
+        """Responses are counted and close the datum at the data limit"""
+        crowdsource = CrowdsourceFactory(data_limit=2)
+        datum = CrowdsourceDataFactory(crowdsource=crowdsource)
+        user = UserFactory()
+
+        CrowdsourceResponseFactory(crowdsource=crowdsource, data=datum, user=user)
+        CrowdsourceResponseFactory(
+            crowdsource=crowdsource, data=datum, user=user, number=2
+        )
+        datum.refresh_from_db()
+        assert datum.response_count == 1
+        assert datum.is_open
+
+        response = CrowdsourceResponseFactory(crowdsource=crowdsource, data=datum)
+        datum.refresh_from_db()
+        assert datum.response_count == 2
+        assert not datum.is_open
+
+        response.delete()
+        datum.refresh_from_db()
+        assert datum.response_count == 1
+        assert datum.is_open
+
+    def test_data_limit_changed(self):
+        """Changing the data limit opens or closes the data"""
+        crowdsource = CrowdsourceFactory(data_limit=1)
+        datum = CrowdsourceDataFactory(crowdsource=crowdsource)
+        CrowdsourceResponseFactory(crowdsource=crowdsource, data=datum)
+        datum.refresh_from_db()
+        assert not datum.is_open
+
+        crowdsource.data_limit = 2
+        crowdsource.save()
+        datum.refresh_from_db()
+        assert datum.is_open
+
+        crowdsource.data_limit = 1
+        crowdsource.save()
+        datum.refresh_from_db()
+        assert not datum.is_open
+
+    def test_update_response_counts(self):
+        """Counts are rebuilt for data changed in bulk"""
+        crowdsource = CrowdsourceFactory(data_limit=1)
+        data = CrowdsourceDataFactory.create_batch(2, crowdsource=crowdsource)
+        CrowdsourceResponseFactory(crowdsource=crowdsource, data=data[0])
+        crowdsource.data.update(response_count=0, is_open=True)
+
+        crowdsource.data.update_response_counts()
+        assert list(
+            crowdsource.data.order_by("pk").values_list("response_count", "is_open")
+        ) == [(1, False), (0, True)]
+
+    def test_get_random_choice(self):
+        """A random choice is an open datum the user has not responded to"""
+        crowdsource = CrowdsourceFactory(data_limit=1)
+        data = CrowdsourceDataFactory.create_batch(3, crowdsource=crowdsource)
+        user = UserFactory()
+
+        CrowdsourceResponseFactory(crowdsource=crowdsource, data=data[0])
+        CrowdsourceResponseFactory(
+            crowdsource=crowdsource, data=data[1], user=user, number=2
+        )
+        for _ in range(10):
+            assert crowdsource.data.get_random_choice(user, None) == data[2]
+
+        CrowdsourceResponseFactory(crowdsource=crowdsource, data=data[2])
+        assert crowdsource.data.get_random_choice(user, None) is None
+
+    def test_get_random_choice_uniform(self):
+        """A datum after a run of closed data is only accepted in proportion"""
+        crowdsource = CrowdsourceFactory(data_limit=1)
+        data = CrowdsourceDataFactory.create_batch(6, crowdsource=crowdsource)
+        for datum in data[1:5]:
+            CrowdsourceResponseFactory(crowdsource=crowdsource, data=datum)
+
+        with patch(
+            "muckrock.crowdsource.querysets.randint", side_effect=[data[0].pk, 1]
+        ):
+            assert crowdsource.data.get_random_choice(None, None) == data[0]
+
+        # the seek lands on the last datum from five IDs, so it is accepted one
+        # time in five
+        with patch(
+            "muckrock.crowdsource.querysets.randint",
+            side_effect=[data[1].pk, 2, data[5].pk, 1],
+        ) as mock:
+            assert crowdsource.data.get_random_choice(None, None) == data[5]
+        assert mock.call_args_list[1].args == (1, 5)
+        assert mock.call_count == 4
+
+    def test_get_random_choice_responded(self):
+        """Seek again when the user has responded to the datum found"""
+        crowdsource = CrowdsourceFactory(data_limit=2)
+        data = CrowdsourceDataFactory.create_batch(2, crowdsource=crowdsource)
+        user = UserFactory()
+        CrowdsourceResponseFactory(crowdsource=crowdsource, data=data[0], user=user)
+
+        with patch(
+            "muckrock.crowdsource.querysets.randint",
+            side_effect=[data[0].pk, data[1].pk, 1],
+        ):
+            assert crowdsource.data.get_random_choice(user, None) == data[1]
+
+        # after only finding responded data, seek through the unresponded data
+        with patch(
+            "muckrock.crowdsource.querysets.randint",
+            return_value=data[0].pk,
+        ):
+            assert crowdsource.data.get_random_choice(user, None) == data[1]
+
 
 class TestCrowdsourceResponse(TestCase):
     """Test the Crowdsource Response model"""
@@ -4,6 +4,7 @@ Serilizers for V2 of the FOIA API
 
 # Django
 from django.contrib.auth.models import User
+from django.db.models import Prefetch
 
 # Third Party
 from drf_spectacular.utils import OpenApiExample, extend_schema_serializer
@@ -11,6 +12,7 @@ from rest_framework import serializers
 
 # MuckRock
 from muckrock.agency.models.agency import Agency
+from muckrock.core.serializers import SparseFieldsMixin
 from muckrock.foia.models import FOIACommunication, FOIARequest
 from muckrock.foia.models.file import FOIAFile
 from muckrock.organization.models import Organization
@@ -42,7 +44,7 @@ from muckrock.organization.models import Organization
         )
     ]
 )
-class FOIARequestSerializer(serializers.ModelSerializer):
+class FOIARequestSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for FOIA Request model"""
 
     user = serializers.PrimaryKeyRelatedField(
@@ -113,6 +115,22 @@ class FOIARequestSerializer(serializers.ModelSerializer):
             # "communications",
             "edited_boilerplate",
         )
+        select_related = {
+            "user": ["composer"],
+            "datetime_submitted": ["composer"],
+            "requested_docs": ["composer"],
+            "edited_boilerplate": ["composer"],
+        }
+        prefetch_related = {
+            "edit_collaborators": [
+                Prefetch("edit_collaborators", queryset=User.objects.only("id"))
+            ],
+            "read_collaborators": [
+                Prefetch("read_collaborators", queryset=User.objects.only("id"))
+            ],
+            "tracking_id": ["tracking_ids"],
+            "tags": ["tags"],
+        }
         extra_kwargs = {
             "id": {"help_text": "The unique identifier for this FOIA request"},
             "title": {"help_text": "The title of the FOIA request"},
@@ -292,7 +310,7 @@ class FOIARequestCreateSerializer(serializers.ModelSerializer):
         )
     ]
 )
-class FOIAFileSerializer(serializers.ModelSerializer):
+class FOIAFileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for FOIA File model"""
 
     ffile = serializers.SerializerMethodField(help_text="The URL of the file")
@@ -330,7 +348,7 @@ class FOIAFileSerializer(serializers.ModelSerializer):
 
     def get_ffile(self, obj) -> str:
         """Get the ffile URL safely"""
-        if obj.ffile and hasattr(obj.ffile, "url"):
+        if obj.ffile:
             return obj.ffile.url
         return ""
 
@@ -358,7 +376,7 @@ class FOIAFileSerializer(serializers.ModelSerializer):
         )
     ]
 )
-class FOIACommunicationSerializer(serializers.ModelSerializer):
+class FOIACommunicationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for FOIA Communication model"""
 
     files = serializers.PrimaryKeyRelatedField(
@@ -390,6 +408,11 @@ class FOIACommunicationSerializer(serializers.ModelSerializer):
             "status",
             "files",
         ]
+        prefetch_related = {
+            "files": [
+                Prefetch("files", queryset=FOIAFile.objects.only("id", "comm_id"))
+            ]
+        }
         extra_kwargs = {
             "id": {"help_text": "The unique identifier for this communication"},
             "foia": {
@@ -1,7 +1,14 @@
 # Django
 from django.contrib.auth.models import Permission, User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+
+# Standard Library
+import json
+from datetime import timedelta
 
 # Third Party
 from rest_framework.test import APIClient
@@ -23,6 +30,23 @@ def _grant(user, codename):
     return User.objects.get(pk=user.pk)
 
 
+def _count_queries(client, url):
+    """Count the queries used to get a page of results"""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(queries)
+
+
+def _export(client, url, **params):
+    """Get the objects from an export"""
+    response = client.get(url, params)
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/x-ndjson"
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    return [json.loads(line) for line in lines]
+
+
 def _fund(org, amount=5):
     """Give an org a request balance so submit() succeeds"""
     org.number_requests = amount
@@ -49,6 +73,63 @@ class TestFOIARequestViewset(TestCase):
         response = self.client.get(reverse("api2-requests-list"))
         assert response.status_code == 200
 
+    def test_list_queries(self):
+        """The number of queries does not grow with the number of requests"""
+        self.client.force_authenticate(user=UserFactory.create(is_staff=True))
+        url = reverse("api2-requests-list")
+
+        def create():
+            foia = FOIARequestFactory.create()
+            foia.edit_collaborators.add(UserFactory.create())
+            foia.tags.add("test")
+            foia.add_tracking_id("ABC")
+
+        create()
+        queries = _count_queries(self.client, url)
+        for _ in range(3):
+            create()
+        assert _count_queries(self.client, url) == queries
+
+    def test_list_fields(self):
+        """Only the requested fields are returned, and unneeded relations are not
+        loaded"""
+        self.client.force_authenticate(user=UserFactory.create(is_staff=True))
+        FOIARequestFactory.create()
+        url = reverse("api2-requests-list")
+        response = self.client.get(url, {"fields": "id,title"})
+        assert set(response.json()["results"][0]) == {"id", "title"}
+        assert _count_queries(self.client, url + "?fields=id,title") < (
+            _count_queries(self.client, url)
+        )
+
+    def test_export(self):
+        """Only viewable requests are exported"""
+        self.client.force_authenticate(user=self.user)
+        public = FOIARequestFactory.create()
+        FOIARequestFactory.create(embargo_status="embargo")
+        requests = _export(self.client, reverse("api2-requests-export"))
+        assert [r["id"] for r in requests] == [public.pk]
+
+    def test_export_updated_since(self):
+        """Requests are exported if anything shown with them has changed"""
+        self.client.force_authenticate(user=self.user)
+        old = timezone.now() - timedelta(days=7)
+        foias = FOIARequestFactory.create_batch(3)
+        FOIARequest.objects.filter(pk__in=[f.pk for f in foias]).update(
+            datetime_updated=old, datetime_modified=old
+        )
+        # changes which do not move datetime_updated
+        foias[0].tags.add("changed")
+        # requests which have not been saved since datetime_modified was added
+        FOIARequest.objects.filter(pk=foias[1].pk).update(
+            datetime_updated=timezone.now(), datetime_modified=None
+        )
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        requests = _export(
+            self.client, reverse("api2-requests-export"), updated_since=since
+        )
+        assert {r["id"] for r in requests} == {foias[0].pk, foias[1].pk}
+
     def test_create(self):
         agency = AgencyFactory.create()
         user = UserFactory.create()
@@ -363,6 +444,60 @@ class TestFOIARequestViewset(TestCase):
         )
         assert response.status_code == 400, response.json()
 
+    def test_detail_not_modified(self):
+        """Conditional requests get a 304 until the request is modified"""
+        self.client.force_authenticate(user=self.user)
+        foia = FOIARequestFactory.create()
+        url = reverse("api2-requests-detail", kwargs={"pk": foia.pk})
+        etag = self.client.get(url)["ETag"]
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            foia.add_tracking_id("ABC")
+            foia.tags.add("changed")
+        # the request is touched once for the whole transaction
+        assert len(callbacks) == 1
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()["tracking_id"] == "ABC"
+
+    def test_list_not_modified(self):
+        """Conditional requests get a 304 until the filtered set changes"""
+        self.client.force_authenticate(user=self.user)
+        foia = FOIARequestFactory.create()
+        url = reverse("api2-requests-list")
+        etag = self.client.get(url)["ETag"]
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        cursor_etag = self.client.get(url, {"pagination": "cursor"})["ETag"]
+        assert (
+            self.client.get(
+                url, {"pagination": "cursor"}, HTTP_IF_NONE_MATCH=cursor_etag
+            ).status_code
+            == 304
+        )
+
+        foia.title = "Changed"
+        foia.save()
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+        assert (
+            self.client.get(
+                url, {"pagination": "cursor"}, HTTP_IF_NONE_MATCH=cursor_etag
+            ).status_code
+            == 200
+        )
+
+    def test_list_browsable_cursor(self):
+        """The browsable API shows a next link for cursor pagination"""
+        self.client.force_authenticate(user=self.user)
+        FOIARequestFactory.create_batch(2)
+        response = self.client.get(
+            reverse("api2-requests-list"),
+            {"pagination": "cursor", "page_size": 1, "format": "api"},
+        )
+        assert response.status_code == 200
+        assert "cursor=" in response.content.decode()
+
     def test_unauthenticated_cannot_list(self):
         response = self.client.get(reverse("api2-requests-list"))
         assert response.status_code == 401
@@ -405,6 +540,82 @@ class TestFOIACommunicationViewset(TestCase):
         )
         assert response.status_code == 401
 
+    def test_list_queries(self):
+        """The number of queries does not grow with the number of communications"""
+        self.client.force_authenticate(user=UserFactory.create(is_staff=True))
+        url = reverse("api2-communications-list")
+        FOIAFileFactory.create_batch(2)
+        queries = _count_queries(self.client, url)
+        FOIAFileFactory.create_batch(6)
+        assert _count_queries(self.client, url) == queries
+
+    def test_list_fields(self):
+        self.client.force_authenticate(user=UserFactory.create(is_staff=True))
+        FOIAFileFactory.create()
+        response = self.client.get(
+            reverse("api2-communications-list"), {"fields": "id,files"}
+        )
+        assert set(response.json()["results"][0]) == {"id", "files"}
+        assert len(response.json()["results"][0]["files"]) == 1
+
+    def test_export(self):
+        """Communications are exported oldest first, optionally since a time"""
+        self.client.force_authenticate(user=UserFactory.create(is_staff=True))
+        now = timezone.now()
+        comms = [
+            FOIACommunicationFactory.create(datetime=now - timedelta(days=i))
+            for i in range(3)
+        ]
+        url = reverse("api2-communications-export")
+        assert [c["id"] for c in _export(self.client, url)] == [
+            c.pk for c in reversed(comms)
+        ]
+        since = (now - timedelta(days=1)).isoformat()
+        assert [c["id"] for c in _export(self.client, url, updated_since=since)] == [
+            comms[1].pk,
+            comms[0].pk,
+        ]
+
+    def test_export_invalid_updated_since(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(
+            reverse("api2-communications-export"), {"updated_since": "yesterday"}
+        )
+        assert response.status_code == 400
+
+    def _walk(self, url):
+        """Follow the next links, returning the IDs from every page"""
+        pks = []
+        while url:
+            response = self.client.get(url)
+            assert response.status_code == 200
+            assert "count" not in response.json()
+            pks.extend(c["id"] for c in response.json()["results"])
+            url = response.json()["next"]
+        return pks
+
+    def test_list_cursor(self):
+        """Cursor pagination walks every communication once, oldest first"""
+        self.client.force_authenticate(user=UserFactory.create(is_staff=True))
+        now = timezone.now()
+        # several share a datetime, so the ID must break the tie
+        comms = [
+            FOIACommunicationFactory.create(datetime=now - timedelta(days=i // 2))
+            for i in range(7)
+        ]
+        expected = [c.pk for c in sorted(comms, key=lambda c: (c.datetime, c.pk))]
+        pks = self._walk(
+            reverse("api2-communications-list") + "?pagination=cursor&page_size=2"
+        )
+        assert pks == expected
+
+    def test_list_cursor_invalid(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(
+            reverse("api2-communications-list") + "?cursor=bogus"
+        )
+        assert response.status_code == 404
+
 
 class TestFOIAFileViewset(TestCase):
     def setUp(self):
@@ -423,6 +634,31 @@ class TestFOIAFileViewset(TestCase):
         response = self.client.get(reverse("api2-files-list"))
         assert response.status_code == 200
 
+    def test_list_queries(self):
+        """The number of queries does not grow with the number of files"""
+        self.client.force_authenticate(user=UserFactory.create(is_staff=True))
+        url = reverse("api2-files-list")
+        FOIAFileFactory.create()
+        queries = _count_queries(self.client, url)
+        FOIAFileFactory.create_batch(3)
+        assert _count_queries(self.client, url) == queries
+
+    def test_list_cursor(self):
+        """Files without a datetime come after the rest with cursor pagination"""
+        self.client.force_authenticate(user=UserFactory.create(is_staff=True))
+        undated = FOIAFileFactory.create_batch(2)
+        dated = [
+            FOIAFileFactory.create(datetime=timezone.now() - timedelta(days=i))
+            for i in range(3)
+        ]
+        url = reverse("api2-files-list") + "?pagination=cursor&page_size=2"
+        pks = []
+        while url:
+            response = self.client.get(url)
+            pks.extend(f["id"] for f in response.json()["results"])
+            url = response.json()["next"]
+        assert pks == [f.pk for f in reversed(dated)] + [f.pk for f in undated]
+
     def test_unauthenticated_cannot_list(self):
         response = self.client.get(reverse("api2-files-list"))
         assert response.status_code == 401
@@ -4,6 +4,7 @@ Viewsets for V2 of the FOIA API
 
 # Django
 from django.db import transaction
+from django.db.models import Q
 
 # Third Party
 import django_filters
@@ -13,6 +14,8 @@ from rest_framework import filters, mixins, status as http_status, viewsets
 from rest_framework.response import Response
 
 # MuckRock
+from muckrock.core.api_mixins import ConditionalGetMixin, EagerLoadingMixin, ExportMixin
+from muckrock.core.pagination import SelectablePagination
 from muckrock.core.views import AuthenticatedAPIMixin
 from muckrock.foia.api_v2.serializers import (
     FOIACommunicationSerializer,
@@ -30,6 +33,9 @@ from muckrock.foia.models.composer import FOIAComposer
 # pylint:disable=too-many-ancestors
 class FOIARequestViewSet(
     AuthenticatedAPIMixin,
+    ConditionalGetMixin,
+    EagerLoadingMixin,
+    ExportMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.CreateModelMixin,
@@ -38,6 +44,9 @@ class FOIARequestViewSet(
     """API for FOIA Requests"""
 
     filter_backends = (DjangoFilterBackend, filters.SearchFilter)
+    pagination_class = SelectablePagination
+    keyset_ordering = ("datetime_updated", "id")
+    modified_fields = ("datetime_modified", "datetime_updated")
 
     search_fields = ["title"]
 
@@ -48,12 +57,14 @@ class FOIARequestViewSet(
         return FOIARequestSerializer
 
     def get_queryset(self):
-        return (
-            FOIARequest.objects.get_viewable(self.request.user)
-            .select_related("composer")
-            .prefetch_related(
-                "edit_collaborators", "read_collaborators", "tracking_ids", "tags"
-            )
+        return self.eager_load(FOIARequest.objects.get_viewable(self.request.user))
+
+    def filter_updated_since(self, queryset, updated_since):
+        """Export requests with any change shown with them since the given
+        time, which is only recorded for requests changed since it was added"""
+        return queryset.filter(
+            Q(datetime_modified__gte=updated_since)
+            | Q(datetime_modified=None, datetime_updated__gte=updated_since)
         )
 
     @extend_schema(
@@ -201,6 +212,8 @@ class FOIARequestViewSet(
 
 class FOIACommunicationViewSet(
     AuthenticatedAPIMixin,
+    EagerLoadingMixin,
+    ExportMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     viewsets.GenericViewSet,
@@ -209,9 +222,13 @@ class FOIACommunicationViewSet(
 
     serializer_class = FOIACommunicationSerializer
     filter_backends = (DjangoFilterBackend,)
+    pagination_class = SelectablePagination
+    keyset_ordering = ("datetime", "id")
 
     def get_queryset(self):
-        return FOIACommunication.objects.get_viewable(self.request.user)
+        return self.eager_load(
+            FOIACommunication.objects.get_viewable(self.request.user)
+        )
 
     class Filter(django_filters.FilterSet):
         """API Filter for FOIA Communications"""
@@ -244,15 +261,22 @@ class FOIACommunicationViewSet(
     filterset_class = Filter
 
 
-class FOIAFileViewSet(AuthenticatedAPIMixin, viewsets.ReadOnlyModelViewSet):
+class FOIAFileViewSet(
+    AuthenticatedAPIMixin,
+    EagerLoadingMixin,
+    ExportMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
     """API for managing FOIA files"""
 
     def get_queryset(self):
-        return FOIAFile.objects.get_viewable(self.request.user)
+        return self.eager_load(FOIAFile.objects.get_viewable(self.request.user))
 
     serializer_class = FOIAFileSerializer
 
     filter_backends = (DjangoFilterBackend,)
+    pagination_class = SelectablePagination
+    keyset_ordering = ("datetime", "id")
 
     class Filter(django_filters.FilterSet):
         """API Filter for FOIA files"""
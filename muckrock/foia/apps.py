@@ -26,6 +26,7 @@ class FOIAConfig(AppConfig):
 
         # MuckRock
         import muckrock.foia.signals  # pylint: disable=unused-import
+        from muckrock.core import fulltext
 
         FOIARequest = self.get_model("FOIARequest")
         FOIACommunication = self.get_model("FOIACommunication")
@@ -36,5 +37,15 @@ class FOIAConfig(AppConfig):
         action.register(FOIANote)
         search.register(FOIARequest.objects.get_public())
         search.register(FOIALogEntry)
+        fulltext.register(FOIARequest.objects.get_public(), {"title": "A"})
+        fulltext.register(
+            FOIALogEntry.objects.all(),
+            {
+                "request_id": "A",
+                "subject": "B",
+                "requester": "C",
+                "requester_organization": "C",
+            },
+        )
         # monkey patch the word_split regex so urlize works better
         django.utils.html.word_split_re = re.compile(r'([\s<>\(\)\[\]"\']+)')
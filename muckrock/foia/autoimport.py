@@ -0,0 +1,358 @@
+"""
+Import scanned documents from the autoimport S3 bucket
+"""
+
+# Django
+from celery.exceptions import SoftTimeLimitExceeded
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+# Standard Library
+import hashlib
+import logging
+import os
+import os.path
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time
+
+# Third Party
+import boto3
+
+# MuckRock
+from muckrock.communication.models import MailCommunication
+from muckrock.foia.exceptions import SizeError
+from muckrock.foia.models import FOIACommunication, FOIAFile, FOIARequest
+
+logger = logging.getLogger(__name__)
+
+NAME_PATTERN = re.compile(
+    r"(?P<month>\d\d?)-(?P<day>\d\d?)-(?P<year>\d\d) (?P<docs>(?:mr\d+(?: |$))+)",
+    re.I,
+)
+# number of concurrent S3 copies
+COPY_WORKERS = 8
+# objects larger than this must use a multipart copy
+MAX_COPY_SIZE = 5 * 1024**3
+
+
+def parse_name(name):
+    """Parse a file name into the FOIA pks and the date it was scanned"""
+    # strip off trailing / and file extension
+    name = os.path.normpath(name)
+    name = os.path.splitext(name)[0]
+
+    m_name = NAME_PATTERN.match(name)
+    if not m_name:
+        raise ValueError("ERROR: %s does not match the file name format" % name)
+    foia_pks = [int(pk[2:]) for pk in m_name.group("docs").split()]
+    file_datetime = datetime.combine(
+        datetime(
+            int(m_name.group("year")) + 2000,
+            int(m_name.group("month")),
+            int(m_name.group("day")),
+        ),
+        time(tzinfo=timezone.get_current_timezone()),
+    )
+
+    return foia_pks, file_datetime
+
+
+def get_import_key(obj):
+    """Identify an object in the autoimport bucket by its key and contents"""
+    return hashlib.md5(f"{obj.key}:{obj.e_tag}".encode("utf8")).hexdigest()
+
+
+class Entry:
+    """A top level file or folder in the autoimport bucket"""
+
+    def __init__(self, name):
+        self.name = name
+        # every object under this entry, used to move it to review or delete it
+        self.objects = []
+        # the objects which are files to be imported
+        self.files = []
+
+
+class Autoimporter:
+    """Import every file in the autoimport bucket
+
+    The bucket is listed once and grouped into top level entries, the names
+    are all parsed and the referenced requests are loaded in a single query.
+    Copies to the media bucket run on a bounded thread pool while the
+    database work happens on the calling thread, in entry order.  Each file
+    records the object it was imported from, so a run which times out may be
+    restarted without duplicating files.  Copies which are not attached to a
+    file, because their import failed or the run timed out, are deleted.
+    """
+
+    def __init__(self, log, workers=COPY_WORKERS):
+        self.log = log
+        self.workers = workers
+        self.path = settings.AWS_AUTOIMPORT_PATH
+        self.bucket = boto3.resource("s3").Bucket(settings.AWS_AUTOIMPORT_BUCKET_NAME)
+        # boto3 clients are thread safe, resources are not
+        self.client = boto3.client("s3")
+        self._names = set()
+        self._names_lock = threading.Lock()
+        # (FOIA pk, import key) for each file which has been imported
+        self._imported = set()
+        # the names of the copies which have been attached to files
+        self._attached = set()
+
+    def list_entries(self):
+        """List the bucket, grouping objects by their top level file or folder"""
+        entries = {}
+        for obj in self.bucket.objects.filter(Prefix=self.path):
+            rel = obj.key[len(self.path) :]
+            if not rel:
+                continue
+            name, sep, rest = rel.partition("/")
+            if name + sep not in entries:
+                entries[name + sep] = Entry(name + sep)
+            entry = entries[name + sep]
+            entry.objects.append(obj)
+            if rest.endswith("/"):
+                self.log.append(
+                    "ERROR: nested directories not allowed: %s in %s"
+                    % (obj.key, entry.name)
+                )
+            elif rest or not sep:
+                # skip the folder marker itself
+                entry.files.append(obj)
+        return list(entries.values())
+
+    def run(self):
+        """Import all of the entries"""
+        self.log.append("Start Time: %s" % timezone.now())
+
+        parsed = []
+        for entry in self.list_entries():
+            try:
+                parsed.append((entry, *parse_name(entry.name)))
+            except ValueError as exc:
+                self.log.append(str(exc))
+                self.move_to_review(entry.objects)
+                self.delete(entry.objects)
+
+        foias = FOIARequest.objects.select_related("agency", "composer__user").in_bulk(
+            {pk for _entry, foia_pks, _datetime in parsed for pk in foia_pks}
+        )
+        self._imported = set(
+            FOIAFile.objects.filter(
+                import_key__in=[
+                    get_import_key(obj)
+                    for entry, _foia_pks, _datetime in parsed
+                    for obj in entry.files
+                ]
+            ).values_list("comm__foia_id", "import_key")
+        )
+
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        jobs = []
+        try:
+            # queue every copy up front, so they run ahead of the database work
+            jobs = [
+                (
+                    entry,
+                    file_datetime,
+                    [
+                        (foia_pk, self.queue_copies(executor, entry, foia_pk, foias))
+                        for foia_pk in foia_pks
+                    ],
+                )
+                for entry, foia_pks, file_datetime in parsed
+            ]
+            for entry, file_datetime, foia_copies in jobs:
+                for foia_pk, copies in foia_copies:
+                    self.import_entry(
+                        entry, foias.get(foia_pk), foia_pk, file_datetime, copies
+                    )
+                # delete the entry after processing all requests for it
+                self.delete(entry.objects)
+        finally:
+            # do not start outstanding copies if we are out of time, but let
+            # running copies finish so they may be cleaned up
+            executor.shutdown(wait=True, cancel_futures=True)
+            self.delete_copies(
+                future
+                for _entry, _datetime, foia_copies in jobs
+                for _foia_pk, copies in foia_copies
+                for _obj, future in copies
+            )
+
+        self.log.append("End Time: %s" % timezone.now())
+
+    def queue_copies(self, executor, entry, foia_pk, foias):
+        """Start copying the files in an entry which have not yet been imported"""
+        if foia_pk not in foias:
+            return []
+        return [
+            (obj, executor.submit(self.copy, obj))
+            for obj in entry.files
+            if (foia_pk, get_import_key(obj)) not in self._imported
+        ]
+
+    def import_entry(self, entry, foia, foia_pk, file_datetime, copies):
+        """Attach the copied files for an entry to a new communication"""
+        # pylint: disable=broad-except
+        # pylint: disable=too-many-arguments
+        if foia is None:
+            self.move_to_review(entry.objects)
+            self.log.append(
+                "ERROR: %s references FOIA Request %s, but it does not exist"
+                % (entry.name, foia_pk)
+            )
+            return
+        if not copies:
+            return
+
+        imported = []
+        try:
+            with transaction.atomic():
+                comm = self.create_comm(foia, file_datetime)
+                for obj, future in copies:
+                    try:
+                        name = future.result()
+                    except SizeError as exc:
+                        self.move_to_review([obj])
+                        self.log.append(
+                            "ERROR: %s was %s bytes and after uploaded was %s bytes "
+                            "- retry" % (obj.key[len(self.path) :], *exc.args)
+                        )
+                        continue
+                    file_name = os.path.basename(obj.key)
+                    foia_file = comm.attach_file(path=name, name=file_name, now=False)
+                    foia_file.import_key = get_import_key(obj)
+                    foia_file.save(update_fields=["import_key"])
+                    imported.append(name)
+                    self.log.append(
+                        "SUCCESS: %s uploaded to FOIA Request %s with a status of %s"
+                        % (file_name, foia.pk, foia.status)
+                    )
+                if not imported:
+                    comm.delete()
+        except SoftTimeLimitExceeded:
+            # if we reach the soft time limit,
+            # re-raise so we can catch and clean up
+            raise
+        except Exception as exc:
+            self.move_to_review(entry.objects)
+            self.log.append(
+                "ERROR: %s has caused an unknown error. %s" % (entry.name, exc)
+            )
+            logger.error("Autoimport error: %s", exc, exc_info=sys.exc_info())
+            return
+
+        self._attached.update(imported)
+
+    def create_comm(self, foia, file_datetime):
+        """Create the communication the scanned files are attached to"""
+        comm = FOIACommunication.objects.create(
+            foia=foia,
+            from_user=foia.agency.get_user() if foia.agency else None,
+            to_user=foia.user,
+            response=True,
+            datetime=timezone.now(),
+            communication="",
+            hidden=True,
+        )
+        comm.responsetask_set.create(scan=True)
+        MailCommunication.objects.create(
+            communication=comm, sent_datetime=file_datetime
+        )
+        return comm
+
+    def reserve_name(self, file_name):
+        """Pick a name in media storage which no other copy in this run uses"""
+        # first parameter is instance, but we do not have one yet
+        # luckily, it is only used if the upload_to for the field is
+        # a callable, which it is not, so it is safe to pass in None
+        name = FOIAFile.ffile.field.generate_filename(None, file_name)
+        while True:
+            name = default_storage.get_available_name(name)
+            with self._names_lock:
+                if name not in self._names:
+                    self._names.add(name)
+                    return name
+            dir_name, base_name = os.path.split(name)
+            name = os.path.join(
+                dir_name,
+                default_storage.get_alternative_name(*os.path.splitext(base_name)),
+            )
+
+    def copy(self, obj):
+        """Copy a file to media storage, returning its new name
+
+        This runs on the thread pool.  The size is verified by comparing the
+        ETag of the copy to the one from the listing, only falling back to
+        checking the size of the copy for multipart objects
+        """
+        name = self.reserve_name(os.path.basename(obj.key))
+        copy_source = {"Bucket": self.bucket.name, "Key": obj.key}
+        if obj.size < MAX_COPY_SIZE:
+            response = self.client.copy_object(
+                CopySource=copy_source,
+                Bucket=settings.AWS_MEDIA_BUCKET_NAME,
+                Key=name,
+                ACL=settings.AWS_DEFAULT_ACL,
+            )
+            if response["CopyObjectResult"]["ETag"] == obj.e_tag:
+                return name
+        else:
+            self.client.copy(
+                copy_source,
+                settings.AWS_MEDIA_BUCKET_NAME,
+                name,
+                ExtraArgs={"ACL": settings.AWS_DEFAULT_ACL},
+            )
+        size = self.client.head_object(Bucket=settings.AWS_MEDIA_BUCKET_NAME, Key=name)[
+            "ContentLength"
+        ]
+        if size != obj.size:
+            self.client.delete_object(Bucket=settings.AWS_MEDIA_BUCKET_NAME, Key=name)
+            raise SizeError(obj.size, size)
+        return name
+
+    def delete_copies(self, futures):
+        """Delete the finished copies which were not attached to a file"""
+        # pylint: disable=broad-except
+        names = [
+            future.result()
+            for future in futures
+            if future.done()
+            and not future.cancelled()
+            and future.exception() is None
+            and future.result() not in self._attached
+        ]
+        try:
+            self.delete(names, bucket=settings.AWS_MEDIA_BUCKET_NAME)
+        except Exception as exc:
+            self.log.append("ERROR: could not delete unused copies: %s" % exc)
+
+    def move_to_review(self, objects):
+        """Copy objects to the review folder"""
+        # pylint: disable=broad-except
+        for obj in objects:
+            try:
+                self.client.copy(
+                    {"Bucket": self.bucket.name, "Key": obj.key},
+                    self.bucket.name,
+                    "review/%s" % obj.key[len(self.path) :],
+                )
+            except Exception as exc:
+                self.log.append(str(exc))
+
+    def delete(self, objects, bucket=None):
+        """Delete objects, or keys, from the autoimport bucket, or the given
+        bucket, up to 1000 per request"""
+        keys = [{"Key": getattr(obj, "key", obj)} for obj in objects]
+        for i in range(0, len(keys), 1000):
+            self.client.delete_objects(
+                Bucket=bucket or self.bucket.name,
+                Delete={"Objects": keys[i : i + 1000]},
+            )
@@ -120,11 +120,8 @@ class FOIARequestFilterSet(JurisdictionFilterSet):
     def filter_file_types(self, queryset, name, value):
         """Filter requests with certain types of files"""
         # pylint: disable=unused-argument
-        file_types = value.split(",")
-        query = Q()
-        for file_type in file_types:
-            query |= Q(communications__files__ffile__endswith=file_type.strip())
-        return queryset.filter(query)
+        file_types = [t.strip().lstrip(".").lower() for t in value.split(",")]
+        return queryset.filter(communications__files__extension__in=file_types)
 
     class Meta:
         model = FOIARequest
@@ -179,11 +176,8 @@ class MyFOIARequestFilterSet(JurisdictionFilterSet):
     def filter_file_types(self, queryset, name, value):
         """Filter requests with certain types of files"""
         # pylint: disable=unused-argument
-        file_types = value.split(",")
-        query = Q()
-        for file_type in file_types:
-            query |= Q(communications__files__ffile__endswith=file_type.strip())
-        return queryset.filter(query)
+        file_types = [t.strip().lstrip(".").lower() for t in value.split(",")]
+        return queryset.filter(communications__files__extension__in=file_types)
 
     class Meta:
         model = FOIARequest
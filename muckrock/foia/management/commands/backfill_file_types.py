@@ -0,0 +1,32 @@
+"""Backfill the extension and mimetype of files"""
+
+# Django
+from django.core.management.base import BaseCommand
+
+# MuckRock
+from muckrock.foia.models import FOIAFile
+
+
+class Command(BaseCommand):
+    """Set the stored file type of files saved before it was stored"""
+
+    help = "Populate the extension and mimetype of existing files, in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **kwargs):
+        batch_size = kwargs["batch_size"]
+        files = FOIAFile.objects.filter(extension="", mimetype="").order_by("pk")
+        last_pk = 0
+        updated = 0
+        while True:
+            batch = list(files.filter(pk__gt=last_pk).only("pk", "ffile")[:batch_size])
+            if not batch:
+                break
+            for file_ in batch:
+                file_.set_file_type()
+            updated += FOIAFile.objects.bulk_update(batch, ["extension", "mimetype"])
+            last_pk = batch[-1].pk
+            self.stdout.write(f"{updated} files updated, through #{last_pk}")
+        self.stdout.write(f"Done: {updated} files updated")
@@ -0,0 +1,103 @@
+"""Compare the cost of deep pages with page number and cursor pagination"""
+
+# Django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Standard Library
+import time
+
+# Third Party
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+# MuckRock
+from muckrock.core.pagination import KeysetPagination, StandardPagination
+from muckrock.foia.api_v2.viewsets import (
+    FOIACommunicationViewSet,
+    FOIAFileViewSet,
+    FOIARequestViewSet,
+)
+
+VIEWSETS = {
+    "requests": FOIARequestViewSet,
+    "communications": FOIACommunicationViewSet,
+    "files": FOIAFileViewSet,
+}
+
+
+def get_cursor(queryset, keyset_ordering, offset):
+    """The cursor a client would have been given after reading `offset` rows"""
+    field, pk_field = keyset_ordering
+    positions = list(
+        queryset.order_by(field, pk_field)
+        .filter(**{f"{field}__isnull": False})
+        .values_list(field, pk_field)[offset - 1 : offset]
+    )
+    if not positions:
+        return None
+    return KeysetPagination().encode_cursor(positions[0])
+
+
+def time_page(pagination, view, queryset, query, iterations):
+    """Fetch a page repeatedly and describe its average cost"""
+    request = Request(APIRequestFactory().get(f"/?{query}"))
+    before = time.perf_counter()
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as queries:
+            results = pagination().paginate_queryset(queryset, request, view)
+    elapsed = (time.perf_counter() - before) / iterations
+    return (
+        f"{len(results)} results, {len(queries)} queries, "
+        f"{elapsed * 1000:.1f}ms per page"
+    )
+
+
+class Command(BaseCommand):
+    """Benchmark v2 API pagination"""
+
+    help = "Time the first and a deep page of a v2 API list with both paginations"
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("--viewset", choices=VIEWSETS, default="communications")
+        parser.add_argument("--page", type=int, default=5000)
+        parser.add_argument("--page-size", type=int, default=50)
+        parser.add_argument("--iterations", type=int, default=5)
+
+    def handle(self, *args, **kwargs):
+        viewset = VIEWSETS[kwargs["viewset"]]
+        view = viewset(
+            request=None, format_kwarg=None, action="list", kwargs={}, args=()
+        )
+        view.request = Request(APIRequestFactory().get("/"))
+        view.request.user = User.objects.get(username=kwargs["username"])
+        queryset = view.get_queryset()
+        page, page_size = kwargs["page"], kwargs["page_size"]
+
+        # find the cursor for the deep page up front, as a client walking the
+        # list would have it from the previous page
+        cursor = get_cursor(
+            queryset, viewset.keyset_ordering, (max(page, 2) - 1) * page_size
+        )
+        if cursor is None:
+            self.stderr.write(f"There are fewer than {page} pages")
+            return
+
+        cases = [
+            ("page number, page 1", StandardPagination, "page=1"),
+            (f"page number, page {page}", StandardPagination, f"page={page}"),
+            ("cursor, page 1", KeysetPagination, ""),
+            (f"cursor, page {page}", KeysetPagination, f"cursor={cursor}"),
+        ]
+        for name, pagination, params in cases:
+            result = time_page(
+                pagination,
+                view,
+                queryset,
+                f"page_size={page_size}&{params}",
+                kwargs["iterations"],
+            )
+            self.stdout.write(f"{name}: {result}")
@@ -0,0 +1,68 @@
+"""Benchmark the autoimporter against a local S3 stand in"""
+
+# Django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+# Standard Library
+import time
+
+# Third Party
+import boto3
+
+# MuckRock
+from muckrock.foia.autoimport import Autoimporter
+from muckrock.foia.models import FOIARequest
+
+
+class Command(BaseCommand):
+    """Benchmark the autoimporter"""
+
+    help = (
+        "Import scans of the given request from a mocked S3 bucket, "
+        "rolling back all database changes afterwards"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--foia", type=int, help="FOIA Request ID")
+        parser.add_argument("--keys", type=int, default=2000)
+        parser.add_argument("--size", type=int, default=64 * 1024)
+        parser.add_argument("--workers", type=int, nargs="+", default=[1, 8, 16])
+
+    def handle(self, *args, **kwargs):
+        # moto is only a development requirement
+        # pylint: disable=import-outside-toplevel
+        # Third Party
+        from moto import mock_aws
+
+        if kwargs["foia"]:
+            foia = FOIARequest.objects.get(pk=kwargs["foia"])
+        else:
+            foia = FOIARequest.objects.first()
+        body = b"0" * kwargs["size"]
+
+        for workers in kwargs["workers"]:
+            with mock_aws():
+                s3 = boto3.client("s3")
+                s3.create_bucket(Bucket=settings.AWS_AUTOIMPORT_BUCKET_NAME)
+                s3.create_bucket(Bucket=settings.AWS_MEDIA_BUCKET_NAME)
+                for i in range(kwargs["keys"]):
+                    s3.put_object(
+                        Bucket=settings.AWS_AUTOIMPORT_BUCKET_NAME,
+                        Key=f"{settings.AWS_AUTOIMPORT_PATH}1-1-20 MR{foia.pk}/{i}.pdf",
+                        Body=body,
+                    )
+
+                with transaction.atomic():
+                    log = []
+                    before = time.perf_counter()
+                    Autoimporter(log, workers=workers).run()
+                    elapsed = time.perf_counter() - before
+                    transaction.set_rollback(True)
+
+            imported = sum(line.startswith("SUCCESS") for line in log)
+            self.stdout.write(
+                f"{workers} workers: {imported} keys in {elapsed:.2f}s "
+                f"({imported / elapsed:.1f} keys/second)"
+            )
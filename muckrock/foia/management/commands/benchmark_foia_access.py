@@ -0,0 +1,59 @@
+"""Compare query plans for viewable requests with and without the access table"""
+
+# Django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+# Standard Library
+import time
+
+# MuckRock
+from muckrock.foia.models import FOIARequest
+
+
+def legacy_viewable(user):
+    """The viewable requests query as it was before the access table"""
+    query = (
+        Q(composer__user=user)
+        | Q(proxy=user)
+        | Q(pk__in=user.edit_access.all())
+        | Q(pk__in=user.read_access.all())
+        | Q(embargo_status="public")
+    )
+    if user.profile.is_agency_user:
+        query = query | Q(agency=user.profile.agency)
+    query = query | Q(
+        composer__user__profile__org_share=True,
+        composer__organization__in=user.organizations.all(),
+    )
+    return FOIARequest.objects.exclude(deleted=True).filter(query)
+
+
+class Command(BaseCommand):
+    """Benchmark viewable request queries"""
+
+    help = "Explain and time the viewable requests query for a user"
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("--iterations", type=int, default=10)
+        parser.add_argument("--limit", type=int, default=25)
+
+    def handle(self, *args, **kwargs):
+        user = User.objects.get(username=kwargs["username"])
+        querysets = [
+            ("legacy", legacy_viewable(user)),
+            ("access table", FOIARequest.objects.get_viewable(user)),
+        ]
+        for name, queryset in querysets:
+            queryset = queryset.order_by("-composer__datetime_submitted")
+            self.stdout.write(f"=== {name} ===")
+            self.stdout.write(queryset[: kwargs["limit"]].explain(analyze=True))
+
+            before = time.perf_counter()
+            for _ in range(kwargs["iterations"]):
+                count = queryset.count()
+                list(queryset[: kwargs["limit"]])
+            elapsed = (time.perf_counter() - before) / kwargs["iterations"]
+            self.stdout.write(f"{count} requests, {elapsed * 1000:.1f}ms per page\n")
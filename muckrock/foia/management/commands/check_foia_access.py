@@ -0,0 +1,41 @@
+"""Check the denormalized request access table against its sources"""
+
+# Django
+from django.core.management.base import BaseCommand
+
+# MuckRock
+from muckrock.foia.models import FOIARequest, FOIARequestAccess
+
+
+class Command(BaseCommand):
+    """Check the request access table for consistency"""
+
+    help = "Report requests whose access rows are out of date, optionally fixing them"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix", action="store_true", help="Rebuild inconsistent requests"
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **kwargs):
+        batch_size = kwargs["batch_size"]
+        foia_pks = list(FOIARequest.objects.order_by("pk").values_list("pk", flat=True))
+        total_stale = total_missing = 0
+        for i in range(0, len(foia_pks), batch_size):
+            batch = foia_pks[i : i + batch_size]
+            if kwargs["fix"]:
+                stale, missing = FOIARequestAccess.objects.rebuild(batch)
+            else:
+                stale, missing = FOIARequestAccess.objects.diff(batch)
+            for foia_id, principal_type, principal_id in sorted(missing):
+                self.stdout.write(
+                    f"Missing: request {foia_id} {principal_type} {principal_id}"
+                )
+            total_stale += len(stale)
+            total_missing += len(missing)
+
+        self.stdout.write(
+            f"{len(foia_pks)} requests checked: {total_stale} stale rows, "
+            f"{total_missing} missing rows" + (" fixed" if kwargs["fix"] else "")
+        )
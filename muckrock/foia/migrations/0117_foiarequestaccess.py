@@ -0,0 +1,84 @@
+# Generated by Django 5.2.15 on 2026-10-18 11:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BACKFILL = """
+    INSERT INTO foia_foiarequestaccess (foia_id, principal_type, principal_id)
+    SELECT id, 'public', 0 FROM foia_foiarequest WHERE embargo_status = 'public'
+    UNION
+    SELECT foia.id, 'user', composer.user_id
+    FROM foia_foiarequest foia
+    JOIN foia_foiacomposer composer ON composer.id = foia.composer_id
+    UNION
+    SELECT id, 'user', proxy_id FROM foia_foiarequest WHERE proxy_id IS NOT NULL
+    UNION
+    SELECT id, 'agency', agency_id FROM foia_foiarequest
+    UNION
+    SELECT foia.id, 'organization', composer.organization_id
+    FROM foia_foiarequest foia
+    JOIN foia_foiacomposer composer ON composer.id = foia.composer_id
+    JOIN accounts_profile profile ON profile.user_id = composer.user_id
+    WHERE profile.org_share AND composer.organization_id IS NOT NULL
+    UNION
+    SELECT foiarequest_id, 'user', user_id FROM foia_foiarequest_read_collaborators
+    UNION
+    SELECT foiarequest_id, 'user', user_id FROM foia_foiarequest_edit_collaborators
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0069_profile_blocked_from_filing"),
+        ("foia", "0116_add_embargo_message"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FOIARequestAccess",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "principal_type",
+                    models.CharField(
+                        choices=[
+                            ("public", "Public"),
+                            ("user", "User"),
+                            ("agency", "Agency"),
+                            ("organization", "Organization"),
+                        ],
+                        max_length=12,
+                    ),
+                ),
+                ("principal_id", models.PositiveIntegerField()),
+                (
+                    "foia",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="access",
+                        to="foia.foiarequest",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "FOIA Request Access",
+                "verbose_name_plural": "FOIA Request Access",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("principal_type", "principal_id", "foia"),
+                        name="foia_request_access_unique",
+                    )
+                ],
+            },
+        ),
+        migrations.RunSQL(BACKFILL, migrations.RunSQL.noop),
+    ]
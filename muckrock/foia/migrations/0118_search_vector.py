@@ -0,0 +1,44 @@
+# Generated by Django 5.2.15 on 2026-10-18 11:40
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("foia", "0117_foiarequestaccess"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="foiarequest",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="foialogentry",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="foiarequest",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="foia_request_search_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="foialogentry",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="foia_log_entry_search_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.15 on 2026-10-18 14:05
+
+# Django
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("foia", "0118_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FOIAFileAnalysis",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "ffile_name",
+                    models.CharField(
+                        help_text="The name of the file when it was analyzed",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "content_hash",
+                    models.CharField(
+                        db_index=True,
+                        help_text="The SHA-256 hash of the file",
+                        max_length=64,
+                    ),
+                ),
+                ("pages", models.PositiveIntegerField(default=0)),
+                ("fonts", models.JSONField(default=list)),
+                (
+                    "needs_embedding",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Did the original file need its fonts embedded",
+                    ),
+                ),
+                (
+                    "page_sizes",
+                    models.JSONField(
+                        default=list,
+                        help_text="The width, height and rotation of each page",
+                    ),
+                ),
+                (
+                    "error",
+                    models.TextField(
+                        blank=True,
+                        help_text="The error raised if the file could not be read",
+                    ),
+                ),
+                ("datetime_analyzed", models.DateTimeField(auto_now=True)),
+                (
+                    "file",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="analysis",
+                        to="foia.foiafile",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "FOIA Document File Analysis",
+            },
+        ),
+    ]
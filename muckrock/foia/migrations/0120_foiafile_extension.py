@@ -0,0 +1,35 @@
+# Generated by Django 5.2.15 on 2026-10-18 15:10
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("foia", "0119_foiafileanalysis"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="foiafile",
+            name="extension",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="The lower case file extension, without the dot",
+                max_length=16,
+            ),
+        ),
+        migrations.AddField(
+            model_name="foiafile",
+            name="mimetype",
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        AddIndexConcurrently(
+            model_name="foiafile",
+            index=models.Index(fields=["extension"], name="foia_file_extension_idx"),
+        ),
+    ]
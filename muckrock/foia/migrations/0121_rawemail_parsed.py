@@ -0,0 +1,44 @@
+# Generated by Django 5.2.15 on 2026-10-18 15:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("foia", "0120_foiafile_extension"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="rawemail",
+            name="text",
+            field=models.TextField(blank=True, help_text="The decoded plain text body"),
+        ),
+        migrations.AddField(
+            model_name="rawemail",
+            name="html",
+            field=models.TextField(blank=True, help_text="The decoded HTML body"),
+        ),
+        migrations.AddField(
+            model_name="rawemail",
+            name="headers",
+            field=models.JSONField(
+                default=dict, help_text="A summary of the message's headers"
+            ),
+        ),
+        migrations.AddField(
+            model_name="rawemail",
+            name="size",
+            field=models.PositiveIntegerField(
+                help_text="The size of the raw email in bytes", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="rawemail",
+            name="parsed",
+            field=models.BooleanField(
+                default=False, help_text="Have the bodies and headers been extracted"
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.15 on 2026-10-18 16:20
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("foia", "0121_rawemail_parsed"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="foiafile",
+            index=models.Index(
+                fields=["comm", "-datetime"], name="foia_file_comm_datetime_idx"
+            ),
+        ),
+    ]
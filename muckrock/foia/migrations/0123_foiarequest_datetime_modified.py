@@ -0,0 +1,23 @@
+# Generated by Django 5.2.15 on 2026-10-18 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("foia", "0122_foiafile_comm_datetime_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="foiarequest",
+            name="datetime_modified",
+            field=models.DateTimeField(
+                auto_now=True,
+                help_text="Timestamp of the latest change to this request or "
+                "anything shown with it, used for conditional requests",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.15 on 2026-10-18 21:10
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("foia", "0123_foiarequest_datetime_modified"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="foiafile",
+            name="import_key",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="Identifies the scan this file was imported from, so it "
+                "is only imported once",
+                max_length=32,
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="foiafile",
+            index=models.Index(
+                condition=models.Q(("import_key", ""), _negated=True),
+                fields=["import_key"],
+                name="foia_file_import_key_idx",
+            ),
+        ),
+    ]
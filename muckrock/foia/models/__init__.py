@@ -3,6 +3,7 @@ Models for the FOIA application
 """
 
 # MuckRock
+from muckrock.foia.models.access import *
 from muckrock.foia.models.attachment import *
 from muckrock.foia.models.communication import *
 from muckrock.foia.models.composer import *
@@ -0,0 +1,52 @@
+"""
+Models for tracking who may view a FOIA request
+"""
+
+# Django
+from django.db import models
+
+# MuckRock
+from muckrock.foia.querysets import FOIARequestAccessQuerySet
+
+
+class FOIARequestAccess(models.Model):
+    """A principal who may view a request
+
+    This is denormalized from the request's owner, proxy, collaborators,
+    agency, organizational sharing and embargo status, so that viewable
+    requests may be found with a single indexed semi-join.  It is kept up to
+    date by signals in `muckrock.foia.signals`.
+    """
+
+    PUBLIC = "public"
+    USER = "user"
+    AGENCY = "agency"
+    ORGANIZATION = "organization"
+    PRINCIPAL_TYPES = (
+        (PUBLIC, "Public"),
+        (USER, "User"),
+        (AGENCY, "Agency"),
+        (ORGANIZATION, "Organization"),
+    )
+
+    foia = models.ForeignKey(
+        "foia.FOIARequest", on_delete=models.CASCADE, related_name="access"
+    )
+    principal_type = models.CharField(max_length=12, choices=PRINCIPAL_TYPES)
+    principal_id = models.PositiveIntegerField()
+
+    objects = FOIARequestAccessQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.foia_id}: {self.principal_type} {self.principal_id}"
+
+    class Meta:
+        verbose_name = "FOIA Request Access"
+        verbose_name_plural = "FOIA Request Access"
+        app_label = "foia"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["principal_type", "principal_id", "foia"],
+                name="foia_request_access_unique",
+            )
+        ]
@@ -20,6 +20,7 @@ from email.parser import BytesParser
 # Third Party
 import chardet
 from memoize import mproperty
+from storages.backends.s3boto3 import S3Boto3Storage
 
 # MuckRock
 from muckrock.core.storage import PrivateMediaRootS3BotoStorage
@@ -351,7 +352,7 @@ class FOIACommunication(models.Model):
         # * path and name_ (for files already uploaded to s3)
         # pylint: disable=import-outside-toplevel
         # MuckRock
-        from muckrock.foia.tasks import upload_document_cloud
+        from muckrock.foia.tasks import analyze_attachment, upload_document_cloud
 
         assert (
             (file_ is not None)
@@ -382,6 +383,8 @@ class FOIACommunication(models.Model):
                 foia_file.save()
             if self.foia:
                 transaction.on_commit(lambda: upload_document_cloud.delay(foia_file.pk))
+            if foia_file.get_extension() == "pdf":
+                transaction.on_commit(lambda: analyze_attachment.delay(foia_file.pk))
         return foia_file
 
     def attach_files_to_email(self, msg):
@@ -494,8 +497,18 @@ class FOIACommunication(models.Model):
         app_label = "foia"
 
 
+# headers included in a raw email's summary
+RAW_EMAIL_HEADERS = ["From", "To", "Cc", "Subject", "Date", "Message-ID"]
+# how long signed links to raw emails are valid, in seconds
+RAW_EMAIL_URL_EXPIRE = 10 * 60
+
+
 class RawEmail(models.Model):
-    """The raw email text for a communication - stored separately for performance"""
+    """The raw email text for a communication - stored separately for performance
+
+    The bodies and a summary of the headers are extracted when the raw email
+    is set, so displaying them does not require fetching the message
+    """
 
     # nullable during transition
     # communication is depreacted and should be removed
@@ -511,6 +524,17 @@ class RawEmail(models.Model):
         storage=PrivateMediaRootS3BotoStorage(),
         blank=True,
     )
+    text = models.TextField(blank=True, help_text="The decoded plain text body")
+    html = models.TextField(blank=True, help_text="The decoded HTML body")
+    headers = models.JSONField(
+        default=dict, help_text="A summary of the message's headers"
+    )
+    size = models.PositiveIntegerField(
+        null=True, help_text="The size of the raw email in bytes"
+    )
+    parsed = models.BooleanField(
+        default=False, help_text="Have the bodies and headers been extracted"
+    )
 
     objects = RawEmailQuerySet.as_manager()
 
@@ -532,15 +556,46 @@ class RawEmail(models.Model):
         if isinstance(value, str):
             value = value.encode("utf-8")
         self.raw_email_file = ContentFile(value, name=f"{self.pk}.eml")
+        self._parse(value)
 
     def get_text_html(self):
-        """Decode the text and html from this raw email"""
-        msg = BytesParser(policy=policy.default).parsebytes(
-            self.raw_email.encode("utf8")
-        )
-        text = self._get_body(msg, "plain")
-        html = self._get_body(msg, "html")
-        return text, html
+        """Get the decoded text and html from this raw email
+
+        Raw emails stored before they were parsed on save are parsed once here
+        """
+        if not self.parsed:
+            if self.raw_email_file:
+                with self.raw_email_file.open("rb") as raw_file:
+                    self._parse(raw_file.read())
+            else:
+                self._parse(self.raw_email_db.encode("utf8"))
+            if self.parsed:
+                self.save(update_fields=["text", "html", "headers", "size", "parsed"])
+        return self.text, self.html
+
+    def _parse(self, value):
+        """Extract the bodies and headers from the raw email
+
+        Messages which can not be decoded, such as those in an unknown
+        charset, are left unparsed, and only the raw message is shown
+        """
+        # pylint: disable=broad-except
+        self.size = len(value)
+        try:
+            msg = BytesParser(policy=policy.default).parsebytes(value)
+            # postgres can not store null characters
+            text = self._get_body(msg, "plain").replace("\x00", "")
+            html = self._get_body(msg, "html").replace("\x00", "")
+            headers = {
+                name: str(msg[name]) for name in RAW_EMAIL_HEADERS if name in msg
+            }
+        except Exception as exc:
+            logger.warning("Could not parse raw email %s: %s", self.pk, exc)
+            return
+        self.text = text
+        self.html = html
+        self.headers = headers
+        self.parsed = True
 
     def _get_body(self, msg, type_):
         """Get the decoded body for the given type from the message"""
@@ -549,6 +604,40 @@ class RawEmail(models.Model):
             return body.get_content()
         return ""
 
+    def read_raw(self, start=0, length=None):
+        """Read part of the raw email, without downloading all of it"""
+        end = None if length is None else start + length
+        if not self.raw_email_file:
+            return self.raw_email_db.encode("utf8")[start:end]
+        if self.size is not None and start >= self.size:
+            return b""
+        storage = self.raw_email_file.storage
+        if isinstance(storage, S3Boto3Storage):
+            # pylint: disable=protected-access
+            obj = storage.bucket.Object(
+                storage._normalize_name(self.raw_email_file.name)
+            )
+            range_ = "bytes={}-{}".format(start, "" if end is None else end - 1)
+            return obj.get(Range=range_)["Body"].read()
+        with self.raw_email_file.open("rb") as raw_file:
+            raw_file.seek(start)
+            return raw_file.read(-1 if length is None else length)
+
+    def get_raw_url(self):
+        """A short lived signed link to download the raw email from storage"""
+        if not self.raw_email_file:
+            return None
+        return self.raw_email_file.storage.url(
+            self.raw_email_file.name,
+            parameters={
+                "ResponseContentType": "message/rfc822",
+                "ResponseContentDisposition": 'attachment; filename="{}.eml"'.format(
+                    self.pk
+                ),
+            },
+            expire=RAW_EMAIL_URL_EXPIRE,
+        )
+
     class Meta:
         app_label = "foia"
 
@@ -31,6 +31,7 @@ from constance import config
 from taggit.managers import TaggableManager
 
 # MuckRock
+from muckrock.core.models import LoadedValuesMixin
 from muckrock.core.utils import TempDisconnectSignal, mailchimp_journey
 from muckrock.foia.constants import COMPOSER_EDIT_DELAY, COMPOSER_SUBMIT_DELAY
 from muckrock.foia.exceptions import BlockedFromFilingError
@@ -44,7 +45,7 @@ logger = logging.getLogger(__name__)
 STATUS = [("started", "Draft"), ("submitted", "Processing"), ("filed", "Filed")]
 
 
-class FOIAComposer(models.Model):
+class FOIAComposer(LoadedValuesMixin, models.Model):
     """A FOIA request composer"""
 
     user = models.ForeignKey(User, on_delete=models.PROTECT, related_name="composers")
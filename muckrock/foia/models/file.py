@@ -12,6 +12,7 @@ from django.db import models, transaction
 # Standard Library
 import logging
 import os
+from mimetypes import guess_type
 
 # MuckRock
 from muckrock.foia.querysets import FOIAFileQuerySet
@@ -19,6 +20,14 @@ from muckrock.foia.utils import file_name_trim
 
 logger = logging.getLogger(__name__)
 
+# longer extensions are not stored, and are computed from the name instead
+MAX_EXTENSION_LENGTH = 16
+
+
+def file_extension(name):
+    """Get the lower case extension of a file name, without the dot"""
+    return os.path.splitext(os.path.basename(name))[1][1:].lower()
+
 
 class FOIAFile(models.Model):
     """An arbitrary file attached to a FOIA request"""
@@ -41,19 +50,46 @@ class FOIAFile(models.Model):
     description = models.TextField(blank=True)
     doc_id = models.SlugField(max_length=266, blank=True, editable=False)
     pages = models.PositiveIntegerField(default=0, editable=False)
+    extension = models.CharField(
+        max_length=MAX_EXTENSION_LENGTH,
+        blank=True,
+        editable=False,
+        help_text="The lower case file extension, without the dot",
+    )
+    mimetype = models.CharField(max_length=255, blank=True, editable=False)
+    import_key = models.CharField(
+        max_length=32,
+        blank=True,
+        editable=False,
+        help_text="Identifies the scan this file was imported from, so it is "
+        "only imported once",
+    )
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        """Keep the file type in sync with the file name"""
+        # pylint: disable=signature-differs
+        self.set_file_type()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "ffile" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "extension", "mimetype"}
+        super().save(*args, **kwargs)
+
+    def set_file_type(self):
+        """Set the extension and mimetype from the file name"""
+        extension = file_extension(self.ffile.name or "")
+        self.extension = extension if len(extension) <= MAX_EXTENSION_LENGTH else ""
+        self.mimetype = guess_type(self.ffile.name or "")[0] or ""
+
     def name(self):
         """Return the basename of the file"""
         return os.path.basename(self.ffile.name)
 
     def is_doccloud(self):
         """Is this a file doc cloud can support"""
-
-        _, ext = os.path.splitext(self.ffile.name)
-        return ext.lower() in settings.DOCCLOUD_EXTENSIONS
+        return "." + self.get_extension() in settings.DOCCLOUD_EXTENSIONS
 
     def get_thumbnail(self):
         """Get the url to the thumbnail image. If document is not public,
@@ -86,7 +122,9 @@ class FOIAFile(models.Model):
 
     def get_extension(self):
         """Get the file extension"""
-        return os.path.splitext(self.name())[1][1:].lower()
+        if self.extension:
+            return self.extension
+        return file_extension(self.ffile.name)
 
     def get_foia(self):
         """Get FOIA"""
@@ -112,7 +150,7 @@ class FOIAFile(models.Model):
         """Clone this file to a new communication"""
         # pylint: disable=import-outside-toplevel
         # MuckRock
-        from muckrock.foia.tasks import upload_document_cloud
+        from muckrock.foia.tasks import analyze_attachment, upload_document_cloud
 
         original_id = self.pk
         self.pk = None
@@ -132,6 +170,8 @@ class FOIAFile(models.Model):
         self.ffile = new_ffile
         self.save()
         transaction.on_commit(lambda: upload_document_cloud.delay(self.pk))
+        if self.get_extension() == "pdf":
+            transaction.on_commit(lambda: analyze_attachment.delay(self.pk))
 
     @property
     def access(self):
@@ -152,6 +192,61 @@ class FOIAFile(models.Model):
         verbose_name = "FOIA Document File"
         ordering = ["datetime"]
         app_label = "foia"
+        indexes = [
+            models.Index(fields=["extension"], name="foia_file_extension_idx"),
+            # for preloading the most recent files of communications
+            models.Index(
+                fields=["comm", "-datetime"], name="foia_file_comm_datetime_idx"
+            ),
+            # for skipping scans which have already been imported
+            models.Index(
+                fields=["import_key"],
+                condition=~models.Q(import_key=""),
+                name="foia_file_import_key_idx",
+            ),
+        ]
+
+
+class FOIAFileAnalysis(models.Model):
+    """The results of analyzing a PDF file, used when preparing it for mail
+
+    Fonts which need embedding are embedded in a copy of the file when it is
+    mailed, the stored file is never changed.  It is current as long as the
+    file name matches.
+    """
+
+    file = models.OneToOneField(
+        FOIAFile, related_name="analysis", on_delete=models.CASCADE
+    )
+    ffile_name = models.CharField(
+        max_length=255, help_text="The name of the file when it was analyzed"
+    )
+    content_hash = models.CharField(
+        max_length=64, db_index=True, help_text="The SHA-256 hash of the file"
+    )
+    pages = models.PositiveIntegerField(default=0)
+    fonts = models.JSONField(default=list)
+    needs_embedding = models.BooleanField(
+        default=False, help_text="Did the original file need its fonts embedded"
+    )
+    page_sizes = models.JSONField(
+        default=list, help_text="The width, height and rotation of each page"
+    )
+    error = models.TextField(
+        blank=True, help_text="The error raised if the file could not be read"
+    )
+    datetime_analyzed = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return "Analysis: {}".format(self.ffile_name)
+
+    def is_current(self):
+        """Has the file not changed since it was analyzed"""
+        return self.ffile_name == self.file.ffile.name
+
+    class Meta:
+        verbose_name = "FOIA Document File Analysis"
+        app_label = "foia"
 
 
 def get_path(file_name):
@@ -4,6 +4,8 @@ Models for FOIAs obtained from an agency's FOIA Logs
 
 # Django
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.template.loader import render_to_string
 from django.urls import reverse
@@ -57,6 +59,7 @@ class FOIALogEntry(models.Model):
         verbose_name = "FOIA Log Entry"
         verbose_name_plural = "FOIA Log Entries"
         app_label = "foia"
+        indexes = [GinIndex(fields=["search_vector"], name="foia_log_entry_search_idx")]
 
     request_id = models.CharField(max_length=255)
     requester = models.CharField(max_length=255, blank=True)
@@ -78,6 +81,7 @@ class FOIALogEntry(models.Model):
         on_delete=models.CASCADE,
     )
     datetime_created = models.DateTimeField(default=timezone.now)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     def __str__(self):
         return f"FOIA Log Entry #{self.request_id}"
@@ -8,6 +8,8 @@ Models for the FOIA application
 # Django
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.mail import EmailMultiAlternatives, get_connection
 from django.db import connection, models, transaction
 from django.db.models import Sum
@@ -43,6 +45,7 @@ from muckrock.communication.models import (
     PhoneNumber,
 )
 from muckrock.core import utils
+from muckrock.core.models import LoadedValuesMixin
 from muckrock.core.utils import (
     TempDisconnectSignal,
     clear_cloudfront_cache,
@@ -80,7 +83,7 @@ EMBARGO_CHOICES = [
 ]
 
 
-class FOIARequest(models.Model):
+class FOIARequest(LoadedValuesMixin, models.Model):
     """A Freedom of Information Act request"""
 
     # pylint: disable=too-many-public-methods
@@ -122,6 +125,12 @@ class FOIARequest(models.Model):
         verbose_name="Date response received",
         help_text="Timestamp of when this request was completed",
     )
+    datetime_modified = models.DateTimeField(
+        auto_now=True,
+        null=True,
+        help_text="Timestamp of the latest change to this request or anything "
+        "shown with it, used for conditional requests",
+    )
     date_due = models.DateField(blank=True, null=True, db_index=True)
     days_until_due = models.IntegerField(blank=True, null=True)
     date_followup = models.DateField(blank=True, null=True)
@@ -245,6 +254,7 @@ class FOIARequest(models.Model):
         verbose_name="No Index",
         help_text="This request's page should not be indexed by search engines",
     )
+    search_vector = SearchVectorField(null=True, editable=False)
 
     objects = FOIARequestQuerySet.as_manager()
     tags = TaggableManager(through=TaggedItemBase, blank=True)
@@ -1531,6 +1541,7 @@ class FOIARequest(models.Model):
         ordering = ["title"]
         verbose_name = "FOIA Request"
         app_label = "foia"
+        indexes = [GinIndex(fields=["search_vector"], name="foia_request_search_idx")]
         permissions = (
             ("embargo_foiarequest", "Can embargo request to make it private"),
             ("embargo_perm_foiarequest", "Can embargo a request permananently"),
@@ -12,8 +12,8 @@ from django.utils.text import slugify
 
 # Standard Library
 import logging
+from collections import namedtuple
 from datetime import date, datetime, time
-from itertools import groupby
 
 # Third Party
 import requests
@@ -24,17 +24,26 @@ from muckrock.core.models import ExtractDay
 
 logger = logging.getLogger(__name__)
 
+# Statistics on the files preloaded for a list - `displayed` counts up to one
+# less than the limit per communication, as one extra is loaded to know if
+# there are more files than are shown
+PreloadFileStats = namedtuple("PreloadFileStats", "records fetched displayed")
+
 
 class PreloadFileQuerysetMixin:
-    """Mixin for preloading related files"""
+    """Mixin for preloading related files
+
+    The statistics for the files loaded are available as
+    `preload_files_stats` once the queryset has been evaluated
+    """
 
     files_path = "files"
-    comm_id = "id"
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._preload_files_amt = 0
         self._preload_files_done = False
+        self.preload_files_stats = None
 
     def _clone(self):
         """Add _preload_files_amt to values to copy over in a clone"""
@@ -56,13 +65,27 @@ class PreloadFileQuerysetMixin:
         # MuckRock
         from muckrock.foia.models.file import FOIAFile
 
-        comm_ids = [getattr(i, self.comm_id) for i in self._result_cache]
-        if comm_ids:
-            files = FOIAFile.objects.preload(comm_ids, self._preload_files_amt)
-            for obj in self._result_cache:
-                self._process_preloaded_files(obj, files)
+        comms = [self._get_communication(obj) for obj in self._result_cache]
+        files = FOIAFile.objects.preload(comms, self._preload_files_amt)
+        for obj in self._result_cache:
+            self._process_preloaded_files(obj, files)
         self._preload_files_done = True
 
+        self.preload_files_stats = PreloadFileStats(
+            records=len(comms),
+            fetched=sum(len(f) for f in files.values()),
+            displayed=sum(
+                min(len(f), self._preload_files_amt - 1) for f in files.values()
+            ),
+        )
+        logger.debug(
+            "Preloaded files for %s: %s", self.model.__name__, self.preload_files_stats
+        )
+
+    def _get_communication(self, obj):
+        """Get the communication for each record"""
+        return obj
+
     def _process_preloaded_files(self, obj, files):
         """What to do with the preloaded files for each record"""
         obj.display_files = files.get(obj.pk, [])
@@ -88,24 +111,17 @@ class FOIARequestQuerySet(models.QuerySet):
             return self.all()
 
         if user.is_authenticated:
-            # Requests are visible if you own them, have view or edit permissions,
-            # or if they are not embargoed
-            query = (
-                Q(composer__user=user)
-                | Q(proxy=user)
-                | Q(pk__in=user.edit_access.all())
-                | Q(pk__in=user.read_access.all())
-                | Q(embargo_status="public")
-            )
-            # agency users may also view requests for their agency
-            if user.profile.is_agency_user:
-                query = query | Q(agency=user.profile.agency)
-            # organizational users may also view requests from their org that are shared
-            query = query | Q(
-                composer__user__profile__org_share=True,
-                composer__organization__in=user.organizations.all(),
+            # pylint: disable=import-outside-toplevel
+            # MuckRock
+            from muckrock.foia.models import FOIARequestAccess
+
+            # Requests are visible if you own them, are their proxy, have view
+            # or edit permissions, are from their agency, they are shared with
+            # your organization, or if they are not embargoed - all of which is
+            # denormalized into the access table
+            return self.exclude(deleted=True).filter(
+                pk__in=FOIARequestAccess.objects.get_viewable(user).values("foia_id")
             )
-            return self.exclude(deleted=True).filter(query)
         else:
             # anonymous user, filter out embargoes and noindex requests
             return (
@@ -312,6 +328,93 @@ class FOIARequestQuerySet(models.QuerySet):
         return with_response.union(without_response)
 
 
+class FOIARequestAccessQuerySet(models.QuerySet):
+    """Custom Query Set for FOIA Request Access"""
+
+    def get_viewable(self, user):
+        """Get the access rows which allow the given user to view a request"""
+        query = (
+            Q(principal_type=self.model.PUBLIC)
+            | Q(principal_type=self.model.USER, principal_id=user.pk)
+            | Q(
+                principal_type=self.model.ORGANIZATION,
+                principal_id__in=user.organizations.values("pk"),
+            )
+        )
+        if user.profile.is_agency_user:
+            query |= Q(
+                principal_type=self.model.AGENCY, principal_id=user.profile.agency_id
+            )
+        return self.filter(query)
+
+    def compute(self, foia_pks):
+        """Calculate the access rows the given requests should have"""
+        foia_model = self.model.foia.field.related_model
+        rows = set()
+        foias = foia_model.objects.filter(pk__in=foia_pks).values_list(
+            "pk",
+            "embargo_status",
+            "composer__user_id",
+            "proxy_id",
+            "agency_id",
+            "composer__organization_id",
+            "composer__user__profile__org_share",
+        )
+        for pk, embargo_status, user_id, proxy_id, agency_id, org_id, share in foias:
+            if embargo_status == "public":
+                rows.add((pk, self.model.PUBLIC, 0))
+            rows.add((pk, self.model.USER, user_id))
+            if proxy_id:
+                rows.add((pk, self.model.USER, proxy_id))
+            rows.add((pk, self.model.AGENCY, agency_id))
+            if share and org_id:
+                rows.add((pk, self.model.ORGANIZATION, org_id))
+        for field in ("read_collaborators", "edit_collaborators"):
+            through = getattr(foia_model, field).through
+            rows.update(
+                (pk, self.model.USER, user_id)
+                for pk, user_id in through.objects.filter(
+                    foiarequest_id__in=foia_pks
+                ).values_list("foiarequest_id", "user_id")
+            )
+        return rows
+
+    def diff(self, foia_pks):
+        """Compare the stored access rows to what they should be
+
+        Returns the pks of stale rows and the rows which are missing
+        """
+        expected = self.compute(foia_pks)
+        existing = {
+            (foia_id, principal_type, principal_id): pk
+            for pk, foia_id, principal_type, principal_id in self.filter(
+                foia_id__in=foia_pks
+            ).values_list("pk", "foia_id", "principal_type", "principal_id")
+        }
+        stale = [pk for row, pk in existing.items() if row not in expected]
+        missing = expected - existing.keys()
+        return stale, missing
+
+    def rebuild(self, foia_pks):
+        """Bring the access rows for the given requests up to date"""
+        stale, missing = self.diff(foia_pks)
+        if stale:
+            self.filter(pk__in=stale).delete()
+        if missing:
+            self.bulk_create(
+                [
+                    self.model(
+                        foia_id=foia_id,
+                        principal_type=principal_type,
+                        principal_id=principal_id,
+                    )
+                    for foia_id, principal_type, principal_id in missing
+                ],
+                ignore_conflicts=True,
+            )
+        return stale, missing
+
+
 class FOIAComposerQuerySet(models.QuerySet):
     """Custom Query Set for FOIA Composers"""
 
@@ -442,30 +545,42 @@ class FOIAFileQuerySet(models.QuerySet):
             # anonymous user, filter out embargoes
             return self.filter(comm__foia__embargo_status="public")
 
-    def preload(self, comm_ids, limit=11):
-        """Preload the top limit files for the communications in comm_ids"""
+    def preload(self, comms, limit=11):
+        """Preload the most recent limit files for each of the communications
+
+        A lateral join fetches each communication's files using the
+        (comm_id, datetime) index.  The communications given are attached to
+        their files, so anything already loaded on them is not fetched again.
+        """
+        comms = {comm.pk: comm for comm in comms}
+        if not comms:
+            return {}
         file_qs = self.raw(
             """
-            SELECT rank_filter.* FROM (
-                SELECT foia_foiafile.*, ROW_NUMBER() OVER (
-                    PARTITION BY comm_id ORDER BY foia_foiafile.datetime DESC
-                ) FROM foia_foiafile
-                WHERE comm_id IN %s
-            ) rank_filter WHERE ROW_NUMBER <= %s
+            SELECT foia_foiafile.* FROM unnest(%s::integer[]) AS comms (id)
+            CROSS JOIN LATERAL (
+                SELECT * FROM foia_foiafile
+                WHERE foia_foiafile.comm_id = comms.id
+                ORDER BY foia_foiafile.datetime DESC
+                LIMIT %s
+            ) foia_foiafile
+            ORDER BY foia_foiafile.comm_id, foia_foiafile.datetime DESC
             """,
-            [tuple(comm_ids), limit],
-        ).prefetch_related("comm__foia")
-        return {
-            comm_id: list(files)
-            for comm_id, files in groupby(file_qs, lambda f: f.comm_id)
-        }
+            [list(comms), limit],
+        )
+        files = {}
+        for file_ in file_qs:
+            file_.comm = comms[file_.comm_id]
+            files.setdefault(file_.comm_id, []).append(file_)
+        return files
 
     def get_doccloud(self):
         """Return files which can be uploaded to DocumentCloud"""
-        is_doccloud = Q()
-        for ext in settings.DOCCLOUD_EXTENSIONS:
-            is_doccloud |= Q(ffile__iendswith=ext)
-        return self.filter(is_doccloud)
+        return self.filter(
+            extension__in=[
+                ext.lstrip(".").lower() for ext in settings.DOCCLOUD_EXTENSIONS
+            ]
+        )
 
 
 class FOIATemplateQuerySet(models.QuerySet):
@@ -3,18 +3,32 @@
 # Django
 from django.conf import settings
 from django.db import transaction
-from django.db.models.signals import post_delete, pre_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.utils import timezone
+
+# Standard Library
+import weakref
 
 # Third Party
 from documentcloud.exceptions import DoesNotExistError
 
 # MuckRock
+from muckrock.accounts.models import Profile
 from muckrock.core.utils import (
     clear_cloudfront_cache,
     get_dc_client,
     get_s3_storage_bucket,
 )
-from muckrock.foia.models import FOIAFile, FOIARequest, OutboundRequestAttachment
+from muckrock.foia.models import (
+    FOIACommunication,
+    FOIAComposer,
+    FOIAFile,
+    FOIANote,
+    FOIARequest,
+    FOIARequestAccess,
+    OutboundRequestAttachment,
+    TrackingNumber,
+)
 from muckrock.foia.tasks import upload_document_cloud
 
 
@@ -30,6 +44,153 @@ def foia_update_embargo(sender, **kwargs):
             transaction.on_commit(lambda doc=doc: upload_document_cloud.delay(doc.pk))
 
 
+# changes to these fields may change who may view a request
+FOIA_ACCESS_FIELDS = ["embargo_status", "composer_id", "proxy_id", "agency_id"]
+COMPOSER_ACCESS_FIELDS = ["user_id", "organization_id"]
+PROFILE_ACCESS_FIELDS = ["org_share"]
+
+
+def foia_access_pre_save(sender, instance, **kwargs):
+    """Check if a request's viewability may change with this save"""
+    # pylint: disable=unused-argument, protected-access
+    instance._access_changed = bool(instance.get_changed_fields(FOIA_ACCESS_FIELDS))
+
+
+def foia_access_post_save(sender, instance, **kwargs):
+    """Update who may view a request"""
+    # pylint: disable=unused-argument
+    if getattr(instance, "_access_changed", True):
+        FOIARequestAccess.objects.rebuild([instance.pk])
+
+
+def composer_access_pre_save(sender, instance, **kwargs):
+    """Check if the viewability of a composer's requests may change"""
+    # pylint: disable=unused-argument, protected-access
+    instance._access_changed = bool(instance.get_changed_fields(COMPOSER_ACCESS_FIELDS))
+
+
+def composer_access_post_save(sender, instance, created, **kwargs):
+    """Update who may view a composer's requests"""
+    # pylint: disable=unused-argument
+    if not created and getattr(instance, "_access_changed", True):
+        FOIARequestAccess.objects.rebuild(
+            list(instance.foias.values_list("pk", flat=True))
+        )
+
+
+def profile_access_pre_save(sender, instance, **kwargs):
+    """Check if org sharing has been turned on or off"""
+    # pylint: disable=unused-argument, protected-access
+    instance._access_changed = bool(instance.get_changed_fields(PROFILE_ACCESS_FIELDS))
+
+
+def profile_access_post_save(sender, instance, created, **kwargs):
+    """Update who may view a user's requests when org sharing changes"""
+    # pylint: disable=unused-argument
+    if not created and getattr(instance, "_access_changed", True):
+        FOIARequestAccess.objects.rebuild(
+            list(
+                FOIARequest.objects.filter(composer__user=instance.user_id).values_list(
+                    "pk", flat=True
+                )
+            )
+        )
+
+
+def foia_access_collaborators(sender, instance, action, reverse, pk_set, **kwargs):
+    """Update who may view a request when its collaborators change"""
+    # pylint: disable=unused-argument, protected-access, too-many-arguments
+    if action in ("post_add", "post_remove"):
+        foia_pks = pk_set if reverse else [instance.pk]
+    elif action == "pre_clear" and reverse:
+        # the requests are no longer known after a reverse clear
+        instance._access_clear_pks = list(
+            sender.objects.filter(user=instance).values_list(
+                "foiarequest_id", flat=True
+            )
+        )
+        return
+    elif action == "post_clear":
+        foia_pks = (
+            getattr(instance, "_access_clear_pks", []) if reverse else [instance.pk]
+        )
+    else:
+        return
+    FOIARequestAccess.objects.rebuild(list(foia_pks))
+
+
+class FOIATouch:
+    """Mark requests as modified once the transaction they changed in commits
+
+    One touch is shared by every change in a transaction, so each request is
+    updated at most once no matter how many of its related objects change
+    """
+
+    def __init__(self):
+        self.foia_pks = set()
+        self.comm_pks = set()
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        now = timezone.now()
+        if self.foia_pks:
+            FOIARequest.objects.filter(pk__in=self.foia_pks).update(
+                datetime_modified=now
+            )
+        if self.comm_pks:
+            FOIARequest.objects.filter(communications__in=self.comm_pks).update(
+                datetime_modified=now
+            )
+
+
+def foia_touch(foia_pks=(), comm_pks=()):
+    """Mark requests as modified, so conditional requests see the change"""
+    connection = transaction.get_connection()
+    # a weak reference, so a touch dropped by a rollback is not reused
+    ref = getattr(connection, "foia_touch", None)
+    touch = ref() if ref is not None else None
+    new = touch is None or touch.done
+    if new:
+        touch = FOIATouch()
+        connection.foia_touch = weakref.ref(touch)
+    touch.foia_pks.update(foia_pks)
+    touch.comm_pks.update(comm_pks)
+    if new:
+        # outside of a transaction this runs the touch immediately
+        transaction.on_commit(touch)
+
+
+def foia_related_modified(sender, instance, **kwargs):
+    """A communication, note or tracking ID of a request has changed"""
+    # pylint: disable=unused-argument
+    foia_touch(foia_pks=[instance.foia_id])
+
+
+def composer_modified(sender, instance, created, **kwargs):
+    """A composer, which is shown with its requests, has changed"""
+    # pylint: disable=unused-argument
+    if not created:
+        foia_touch(foia_pks=instance.foias.values_list("pk", flat=True))
+
+
+def foia_file_modified(sender, instance, **kwargs):
+    """A file of a request has changed"""
+    # pylint: disable=unused-argument
+    foia_touch(comm_pks=[instance.comm_id])
+
+
+def foia_m2m_modified(sender, instance, action, reverse, pk_set, **kwargs):
+    """The tags or collaborators of a request have changed"""
+    # pylint: disable=unused-argument, too-many-arguments
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        foia_touch(foia_pks=[instance.pk])
+    elif pk_set:
+        foia_touch(foia_pks=pk_set)
+
+
 def foia_file_delete_s3(sender, **kwargs):
     """Delete file from S3 after the model is deleted"""
     # pylint: disable=unused-argument
@@ -75,6 +236,84 @@ pre_save.connect(
     dispatch_uid="muckrock.foia.signals.embargo",
 )
 
+pre_save.connect(
+    foia_access_pre_save,
+    sender=FOIARequest,
+    dispatch_uid="muckrock.foia.signals.access_pre_save",
+)
+
+post_save.connect(
+    foia_access_post_save,
+    sender=FOIARequest,
+    dispatch_uid="muckrock.foia.signals.access_post_save",
+)
+
+pre_save.connect(
+    composer_access_pre_save,
+    sender=FOIAComposer,
+    dispatch_uid="muckrock.foia.signals.composer_access_pre_save",
+)
+
+post_save.connect(
+    composer_access_post_save,
+    sender=FOIAComposer,
+    dispatch_uid="muckrock.foia.signals.composer_access_post_save",
+)
+
+pre_save.connect(
+    profile_access_pre_save,
+    sender=Profile,
+    dispatch_uid="muckrock.foia.signals.profile_access_pre_save",
+)
+
+post_save.connect(
+    profile_access_post_save,
+    sender=Profile,
+    dispatch_uid="muckrock.foia.signals.profile_access_post_save",
+)
+
+m2m_changed.connect(
+    foia_access_collaborators,
+    sender=FOIARequest.read_collaborators.through,
+    dispatch_uid="muckrock.foia.signals.access_read_collaborators",
+)
+
+m2m_changed.connect(
+    foia_access_collaborators,
+    sender=FOIARequest.edit_collaborators.through,
+    dispatch_uid="muckrock.foia.signals.access_edit_collaborators",
+)
+
+for signal, name in ((post_save, "save"), (post_delete, "delete")):
+    for model in (FOIACommunication, FOIANote, TrackingNumber):
+        signal.connect(
+            foia_related_modified,
+            sender=model,
+            dispatch_uid=f"muckrock.foia.signals.modified_{model.__name__}_{name}",
+        )
+    signal.connect(
+        foia_file_modified,
+        sender=FOIAFile,
+        dispatch_uid=f"muckrock.foia.signals.modified_FOIAFile_{name}",
+    )
+
+post_save.connect(
+    composer_modified,
+    sender=FOIAComposer,
+    dispatch_uid="muckrock.foia.signals.modified_composer",
+)
+
+for through in (
+    FOIARequest.tags.through,
+    FOIARequest.read_collaborators.through,
+    FOIARequest.edit_collaborators.through,
+):
+    m2m_changed.connect(
+        foia_m2m_modified,
+        sender=through,
+        dispatch_uid=f"muckrock.foia.signals.modified_{through.__name__}",
+    )
+
 post_delete.connect(
     foia_file_delete_s3,
     sender=FOIAFile,
@@ -0,0 +1,119 @@
+"""
+Tests for importing scanned documents
+"""
+
+# Django
+from django.conf import settings
+from django.test import TestCase
+
+# Standard Library
+from unittest.mock import patch
+
+# Third Party
+import boto3
+from moto import mock_aws
+
+# MuckRock
+from muckrock.foia.autoimport import Autoimporter, parse_name
+from muckrock.foia.factories import FOIARequestFactory
+from muckrock.foia.models import FOIAFile
+
+
+class ParseNameTests(TestCase):
+    """Scan file names are parsed into requests and a date"""
+
+    def test_parse_name(self):
+        foia_pks, file_datetime = parse_name("10-1-20 MR123 MR456.pdf")
+        assert foia_pks == [123, 456]
+        assert file_datetime.date().isoformat() == "2020-10-01"
+
+    def test_parse_bad_name(self):
+        with self.assertRaises(ValueError):
+            parse_name("scan.pdf")
+
+
+@mock_aws
+class AutoimporterTests(TestCase):
+    """Import files from the autoimport bucket"""
+
+    def setUp(self):
+        self.s3 = boto3.client("s3")
+        self.s3.create_bucket(Bucket=settings.AWS_AUTOIMPORT_BUCKET_NAME)
+        self.s3.create_bucket(Bucket=settings.AWS_MEDIA_BUCKET_NAME)
+        self.foias = FOIARequestFactory.create_batch(2)
+
+    def put(self, name, body=b"%PDF-1.4"):
+        """Upload a scan"""
+        self.s3.put_object(
+            Bucket=settings.AWS_AUTOIMPORT_BUCKET_NAME,
+            Key=settings.AWS_AUTOIMPORT_PATH + name,
+            Body=body,
+        )
+
+    def keys(self):
+        """List the keys left in the autoimport bucket"""
+        response = self.s3.list_objects_v2(Bucket=settings.AWS_AUTOIMPORT_BUCKET_NAME)
+        return sorted(obj["Key"] for obj in response.get("Contents", []))
+
+    def files(self, foia):
+        """Count the files imported to a request"""
+        return FOIAFile.objects.filter(comm__foia=foia).count()
+
+    def test_import(self):
+        foia_a, foia_b = self.foias
+        self.put(f"10-1-20 MR{foia_a.pk}.pdf")
+        self.put(f"10-1-20 MR{foia_a.pk} MR{foia_b.pk}/one.pdf")
+        self.put(f"10-1-20 MR{foia_a.pk} MR{foia_b.pk}/two.pdf")
+        self.put("scan.pdf")
+        self.put("10-1-20 MR0.pdf")
+
+        log = []
+        Autoimporter(log).run()
+
+        assert self.files(foia_a) == 3
+        assert self.files(foia_b) == 2
+        assert foia_a.communications.filter(response=True, hidden=True).count() == 2
+        assert self.keys() == ["review/10-1-20 MR0.pdf", "review/scan.pdf"]
+        assert sum(line.startswith("SUCCESS") for line in log) == 5
+
+    def test_resume(self):
+        foia = self.foias[0]
+        self.put(f"10-1-20 MR{foia.pk}.pdf")
+        Autoimporter([]).run()
+        # a run which timed out before deleting the key
+        self.put(f"10-1-20 MR{foia.pk}.pdf")
+        Autoimporter([]).run()
+
+        assert self.files(foia) == 1
+        assert self.keys() == []
+
+    def test_nested(self):
+        foia = self.foias[0]
+        self.put(f"10-1-20 MR{foia.pk}/one.pdf")
+        self.put(f"10-1-20 MR{foia.pk}/nested/two.pdf")
+        self.put(f"10-1-20 MR{foia.pk}/nested/", body=b"")
+        log = []
+        Autoimporter(log).run()
+
+        assert self.files(foia) == 2
+        assert self.keys() == []
+        assert any(line.startswith("ERROR: nested") for line in log)
+
+    def test_error(self):
+        foia = self.foias[0]
+        self.put(f"10-1-20 MR{foia.pk}/one.pdf")
+        self.put(f"10-1-20 MR{foia.pk}/two.pdf")
+        with patch(
+            "muckrock.foia.models.FOIACommunication.attach_file",
+            side_effect=ValueError("bad"),
+        ):
+            Autoimporter([]).run()
+
+        assert self.files(foia) == 0
+        assert self.keys() == [
+            f"review/10-1-20 MR{foia.pk}/one.pdf",
+            f"review/10-1-20 MR{foia.pk}/two.pdf",
+        ]
+        # the copies to the media bucket are cleaned up
+        response = self.s3.list_objects_v2(Bucket=settings.AWS_MEDIA_BUCKET_NAME)
+        assert "Contents" not in response
@@ -4,10 +4,12 @@ Tests for the FOIACommunication model
 
 # Django
 from django import test
+from django.utils import timezone
 
 # Standard Library
 import logging
 import os
+from datetime import timedelta
 from unittest.mock import patch
 
 # Third Party
@@ -90,6 +92,33 @@ class TestCommunication(test.TestCase):
         assert self.foia.email == foia_email
 
 
+class TestPreloadFiles(test.TestCase):
+    """Tests preloading the files for lists of communications"""
+
+    def test_preload_files(self):
+        """The most recent files are attached to each communication"""
+        foia = FOIARequestFactory()
+        comms = FOIACommunicationFactory.create_batch(2, foia=foia)
+        for i in range(12):
+            FOIAFileFactory(comm=comms[0], datetime=timezone.now() - timedelta(days=i))
+        FOIAFileFactory(comm=comms[1])
+        FOIACommunicationFactory(foia=foia)
+
+        with self.assertNumQueries(2):
+            queryset = foia.communications.select_related("foia").preload_files()
+            loaded = {comm.pk: comm for comm in queryset}
+            # the communications and their requests are not fetched again
+            for comm in loaded.values():
+                for file_ in comm.display_files:
+                    assert file_.comm.foia == foia
+
+        files = loaded[comms[0].pk].display_files
+        assert len(files) == 11
+        assert files == sorted(files, key=lambda f: f.datetime, reverse=True)
+        assert len(loaded[comms[1].pk].display_files) == 1
+        assert queryset.preload_files_stats == (3, 12, 11)
+
+
 class TestCommunicationMove(RunCommitHooksMixin, test.TestCase):
     """Tests the move method"""
 
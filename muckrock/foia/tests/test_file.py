@@ -14,6 +14,8 @@ import pytest
 from muckrock.core.factories import UserFactory
 from muckrock.core.test_utils import http_get_response
 from muckrock.foia.factories import FOIAFileFactory
+from muckrock.foia.filters import FOIARequestFilterSet
+from muckrock.foia.models import FOIAFile, FOIARequest
 from muckrock.foia.views import FOIAFileListView
 
 
@@ -48,3 +50,30 @@ class TestRequestFilesView(TestCase):
         assert not self.foia.has_perm(user, "view")
         with pytest.raises(Http404):
             http_get_response(self.url, self.view, user, **self.kwargs)
+
+
+class TestFileType(TestCase):
+    """The file type is stored to be queried by"""
+
+    def test_file_type(self):
+        """The extension and mimetype are set on save"""
+        file_ = FOIAFileFactory(ffile__filename="Records.PDF")
+        assert file_.extension == "pdf"
+        assert file_.mimetype == "application/pdf"
+        assert file_.get_extension() == "pdf"
+        assert file_.is_doccloud()
+
+    def test_get_doccloud(self):
+        """Only files DocumentCloud supports are returned"""
+        pdf = FOIAFileFactory(ffile__filename="records.pdf")
+        FOIAFileFactory(ffile__filename="records.zip")
+        assert list(FOIAFile.objects.get_doccloud()) == [pdf]
+
+    def test_filter_file_types(self):
+        """Requests may be filtered by the types of their files"""
+        pdf = FOIAFileFactory(ffile__filename="records.pdf")
+        FOIAFileFactory(ffile__filename="records.zip")
+        filter_set = FOIARequestFilterSet(
+            {"file_types": ".PDF, doc"}, queryset=FOIARequest.objects.all()
+        )
+        assert list(filter_set.qs) == [pdf.comm.foia]
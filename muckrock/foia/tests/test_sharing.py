@@ -5,9 +5,14 @@ Tests sharing a FOIA request with other users
 # Django
 from django.test import TestCase
 
+# Standard Library
+from unittest.mock import patch
+
 # MuckRock
+from muckrock.accounts.models import Profile
 from muckrock.core.factories import UserFactory
 from muckrock.foia.factories import FOIARequestFactory
+from muckrock.foia.models import FOIARequest, FOIARequestAccess
 from muckrock.organization.factories import MembershipFactory, OrganizationFactory
 
 
@@ -124,3 +129,69 @@ class TestRequestSharing(TestCase):
         assert self.foia.has_perm(user, "view")
         # non-org member still cannot view it
         assert not self.foia.has_perm(self.editor, "view")
+
+
+class TestViewableAccess(TestCase):
+    """Viewable requests are found through the denormalized access table"""
+
+    def setUp(self):
+        self.foia = FOIARequestFactory(embargo_status="embargo")
+        self.user = UserFactory()
+
+    def viewable(self, user):
+        """Is the request in the user's viewable requests"""
+        return FOIARequest.objects.get_viewable(user).filter(pk=self.foia.pk).exists()
+
+    def test_owner(self):
+        assert self.viewable(self.foia.user)
+        assert not self.viewable(self.user)
+
+    def test_embargo(self):
+        self.foia.embargo_status = "public"
+        self.foia.save()
+        assert self.viewable(self.user)
+        self.foia.embargo_status = "embargo"
+        self.foia.save()
+        assert not self.viewable(self.user)
+
+    def test_collaborators(self):
+        self.foia.add_viewer(self.user)
+        assert self.viewable(self.user)
+        self.foia.remove_viewer(self.user)
+        assert not self.viewable(self.user)
+        self.foia.add_editor(self.user)
+        assert self.viewable(self.user)
+        self.user.edit_access.clear()
+        assert not self.viewable(self.user)
+
+    def test_org_share(self):
+        org = OrganizationFactory()
+        MembershipFactory(user=self.user, organization=org)
+        self.foia.composer.organization = org
+        self.foia.composer.save()
+        assert not self.viewable(self.user)
+        profile = self.foia.user.profile
+        profile.org_share = True
+        profile.save()
+        assert self.viewable(self.user)
+
+    def test_unchanged_access(self):
+        """Saves which do not change access fields do not rebuild access"""
+        foia = FOIARequest.objects.get(pk=self.foia.pk)
+        profile = Profile.objects.get(user=self.foia.user)
+        with patch("muckrock.foia.signals.FOIARequestAccess") as mock_access:
+            foia.title = "Changed"
+            foia.save()
+            profile.full_name = "Changed"
+            profile.save()
+        mock_access.objects.rebuild.assert_not_called()
+
+    def test_consistent(self):
+        self.foia.add_viewer(self.user)
+        FOIARequestAccess.objects.filter(foia=self.foia).delete()
+        stale, missing = FOIARequestAccess.objects.diff([self.foia.pk])
+        assert not stale
+        assert missing
+        FOIARequestAccess.objects.rebuild([self.foia.pk])
+        assert FOIARequestAccess.objects.diff([self.foia.pk]) == ([], set())
+        assert self.viewable(self.user)
@@ -1,10 +1,13 @@
 # Django
-from celery.exceptions import Retry
+from celery.exceptions import Retry, SoftTimeLimitExceeded
 from django.conf import settings
 from django.db import connection, reset_queries
 from django.test import TestCase, override_settings
+from django.utils import timezone
 
 # Standard Library
+import csv
+from datetime import date, timedelta
 from unittest.mock import MagicMock, patch
 
 # Third Party
@@ -13,12 +16,19 @@ from constance.test import override_config
 from moto import mock_aws
 
 # MuckRock
+from muckrock.communication.factories import (
+    EmailCommunicationFactory,
+    FaxCommunicationFactory,
+)
 from muckrock.core.factories import UserFactory
 from muckrock.foia.factories import FOIAFileFactory, FOIARequestFactory
+from muckrock.foia.models import FOIARequest
 from muckrock.foia.tasks import (
     ExportCsv,
     InvalidFileTypeError,
     classify_status,
+    followup_requests,
+    followup_requests_chunk,
     is_valid_file_type,
     upload_document_cloud,
 )
@@ -46,6 +56,95 @@ class ExportCsvTests(TestCase):
 
         assert get_num_queries(1) == get_num_queries(10)
 
+    @mock_aws
+    def test_staff_communication_columns(self):
+        user = UserFactory(is_staff=True)
+        s3 = boto3.client("s3")
+        s3.create_bucket(Bucket=settings.AWS_MEDIA_BUCKET_NAME)
+        foia = FOIARequestFactory()
+        now = timezone.now()
+        FaxCommunicationFactory(
+            communication__foia=foia,
+            communication__response=False,
+            communication__datetime=now - timedelta(3),
+        )
+        first = EmailCommunicationFactory(
+            communication__foia=foia,
+            communication__response=True,
+            communication__datetime=now - timedelta(2),
+        )
+        last = EmailCommunicationFactory(
+            communication__foia=foia,
+            communication__response=True,
+            communication__datetime=now - timedelta(1),
+        )
+        FOIARequestFactory.create_batch(5)
+
+        export = ExportCsv(user.pk, [foia.pk])
+        export.run()
+        body = s3.get_object(Bucket=export.bucket, Key=export.file_key)["Body"]
+        rows = list(csv.DictReader(body.read().decode("utf8").splitlines()))
+
+        assert len(rows) == 1
+        assert rows[0]["Initial Communication Delivered"] == "fax"
+        assert rows[0]["First Inbound Communication Delivered"] == "email"
+        assert rows[0]["First Inbound Communication Address"] == str(first.from_email)
+        assert rows[0]["Last Inbound Communication Address"] == str(last.from_email)
+
+
+@override_config(ENABLE_FOLLOWUP=True, ENABLE_WEEKEND_FOLLOWUP=True)
+class FollowupRequestsTests(TestCase):
+    """Follow ups are split into chunks by channel"""
+
+    @patch("muckrock.foia.tasks.FOLLOWUP_CHUNK_SIZE", 2)
+    @patch("muckrock.foia.tasks.followup_requests_chunk.delay")
+    def test_chunks_by_channel(self, mock_delay):
+        email_foias = FOIARequestFactory.create_batch(
+            3, status="processed", date_followup=date.today()
+        )
+        mail_foia = FOIARequestFactory(
+            status="processed", date_followup=date.today(), email=None
+        )
+        FOIARequestFactory(status="done", date_followup=date.today())
+
+        followup_requests()
+
+        email_pks = sorted(f.pk for f in email_foias)
+        mock_delay.assert_any_call("email", email_pks[:2])
+        mock_delay.assert_any_call("email", email_pks[2:])
+        mock_delay.assert_any_call("mail", [mail_foia.pk])
+        assert mock_delay.call_count == 3
+
+    @patch("muckrock.foia.models.FOIARequest.followup", autospec=True)
+    def test_chunk_rechecks(self, mock_followup):
+        """Requests which no longer need a follow up are skipped"""
+        foias = FOIARequestFactory.create_batch(
+            2, status="processed", date_followup=date.today()
+        )
+        FOIARequest.objects.filter(pk=foias[1].pk).update(
+            date_followup=date.today() + timedelta(30)
+        )
+
+        followup_requests_chunk("email", [f.pk for f in foias])
+
+        assert [call.args[0].pk for call in mock_followup.call_args_list] == [
+            foias[0].pk
+        ]
+
+    @patch("muckrock.foia.tasks.followup_requests_chunk.delay")
+    @patch("muckrock.foia.models.FOIARequest.followup", autospec=True)
+    def test_chunk_time_limit(self, mock_followup, mock_delay):
+        """Requests left when the time limit is reached are queued again"""
+        foias = FOIARequestFactory.create_batch(
+            3, status="processed", date_followup=date.today()
+        )
+        foia_pks = [f.pk for f in foias]
+        mock_followup.side_effect = [None, SoftTimeLimitExceeded()]
+
+        followup_requests_chunk("email", foia_pks)
+
+        mock_delay.assert_called_once_with("email", foia_pks[1:])
+
 
 @mock_aws
 class IsValidFileTypeTests(TestCase):
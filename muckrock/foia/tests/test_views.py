@@ -5,6 +5,7 @@ Tests for the FOIA views
 # pylint: disable=too-many-lines
 
 # Django
+from django.conf import settings
 from django.contrib.auth.models import AnonymousUser, User
 from django.http.request import QueryDict
 from django.http.response import Http404
@@ -16,11 +17,14 @@ from django.utils import timezone
 import datetime
 from datetime import date, timedelta
 from operator import attrgetter
+from unittest.mock import patch
 
 # Third Party
+import boto3
 import pytest
 import requests_mock
 from actstream.actions import follow, is_following, unfollow
+from moto import mock_aws
 
 # MuckRock
 from muckrock.core.factories import (
@@ -32,6 +36,7 @@ from muckrock.core.factories import (
     UserFactory,
 )
 from muckrock.core.helpers import get_404, get_allowed
+from muckrock.core.storage import MediaRootS3BotoStorage
 from muckrock.core.test_utils import http_post_response, mock_middleware, mock_squarelet
 from muckrock.crowdfund.models import Crowdfund
 from muckrock.foia.factories import (
@@ -41,7 +46,7 @@ from muckrock.foia.factories import (
     FOIATemplateFactory,
 )
 from muckrock.foia.forms import FOIAOwnerForm
-from muckrock.foia.models import FOIAComposer, FOIARequest
+from muckrock.foia.models import FOIAComposer, FOIARequest, RawEmail
 from muckrock.foia.views import (
     ComposerDetail,
     CreateComposer,
@@ -144,6 +149,37 @@ class TestFOIAViews(TestCase):
             ),
         )
 
+    def test_foia_detail_not_modified(self):
+        """The detail view answers conditional requests until the request changes"""
+        foia = FOIARequestFactory()
+        url = foia.get_absolute_url()
+        response = self.client.get(url)
+        assert response.status_code == 200
+        etag = response["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        with self.captureOnCommitCallbacks(execute=True):
+            foia.tags.add("changed")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+        # the agency is shown on the page
+        etag = response["ETag"]
+        foia.agency.name = "Changed Agency"
+        foia.agency.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+        # logged in users are shown their own notifications, so always render
+        self.client.force_login(foia.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert response.status_code == 200
+        assert not response.has_header("ETag")
+
     def test_foia_detail_print(self):
         """The print view should render with metadata and communications"""
 
@@ -691,6 +727,69 @@ class TestRawEmail(TestCase):
         response = self.view(request, self.comm.id)
         assert response.status_code == 200
 
+    def test_raw_email_parsed(self):
+        """Raw emails are parsed once, and then not read again"""
+        raw_email = self.comm.get_raw_email()
+        raw_email.raw_email_db = (
+            "From: Agency <agency@example.com>\r\n"
+            "Subject: Records\r\n"
+            "Content-Type: text/plain\r\n\r\n"
+            "Your records are attached\r\n"
+        )
+        raw_email.save()
+        text, html = raw_email.get_text_html()
+        assert text.strip() == "Your records are attached"
+        assert html == ""
+
+        raw_email = self.comm.get_raw_email()
+        assert raw_email.parsed
+        assert raw_email.headers == {
+            "From": "Agency <agency@example.com>",
+            "Subject": "Records",
+        }
+        with patch.object(RawEmail, "_parse") as mock_parse:
+            assert raw_email.get_text_html() == (text, html)
+        mock_parse.assert_not_called()
+        assert raw_email.read_raw(length=4) == b"From"
+
+    def test_raw_email_unknown_charset(self):
+        """Raw emails which can not be decoded are shown unparsed"""
+        raw_email = self.comm.get_raw_email()
+        raw_email.raw_email_db = (
+            "Subject: Records\r\n"
+            "Content-Type: text/plain; charset=x-bogus\r\n\r\n"
+            "Your records are attached\r\n"
+        )
+        raw_email.save()
+        assert raw_email.get_text_html() == ("", "")
+        assert not raw_email.parsed
+
+        request = mock_middleware(self.request_factory.get(self.url))
+        request.user = self.comm.foia.user
+        response = self.view(request, self.comm.id)
+        assert response.status_code == 200
+
+    @mock_aws
+    def test_raw_email_file(self):
+        """Raw emails are stored even if they can not be parsed, and are
+        downloaded from a signed link"""
+        s3 = boto3.client("s3")
+        s3.create_bucket(Bucket=settings.AWS_MEDIA_BUCKET_NAME)
+        raw_email = self.comm.get_raw_email()
+        raw_email.raw_email = (
+            "Content-Type: text/plain; charset=x-bogus\r\n\r\nRecords\r\n"
+        )
+        raw_email.save()
+        raw_email.refresh_from_db()
+        assert raw_email.raw_email_file
+        assert not raw_email.parsed
+
+        # the public media custom domain can not serve private files
+        with patch.object(MediaRootS3BotoStorage, "custom_domain", "cdn.example.com"):
+            url = raw_email.get_raw_url()
+        assert "cdn.example.com" not in url
+        assert "Signature=" in url
+
 
 class TestFOIACrowdfunding(TestCase):
     """Tests for FOIA Crowdfunding"""
@@ -106,6 +106,11 @@ urlpatterns = [
     # Misc Views
     re_path(r"^acronyms/$", views.acronyms, name="foia-acronyms"),
     re_path(r"^raw_email/(?P<idx>\d+)/$", views.raw, name="foia-raw"),
+    re_path(
+        r"^raw_email/(?P<idx>\d+)/download/$",
+        views.raw_download,
+        name="foia-raw-download",
+    ),
     re_path(
         r"^foiarequest-autocomplete/$",
         views.FOIARequestAutocomplete.as_view(),
@@ -27,6 +27,7 @@ from constance import config
 # MuckRock
 from muckrock.accounts.models import Notification
 from muckrock.communication.models import Check, EmailCommunication, FaxCommunication
+from muckrock.core.utils import get_etag, get_not_modified, set_validators
 from muckrock.crowdfund.forms import CrowdfundForm
 from muckrock.foia.constants import COMPOSER_EDIT_DELAY
 from muckrock.foia.exceptions import FoiaFormError
@@ -87,10 +88,14 @@ class Detail(DetailView):
         self.admin_fix_form = None
         self.resend_forms = None
         self.fee_form = None
+        self.validators = None
         super().__init__(*args, **kwargs)
 
     def dispatch(self, request, *args, **kwargs):
         """Handle forms"""
+        not_modified = self.check_not_modified(request)
+        if not_modified is not None:
+            return not_modified
         self.foia = self.get_object()
         self.admin_fix_form = FOIAAdminFixForm(
             prefix="admin_fix",
@@ -123,6 +128,48 @@ class Detail(DetailView):
 
         return super().dispatch(request, *args, **kwargs)
 
+    def check_not_modified(self, request):
+        """Answer a conditional GET from a lookup of when the request was last
+        modified, before loading everything needed to render it
+
+        Only anonymous users get a 304, as the page shows logged in users their
+        own state, such as their notifications and follows, and viewing the
+        page marks their notifications for it read.  Requests with parameters,
+        or with messages to show, are always rendered.
+        """
+        if (
+            request.method not in ("GET", "HEAD")
+            or request.user.is_authenticated
+            or request.GET
+            or len(messages.get_messages(request))
+        ):
+            return None
+        values = (
+            FOIARequest.objects.get_viewable(request.user)
+            .filter(pk=self.kwargs["idx"])
+            .values_list(
+                "sidebar_html",
+                "datetime_modified",
+                "datetime_updated",
+                "agency__datetime_modified",
+                "agency__jurisdiction__datetime_modified",
+                "crowdfund__payment_received",
+                "crowdfund__closed",
+            )
+            .first()
+        )
+        if values is None:
+            return None
+        sidebar_html, *values = values
+        if sidebar_html:
+            return None
+        # the agency and jurisdiction are shown with the request, and
+        # crowdfunds show how much has been raised and if they have expired
+        etag = get_etag(request.get_full_path(), *values, timezone.now().date())
+        last_modified = max((v for v in values[:4] if v), default=None)
+        self.validators = (etag, last_modified)
+        return get_not_modified(request, etag, last_modified)
+
     def get_object(self, queryset=None):
         """Get the FOIA Request"""
         # this is called twice in dispatch, so cache to not actually run twice
@@ -386,7 +433,10 @@ class Detail(DetailView):
         if self.foia.sidebar_html:
             messages.info(request, self.foia.sidebar_html)
 
-        return super().get(request, *args, **kwargs)
+        response = super().get(request, *args, **kwargs)
+        if self.validators is not None:
+            set_validators(response, *self.validators)
+        return response
 
     def post(self, request):
         """Handle form submissions"""
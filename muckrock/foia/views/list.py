@@ -11,6 +11,7 @@ from django.db.models import Count, Prefetch, Q
 from django.http import Http404
 from django.shortcuts import redirect
 from django.urls import reverse
+from django.utils import timezone
 from django.views.generic import TemplateView
 
 # Standard Library
@@ -44,6 +45,7 @@ from muckrock.foia.models import (
     FOIACommunication,
     FOIAComposer,
     FOIARequest,
+    FOIARequestAccess,
     FOIASavedSearch,
 )
 from muckrock.foia.rules import can_embargo, can_embargo_permananently
@@ -135,6 +137,10 @@ class RequestList(MRSearchFilterListView):
     template_name = "foia/list.html"
     default_sort = "datetime_updated"
     default_order = "desc"
+    cache_count = True
+    # subclasses which always filter the requests must turn this off, as the
+    # planner's estimate is only close for the unfiltered list
+    estimate_count = True
     sort_map = {
         "title": "title",
         "user": "composer__user__profile__full_name",
@@ -343,13 +349,14 @@ class RequestList(MRSearchFilterListView):
 
     def _embargo(self, foias, _user, _post):
         """Embargo the requests"""
-        foias.update(embargo_status="permanent")
+        foias.update(embargo_status="permanent", datetime_modified=timezone.now())
+        FOIARequestAccess.objects.rebuild(list(foias.values_list("pk", flat=True)))
         return "Requests have been embargoed"
 
     def _noindex(self, foias, _user, _post):
         """No index the requests"""
         with transaction.atomic():
-            foias.update(noindex=True)
+            foias.update(noindex=True, datetime_modified=timezone.now())
             for foia in foias:
                 transaction.on_commit(lambda f=foia: noindex_documentcloud.delay(f.pk))
         return "Requests have been no-indexed"
@@ -379,6 +386,7 @@ class MyRequestList(RequestList):
     filter_class = MyFOIARequestFilterSet
     title = "Your Requests"
     template_name = "foia/my_list.html"
+    estimate_count = False
 
     def get_queryset(self):
         """Limit to just requests owned by the current user."""
@@ -421,28 +429,35 @@ class MyRequestList(RequestList):
         foias = [f.pk for f in foias if f.has_perm(user, "embargo")]
         # do not downgrade permanent embargoes
         FOIARequest.objects.filter(pk__in=foias, embargo_status="public").update(
-            embargo_status="embargo"
+            embargo_status="embargo", datetime_modified=timezone.now()
         )
+        FOIARequestAccess.objects.rebuild(foias)
         # only set date if in end state
         FOIARequest.objects.filter(
             pk__in=foias, embargo_status="embargo", status__in=END_STATUS
-        ).update(date_embargo=end_date)
+        ).update(date_embargo=end_date, datetime_modified=timezone.now())
         return "Embargoes extended for 30 days"
 
     def _remove_embargo(self, foias, user, _post):
         """Remove the embargo on the selected requests"""
         foias = [f.pk for f in foias if f.has_perm(user, "embargo")]
-        FOIARequest.objects.filter(pk__in=foias).update(embargo_status="public")
+        FOIARequest.objects.filter(pk__in=foias).update(
+            embargo_status="public", datetime_modified=timezone.now()
+        )
+        FOIARequestAccess.objects.rebuild(foias)
         return "Embargoes removed"
 
     def _perm_embargo(self, foias, user, _post):
         """Permanently embargo the selected requests"""
         foias = [f.pk for f in foias if f.has_perm(user, "embargo_perm")]
-        FOIARequest.objects.filter(pk__in=foias).update(embargo_status="embargo")
+        FOIARequest.objects.filter(pk__in=foias).update(
+            embargo_status="embargo", datetime_modified=timezone.now()
+        )
         # only set permanent
         FOIARequest.objects.filter(pk__in=foias, status__in=END_STATUS).update(
-            embargo_status="permanent"
+            embargo_status="permanent", datetime_modified=timezone.now()
         )
+        FOIARequestAccess.objects.rebuild(foias)
         return "Embargoes extended permanently"
 
     def _project(self, foias, user, post):
@@ -498,7 +513,9 @@ class MyRequestList(RequestList):
     def _autofollowup(self, foias, user, disable):
         """Set autofollowups"""
         foias = [f.pk for f in foias if f.has_perm(user, "change")]
-        FOIARequest.objects.filter(pk__in=foias).update(disable_autofollowups=disable)
+        FOIARequest.objects.filter(pk__in=foias).update(
+            disable_autofollowups=disable, datetime_modified=timezone.now()
+        )
         action = "disabled" if disable else "enabled"
         return "Autofollowups {}".format(action)
 
@@ -509,6 +526,7 @@ class MyOrgRequestList(UserPassesTestMixin, RequestList):
     filter_class = FOIARequestFilterSet
     title = "Organization Requests"
     template_name = "foia/list.html"
+    estimate_count = False
 
     def test_func(self):
         """User must have a non-individual org"""
@@ -529,6 +547,7 @@ class MyProxyRequestList(UserPassesTestMixin, RequestList):
     filter_class = FOIARequestFilterSet
     title = "My Proxy Requests"
     template_name = "foia/list.html"
+    estimate_count = False
 
     def test_func(self):
         """User must be a proxy"""
@@ -549,6 +568,7 @@ class AgencyRequestList(RequestList):
     filter_class = AgencyFOIARequestFilterSet
     title = "Your Agency's Requests"
     template_name = "foia/agency_list.html"
+    estimate_count = False
 
     def get_queryset(self):
         """Requests owned by the current agency that they can respond to."""
@@ -564,6 +584,7 @@ class FollowingRequestList(RequestList):
     """List of all FOIA requests the user is following"""
 
     title = "Requests You Follow"
+    estimate_count = False
 
     def get_queryset(self):
         """Limits FOIAs to those followed by the current user"""
@@ -579,6 +600,7 @@ class SharedRequestList(RequestList):
     """List of FOIA requests explicitly shared with the current user"""
 
     title = "Shared with You"
+    estimate_count = False
 
     def get_queryset(self):
         """Limit to requests where the user is an edit or view collaborator"""
@@ -596,6 +618,7 @@ class BaseProcessingRequestList(RequestList):
     template_name = "foia/processing_list.html"
     default_sort = "date_processing"
     default_order = "asc"
+    estimate_count = False
     sort_map = {
         "title": "title",
         "date_submitted": "composer__datetime_submitted",
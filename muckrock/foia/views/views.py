@@ -16,6 +16,9 @@ from muckrock.foia.codes import CODES
 from muckrock.foia.constants import EMAIL_ATTRIBUTES, EMAIL_STYLES, EMAIL_TAGS
 from muckrock.foia.models import STATUS, FOIACommunication, FOIARequest
 
+# how much of a raw email to show inline, in bytes
+RAW_PREVIEW_SIZE = 64 * 1024
+
 
 def redirect_old(request, jurisdiction, slug, idx, action):
     """Redirect old urls to new urls"""
@@ -50,14 +53,24 @@ def acronyms(request):
     return render(request, "staff/acronyms.html", {"codes": codes})
 
 
-@permission_required("foia.view_rawemail")
-def raw(request, idx):
-    """Get the raw email for a communication"""
+def _get_raw_email(request, idx):
+    """Get the raw email for a communication the user may view it for"""
     comm = get_object_or_404(FOIACommunication, pk=idx)
     raw_email = comm.get_raw_email()
     permission = comm.foia.has_perm(request.user, "change")
     if not raw_email or not permission:
         raise Http404
+    return comm, raw_email
+
+
+@permission_required("foia.view_rawemail")
+def raw(request, idx):
+    """Get the raw email for a communication
+
+    Only the start of the raw message is shown, the rest may be downloaded
+    directly from storage
+    """
+    comm, raw_email = _get_raw_email(request, idx)
     text, html = raw_email.get_text_html()
     if comm.response:
         email = raw_email.email.from_email.email
@@ -65,7 +78,11 @@ def raw(request, idx):
         email = ", ".join(e.email for e in raw_email.email.to_emails.all())
 
     data = {
-        "raw": raw_email.raw_email,
+        "raw": raw_email.read_raw(length=RAW_PREVIEW_SIZE).decode("utf8", "replace"),
+        "raw_truncated": raw_email.size is not None
+        and raw_email.size > RAW_PREVIEW_SIZE,
+        "raw_download": bool(raw_email.raw_email_file),
+        "headers": raw_email.headers,
         "text": text,
         "html": bleach.clean(
             html,
@@ -77,10 +94,21 @@ def raw(request, idx):
         "html_src": html,
         "response": comm.response,
         "email": email,
+        "idx": comm.pk,
     }
     return render(request, "foia/communication/raw.html", data)
 
 
+@permission_required("foia.view_rawemail")
+def raw_download(request, idx):
+    """Redirect to a signed link to download the full raw email"""
+    _comm, raw_email = _get_raw_email(request, idx)
+    url = raw_email.get_raw_url()
+    if url is None:
+        raise Http404
+    return redirect(url)
+
+
 class FOIARequestAutocomplete(MRAutocompleteView):
     """Autocomplete for FOIA requests"""
 
@@ -12,10 +12,17 @@ class JurisdictionConfig(AppConfig):
     name = "muckrock.jurisdiction"
 
     def ready(self):
-        """Registers exemptions with watson"""
-        # pylint: disable=invalid-name, import-outside-toplevel
+        """Registers exemptions with watson and connects signal handlers"""
+        # pylint: disable=invalid-name, import-outside-toplevel, unused-import
         # Third Party
         from watson import search
 
+        # MuckRock
+        import muckrock.jurisdiction.signals
+        from muckrock.core import fulltext
+
         Exemption = self.get_model("Exemption")
         search.register(Exemption)
+        fulltext.register(
+            Exemption.objects.all(), {"name": "A", "aliases": "B", "basis": "C"}
+        )
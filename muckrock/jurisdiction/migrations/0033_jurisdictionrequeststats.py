@@ -0,0 +1,49 @@
+# Generated by Django 5.2.15 on 2026-10-18 14:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jurisdiction", "0032_auto_20260129_1545"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JurisdictionRequestStats",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("num_requests", models.PositiveIntegerField(default=0)),
+                ("num_done", models.PositiveIntegerField(default=0)),
+                ("num_fee", models.PositiveIntegerField(default=0)),
+                (
+                    "average_fee",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("average_response_time", models.IntegerField(default=0)),
+                ("total_pages", models.PositiveIntegerField(default=0)),
+                ("datetime_updated", models.DateTimeField(auto_now=True)),
+                (
+                    "jurisdiction",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="request_stats",
+                        to="jurisdiction.jurisdiction",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+    ]
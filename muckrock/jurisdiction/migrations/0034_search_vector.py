@@ -0,0 +1,31 @@
+# Generated by Django 5.2.15 on 2026-10-18 11:41
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("jurisdiction", "0033_jurisdictionrequeststats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="exemption",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="exemption",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="exemption_search_idx"
+            ),
+        ),
+    ]
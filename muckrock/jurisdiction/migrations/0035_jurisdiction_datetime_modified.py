@@ -0,0 +1,23 @@
+# Generated by Django 5.2.15 on 2026-10-18 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jurisdiction", "0034_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jurisdiction",
+            name="datetime_modified",
+            field=models.DateTimeField(
+                auto_now=True,
+                help_text="Timestamp of the latest change to this jurisdiction, "
+                "used for conditional requests for pages showing it",
+                null=True,
+            ),
+        ),
+    ]
@@ -4,6 +4,9 @@ Models for the Jurisdiction application
 
 # Django
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.db.models import Avg, Count, F, Q, Sum
 from django.db.models.expressions import Value
@@ -18,57 +21,106 @@ from simple_history.models import HistoricalRecords
 from taggit.managers import TaggableManager
 
 # MuckRock
-from muckrock.business_days.models import Calendar, Holiday, HolidayCalendar
+from muckrock.business_days.models import (
+    Calendar,
+    Holiday,
+    HolidayCalendar,
+    get_cached_calendar,
+)
 from muckrock.core.models import ExtractDay
 from muckrock.foia.models import END_STATUS, FOIARequest
 from muckrock.tags.models import TaggedItemBase
 
 
 class RequestHelper:
-    """Helper methods for classes that have a get_requests() method"""
+    """Helper methods for classes that have a get_requests() method
 
-    def average_response_time(self):
-        """Get the average response time from a submitted to completed request"""
+    The statistics are read from a stats table, which is kept up to date by
+    `update_request_stats` whenever a request changes, and is computed on
+    demand if it does not exist yet
+    """
+
+    def compute_request_stats(self):
+        """Compute the request statistics from the requests"""
         requests = self.get_requests()
-        avg = requests.aggregate(
-            avg=Coalesce(
+        stats = requests.aggregate(
+            num_requests=Count("pk"),
+            num_done=Count(
+                "pk",
+                filter=Q(status__in=["partial", "done"], datetime_done__isnull=False),
+            ),
+            num_fee=Count("pk", filter=Q(price__gt=0)),
+            average_fee=Coalesce(
+                Avg("price", filter=Q(price__gt=0)),
+                Value(0),
+                output_field=models.DecimalField(),
+            ),
+            average_response_time=Coalesce(
                 ExtractDay(Avg(F("datetime_done") - F("composer__datetime_submitted"))),
                 Value(0),
-            )
-        )["avg"]
-        return avg
+            ),
+        )
+        pages = requests.aggregate(pages=Sum("communications__files__pages"))["pages"]
+        stats["total_pages"] = pages if pages else 0
+        return stats
+
+    def update_request_stats(self):
+        """Recompute and store the request statistics"""
+        field = self._meta.get_field("request_stats")
+        self.request_stats, _ = field.related_model.objects.update_or_create(
+            **{field.field.name: self}, defaults=self.compute_request_stats()
+        )
+        return self.request_stats
+
+    def get_request_stats(self):
+        """Get the stored request statistics, computing them if they are missing"""
+        try:
+            return self.request_stats
+        except ObjectDoesNotExist:
+            return self.update_request_stats()
+
+    def average_response_time(self):
+        """Get the average response time from a submitted to completed request"""
+        return self.get_request_stats().average_response_time
 
     def average_fee(self):
         """Get the average fees required on requests that have a price."""
-        requests = self.get_requests()
-        avg = requests.filter(price__gt=0).aggregate(price=Avg("price"))["price"]
-        return avg if avg else 0
+        return self.get_request_stats().average_fee
 
     def fee_rate(self):
         """Get the percentage of requests that have a fee."""
-        requests = self.get_requests()
-        filed = float(requests.count())
-        fee = float(requests.filter(price__gt=0).count())
+        stats = self.get_request_stats()
         rate = 0
-        if filed > 0:
-            rate = fee / filed * 100
+        if stats.num_requests > 0:
+            rate = float(stats.num_fee) / stats.num_requests * 100
         return rate
 
     def success_rate(self):
         """Get the percentage of requests that are successful."""
-        requests = self.get_requests()
-        filed = float(requests.count())
-        completed = float(requests.get_done().count())
+        stats = self.get_request_stats()
         rate = 0
-        if filed > 0:
-            rate = completed / filed * 100
+        if stats.num_requests > 0:
+            rate = float(stats.num_done) / stats.num_requests * 100
         return rate
 
     def total_pages(self):
         """Total pages released"""
-        requests = self.get_requests()
-        pages = requests.aggregate(pages=Sum("communications__files__pages"))["pages"]
-        return pages if pages else 0
+        return self.get_request_stats().total_pages
+
+
+class RequestStats(models.Model):
+    """Materialized request statistics for an agency or jurisdiction"""
+
+    num_requests = models.PositiveIntegerField(default=0)
+    num_done = models.PositiveIntegerField(default=0)
+    num_fee = models.PositiveIntegerField(default=0)
+    average_fee = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    average_response_time = models.IntegerField(default=0)
+    total_pages = models.PositiveIntegerField(default=0)
+    datetime_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
 
 
 class Jurisdiction(models.Model, RequestHelper):
@@ -118,6 +170,12 @@ class Jurisdiction(models.Model, RequestHelper):
         "(or are they moved to Friday?)",
     )
     holidays = models.ManyToManyField(Holiday, blank=True)
+    datetime_modified = models.DateTimeField(
+        auto_now=True,
+        null=True,
+        help_text="Timestamp of the latest change to this jurisdiction, used for "
+        "conditional requests for pages showing it",
+    )
 
     def __str__(self):
         if self.level == "l":
@@ -196,8 +254,13 @@ class Jurisdiction(models.Model, RequestHelper):
 
     def get_calendar(self):
         """Get a calendar of business days for the jurisdiction"""
-        if self.legal.law.use_business_days:
-            return HolidayCalendar(self.legal.holidays.all(), self.legal.observe_sat)
+        legal = self.legal
+        return get_cached_calendar(legal.pk, legal.build_calendar)
+
+    def build_calendar(self):
+        """Build the calendar for this legal jurisdiction, without caching it"""
+        if self.law.use_business_days:
+            return HolidayCalendar(self.holidays.all(), self.observe_sat)
         else:
             return Calendar()
 
@@ -242,6 +305,17 @@ class Jurisdiction(models.Model, RequestHelper):
         unique_together = ("slug", "parent")
 
 
+class JurisdictionRequestStats(RequestStats):
+    """Materialized request statistics for a jurisdiction"""
+
+    jurisdiction = models.OneToOneField(
+        Jurisdiction, related_name="request_stats", on_delete=models.CASCADE
+    )
+
+    def __str__(self):
+        return f"Request statistics for {self.jurisdiction}"
+
+
 class Law(models.Model):
     """A law that allows for requests for public records from a jurisdiction."""
 
@@ -379,6 +453,7 @@ class Exemption(models.Model):
         help_text="Significant references to the exemption in caselaw or previous "
         "appeals.",
     )
+    search_vector = SearchVectorField(null=True, editable=False)
 
     def __str__(self):
         return "%s exemption of %s" % (self.name, self.jurisdiction)
@@ -398,6 +473,9 @@ class Exemption(models.Model):
         kwargs["pk"] = self.pk
         return reverse("exemption-detail", kwargs=kwargs)
 
+    class Meta:
+        indexes = [GinIndex(fields=["search_vector"], name="exemption_search_idx")]
+
 
 class InvokedExemption(models.Model):
     """An invoked exemption tracks the use of an exemption in the course of
@@ -0,0 +1,19 @@
+"""Signal handlers for the jurisdiction app"""
+
+# Django
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+# MuckRock
+from muckrock.business_days.models import Holiday, clear_calendar_cache
+from muckrock.jurisdiction.models import Jurisdiction, Law
+
+
+@receiver([post_save, post_delete], sender=Holiday)
+@receiver([post_save, post_delete], sender=Jurisdiction)
+@receiver([post_save, post_delete], sender=Law)
+@receiver(m2m_changed, sender=Jurisdiction.holidays.through)
+def invalidate_calendar_cache(**kwargs):
+    """Holidays or business day settings changed, rebuild the calendars"""
+    # pylint: disable=unused-argument
+    clear_calendar_cache()
@@ -9,14 +9,17 @@ from django.utils import timezone
 
 # Standard Library
 from datetime import timedelta
+from unittest.mock import patch
 
 # MuckRock
-from muckrock.core.factories import UserFactory
+from muckrock.agency.models import Agency
+from muckrock.core.factories import AgencyFactory, UserFactory
 from muckrock.foia.factories import (
     FOIACommunicationFactory,
     FOIAFileFactory,
     FOIARequestFactory,
 )
+from muckrock.foia.models import FOIARequest
 from muckrock.jurisdiction import factories
 
 
@@ -145,6 +148,65 @@ class TestJurisdictionUnit(TestCase):
         assert self.local.total_pages() == page_count
         assert self.state.total_pages() == 2 * page_count
 
+    def test_request_stats_refresh(self):
+        """Stored request statistics should be refreshed when a request changes"""
+        foia = FOIARequestFactory(agency__jurisdiction=self.local, status="ack")
+        assert self.state.success_rate() == 0.0
+        assert self.state.request_stats.num_requests == 1
+
+        with self.captureOnCommitCallbacks(execute=True):
+            foia.status = "done"
+            foia.datetime_done = timezone.now()
+            foia.save()
+
+        self.state.refresh_from_db()
+        self.local.refresh_from_db()
+        assert self.state.success_rate() == 100.0
+        assert self.local.success_rate() == 100.0
+        assert foia.agency.success_rate() == 100.0
+
+    def test_request_stats_stale(self):
+        """A burst of changes should only queue one refresh"""
+        foia = FOIARequestFactory(agency__jurisdiction=self.local, status="ack")
+        stats = foia.agency.update_request_stats()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            foia.status = "done"
+            foia.save()
+            foia.price = 10
+            foia.save()
+        assert len(callbacks) == 1
+        stats.refresh_from_db()
+        assert stats.stale
+
+        callbacks[0]()
+        stats.refresh_from_db()
+        assert not stats.stale
+        assert stats.num_fee == 1
+
+    @patch("muckrock.agency.signals.schedule_request_stats_update")
+    def test_request_stats_unchanged(self, mock_schedule):
+        """Saving a request without changing its statistics should not refresh"""
+        foia = FOIARequest.objects.get(pk=FOIARequestFactory().pk)
+        mock_schedule.reset_mock()
+        foia.title = "New Title"
+        foia.save()
+        mock_schedule.assert_not_called()
+
+        foia.status = "done"
+        foia.save()
+        mock_schedule.assert_called_once_with(foia.agency_id)
+
+    @patch("muckrock.agency.signals.schedule_jurisdiction_request_stats_update")
+    @patch("muckrock.agency.signals.schedule_request_stats_update")
+    def test_request_stats_agency_moved(self, mock_schedule, mock_schedule_juris):
+        """Moving an agency should refresh its old and new jurisdictions"""
+        agency = Agency.objects.get(pk=AgencyFactory(jurisdiction=self.state).pk)
+        agency.jurisdiction = self.local
+        agency.save()
+        mock_schedule.assert_called_once_with(agency.pk)
+        mock_schedule_juris.assert_called_once_with(self.state.pk)
+
     def test_get_proxy(self):
         """Test getting the proxy user for a state"""
         assert self.state.get_proxy() is None
@@ -6,6 +6,26 @@ Admin registration for Tasks
 from django.contrib import admin
 
 # MuckRock
-from muckrock.mailgun.models import WhitelistDomain
+from muckrock.mailgun.models import InboundEmail, WhitelistDomain
+from muckrock.mailgun.tasks import process_inbound_emails
+
+
+class InboundEmailAdmin(admin.ModelAdmin):
+    """Inbound Email Admin"""
+
+    list_display = ["__str__", "status", "datetime_received", "datetime_processed"]
+    list_filter = ["status"]
+    search_fields = ["message_id"]
+    readonly_fields = ["datetime_received", "datetime_processed"]
+    actions = ["retry"]
+
+    def retry(self, request, queryset):
+        """Mark the emails as pending and route them again"""
+        queryset.update(status="pending", error="")
+        process_inbound_emails.delay()
+
+    retry.short_description = "Retry routing the selected emails"
+
 
 admin.site.register(WhitelistDomain)
+admin.site.register(InboundEmail, InboundEmailAdmin)
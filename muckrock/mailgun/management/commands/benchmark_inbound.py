@@ -0,0 +1,106 @@
+"""Count the queries used to route inbound email to requests"""
+
+# Django
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils.datastructures import MultiValueDict
+
+# Standard Library
+import time
+from unittest.mock import patch
+
+# Third Party
+from localflavor.us.us_states import STATE_CHOICES
+
+# MuckRock
+from muckrock.agency.models import AgencyEmail
+from muckrock.communication.models import EmailAddress, EmailCommunication
+from muckrock.mailgun.models import WhitelistDomain
+from muckrock.mailgun.views import _handle_request
+
+
+def legacy_allowed(self, foia=None):
+    """The allowed check as it was before the allowlist was cached"""
+    # pylint: disable=too-many-return-statements
+    allowed_tlds = [
+        ".%s.us" % a.lower()
+        for (a, _) in list(STATE_CHOICES)
+        if a not in ("AS", "DC", "GU", "MP", "PR", "VI")
+    ]
+    allowed_tlds.extend([".gov", ".mil"])
+    if foia and foia.email == self:
+        return True
+    if foia and self.agencies.filter(pk=foia.agency_id).exists():
+        return True
+    if foia and foia.cc_emails.filter(email=self).exists():
+        return True
+    if any(self.email.endswith(tld) for tld in allowed_tlds):
+        return True
+    if not foia and AgencyEmail.objects.filter(email=self).exists():
+        return True
+    if WhitelistDomain.objects.filter(domain__iexact=self.domain).exists():
+        return True
+    return False
+
+
+class Command(BaseCommand):
+    """Benchmark routing inbound email"""
+
+    help = (
+        "Route recent inbound emails again, in a rolled back transaction, "
+        "counting the queries used per message"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=100)
+
+    def handle(self, *args, **kwargs):
+        email_comms = (
+            EmailCommunication.objects.filter(
+                communication__response=True,
+                communication__foia__deleted=False,
+                from_email__isnull=False,
+            )
+            .exclude(communication__foia__portal__type="nextrequest")
+            .select_related("communication__foia", "from_email")
+            .order_by("-pk")[: kwargs["messages"]]
+        )
+        messages = [
+            (
+                MultiValueDict(
+                    {
+                        "From": [str(email_comm.from_email.email)],
+                        "To": [email_comm.communication.foia.get_request_email()],
+                        "Subject": [email_comm.communication.subject],
+                        "body-plain": [email_comm.communication.communication],
+                        "Message-ID": [f"benchmark-{email_comm.pk}"],
+                    }
+                ),
+                email_comm.communication.foia.mail_id,
+            )
+            for email_comm in email_comms
+        ]
+        if not messages:
+            self.stdout.write("No inbound emails to benchmark")
+            return
+
+        with patch.object(EmailAddress, "allowed", legacy_allowed):
+            self._run("Legacy", messages)
+        self._run("Allowlist", messages)
+        # the second pass finds every agency's addresses in the cache
+        self._run("Allowlist (cached)", messages)
+
+    @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+    def _run(self, name, messages):
+        """Route the messages and roll back, reporting the queries used"""
+        with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for post, mail_id in messages:
+                _handle_request(post, {}, mail_id)
+            elapsed = time.perf_counter() - start
+            transaction.set_rollback(True)
+        self.stdout.write(
+            f"{name}: {len(messages)} messages, {len(queries)} queries "
+            f"({len(queries) / len(messages):.2f} per message), {elapsed:.2f}s"
+        )
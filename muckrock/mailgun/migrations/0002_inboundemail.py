@@ -0,0 +1,76 @@
+# Generated by Django 5.2.15 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mailgun", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InboundEmail",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "message_id",
+                    models.TextField(
+                        help_text="The Message-ID header, with angle brackets stripped",
+                        null=True,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "post",
+                    models.JSONField(
+                        help_text="The fields posted by Mailgun, as lists"
+                    ),
+                ),
+                (
+                    "files",
+                    models.JSONField(
+                        default=list,
+                        help_text="The staged attachments, as their field, name, "
+                        "path and content type",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("done", "Done"),
+                            ("error", "Error"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("error", models.TextField(blank=True)),
+                ("datetime_received", models.DateTimeField(auto_now_add=True)),
+                (
+                    "datetime_processed",
+                    models.DateTimeField(blank=True, null=True),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(status="pending"),
+                        fields=["id"],
+                        name="mailgun_inbound_pending_idx",
+                    )
+                ],
+            },
+        ),
+    ]
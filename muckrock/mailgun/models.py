@@ -3,7 +3,19 @@ Models for the mailgun app
 """
 
 # Django
+from django.core.files import File
 from django.db import models
+from django.db.models import Q
+from django.utils.datastructures import MultiValueDict
+
+# Standard Library
+import os.path
+
+# MuckRock
+from muckrock.core.storage import PrivateMediaRootS3BotoStorage
+
+# staged emails may contain anything sent to us, so they are kept private
+inbound_storage = PrivateMediaRootS3BotoStorage()
 
 
 class WhitelistDomain(models.Model):
@@ -13,3 +25,77 @@ class WhitelistDomain(models.Model):
 
     def __str__(self):
         return self.domain
+
+
+class InboundEmail(models.Model):
+    """An incoming email from Mailgun, staged to be routed asynchronously
+
+    The message ID is unique, so a message posted more than once, either to
+    several of our addresses or as a retry by Mailgun, is only routed once
+    """
+
+    message_id = models.TextField(
+        unique=True,
+        null=True,
+        help_text="The Message-ID header, with angle brackets stripped",
+    )
+    post = models.JSONField(help_text="The fields posted by Mailgun, as lists")
+    files = models.JSONField(
+        default=list,
+        help_text="The staged attachments, as their field, name, path and "
+        "content type",
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=(("pending", "Pending"), ("done", "Done"), ("error", "Error")),
+        default="pending",
+    )
+    error = models.TextField(blank=True)
+    datetime_received = models.DateTimeField(auto_now_add=True)
+    datetime_processed = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=Q(status="pending"),
+                name="mailgun_inbound_pending_idx",
+            )
+        ]
+
+    def __str__(self):
+        return self.message_id or "Inbound Email #{}".format(self.pk)
+
+    def get_post(self):
+        """The posted fields, in the same form as the original request"""
+        return MultiValueDict(self.post)
+
+    def stage_files(self, files):
+        """Save uploaded attachments to storage until they are routed"""
+        for key, file_ in files.items():
+            path = inbound_storage.save(
+                "mailgun/inbound/{}/{}".format(self.pk, os.path.basename(file_.name)),
+                file_,
+            )
+            self.files.append(
+                {
+                    "key": key,
+                    "name": file_.name,
+                    "path": path,
+                    "content_type": file_.content_type,
+                }
+            )
+
+    def open_files(self):
+        """Open the staged attachments, in the same form as uploaded files"""
+        files = {}
+        for staged in self.files:
+            file_ = File(inbound_storage.open(staged["path"]), name=staged["name"])
+            file_.content_type = staged["content_type"]
+            files[staged["key"]] = file_
+        return files
+
+    def delete_files(self):
+        """Delete the staged attachments once they have been routed"""
+        for staged in self.files:
+            inbound_storage.delete(staged["path"])
@@ -4,10 +4,28 @@ Celery tasks for mail handling
 
 # Django
 from celery import shared_task
+from django.db import transaction
+from django.utils import timezone
+
+# Standard Library
+import logging
+import sys
+from datetime import timedelta
 
 # MuckRock
 from muckrock.foia.models import FOIACommunication
 from muckrock.mailgun import utils
+from muckrock.mailgun.models import InboundEmail
+
+logger = logging.getLogger(__name__)
+
+# number of staged emails to route per task
+INBOUND_BATCH_SIZE = 50
+# how long to keep routed emails, to reject late duplicates
+INBOUND_KEEP_DAYS = 30
+# how long to keep emails which failed to route, and their attachments, to be
+# retried from the admin
+INBOUND_ERROR_KEEP_DAYS = 90
 
 
 @shared_task(ignore_result=True, name="muckrock.mailgun.tasks.download_links")
@@ -15,3 +33,80 @@ def download_links(comm_pk):
     """Download links from the communication"""
     communication = FOIACommunication.objects.get(pk=comm_pk)
     utils.download_links(communication)
+
+
+@shared_task(ignore_result=True, name="muckrock.mailgun.tasks.process_inbound_emails")
+def process_inbound_emails(batch_size=INBOUND_BATCH_SIZE):
+    """Route staged inbound emails, in batches
+
+    Each email is claimed and routed in its own transaction, skipping emails
+    locked by other workers, so any number of workers may run this
+    concurrently and only the email being routed is locked.  If a worker dies
+    while routing an email, only that email is routed again by the next run.
+    """
+    routed = 0
+    while routed < batch_size:
+        if not _process_inbound_email():
+            return routed
+        routed += 1
+    process_inbound_emails.delay(batch_size)
+    return routed
+
+
+def _process_inbound_email():
+    """Claim and route a single staged email
+
+    Returns False if there are no pending emails left to claim
+    """
+    # pylint: disable=broad-except
+    # pylint: disable=import-outside-toplevel
+    # MuckRock
+    from muckrock.mailgun.views import route_inbound
+
+    with transaction.atomic():
+        inbound = (
+            InboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status="pending")
+            .order_by("pk")
+            .first()
+        )
+        if inbound is None:
+            return False
+        try:
+            with transaction.atomic():
+                route_inbound(inbound)
+        except Exception as exc:
+            logger.error(
+                "Error routing inbound email %s: %s",
+                inbound.pk,
+                exc,
+                exc_info=sys.exc_info(),
+            )
+            inbound.status = "error"
+            inbound.error = str(exc)
+        else:
+            inbound.status = "done"
+            # keep the attachments for emails which failed to route
+            transaction.on_commit(inbound.delete_files)
+        inbound.datetime_processed = timezone.now()
+        inbound.save(update_fields=["status", "error", "datetime_processed"])
+    return True
+
+
+@shared_task(ignore_result=True, name="muckrock.mailgun.tasks.cleanup_inbound_emails")
+def cleanup_inbound_emails():
+    """Remove routed emails once duplicates are no longer expected, and emails
+    which failed to route, along with their attachments, once they are no
+    longer expected to be retried
+    """
+    InboundEmail.objects.filter(
+        status="done",
+        datetime_processed__lt=timezone.now() - timedelta(INBOUND_KEEP_DAYS),
+    ).delete()
+    errors = InboundEmail.objects.filter(
+        status="error",
+        datetime_processed__lt=timezone.now() - timedelta(INBOUND_ERROR_KEEP_DAYS),
+    )
+    for inbound in errors:
+        inbound.delete_files()
+        inbound.delete()
@@ -8,13 +8,14 @@ from django.core import mail
 from django.template.loader import render_to_string
 from django.test import RequestFactory, TestCase
 from django.urls import reverse
+from django.utils import timezone
 
 # Standard Library
 import hashlib
 import hmac
 import os
 import time
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from io import StringIO
 from unittest.mock import Mock, patch
 
@@ -30,6 +31,8 @@ from muckrock.communication.models import EmailAddress, EmailError, EmailOpen
 from muckrock.core.test_utils import RunCommitHooksMixin
 from muckrock.foia.factories import FOIACommunicationFactory, FOIARequestFactory
 from muckrock.foia.models import FOIACommunication
+from muckrock.mailgun.models import InboundEmail
+from muckrock.mailgun.tasks import cleanup_inbound_emails, process_inbound_emails
 from muckrock.mailgun.views import bounces, delivered, opened, route_mailgun
 from muckrock.task.models import OrphanTask
 
@@ -83,7 +86,9 @@ class TestMailgunViews(TestCase):
         if sign:
             self.sign(data)
         request = self.factory.post(reverse("mailgun-route"), data)
-        return route_mailgun(request)
+        response = route_mailgun(request)
+        process_inbound_emails()
+        return response
 
 
 class TestMailgunViewHandleRequest(RunCommitHooksMixin, TestMailgunViews):
@@ -237,8 +242,11 @@ class TestMailgunViewHandleRequest(RunCommitHooksMixin, TestMailgunViews):
 
         assert OrphanTask.objects.filter(reason="ia", address="123-12345678").exists()
 
+    @mock_aws
     def test_attachments(self):
         """Test a message with an attachment"""
+        s3 = boto3.client("s3")
+        s3.create_bucket(Bucket=settings.AWS_MEDIA_BUCKET_NAME)
         try:
             foia = FOIARequestFactory()
             to_ = foia.get_request_email()
@@ -246,6 +254,7 @@ class TestMailgunViewHandleRequest(RunCommitHooksMixin, TestMailgunViews):
             attachments[0].name = "data.pdf"
             attachments[1].name = "ignore.p7s"
             self.mailgun_route(to_=to_, attachments=attachments)
+            self.run_commit_hooks()
             foia.refresh_from_db()
             file_path = date.today().strftime("foia_files/%Y/%m/%d/data.pdf")
             assert foia.get_files().count() == 1
@@ -256,6 +265,71 @@ class TestMailgunViewHandleRequest(RunCommitHooksMixin, TestMailgunViews):
             if os.path.exists(file_path):
                 os.remove(file_path)
 
+    def test_duplicate(self):
+        """A message posted more than once is only routed once"""
+
+        foia = FOIARequestFactory()
+        to_ = foia.get_request_email()
+        self.mailgun_route(to_=to_)
+        self.mailgun_route(to_=to_)
+
+        assert foia.communications.count() == 1
+        inbound = InboundEmail.objects.get()
+        assert inbound.message_id == "message_id"
+        assert inbound.status == "done"
+
+    def test_route_error(self):
+        """Errors routing a message are recorded and do not stop the batch"""
+
+        foia = FOIARequestFactory()
+        to_ = foia.get_request_email()
+        with patch(
+            "muckrock.mailgun.views.route_inbound", Mock(side_effect=ValueError("bad"))
+        ):
+            self.mailgun_route(to_=to_)
+
+        inbound = InboundEmail.objects.get()
+        assert inbound.status == "error"
+        assert inbound.error == "bad"
+        assert foia.communications.count() == 0
+
+    def test_handle_request_error(self):
+        """Unexpected errors handling a request are forwarded and recorded"""
+
+        foia = FOIARequestFactory()
+        to_ = foia.get_request_email()
+        with patch(
+            "muckrock.mailgun.views.FOIARequest.objects.get",
+            Mock(side_effect=ValueError("bad")),
+        ):
+            self.mailgun_route(to_=to_)
+
+        inbound = InboundEmail.objects.get()
+        assert inbound.status == "error"
+        assert inbound.error == "bad"
+        assert len(mail.outbox) == 1
+        assert "Uncaught Mailgun Exception" in mail.outbox[0].subject
+
+    def test_cleanup_inbound_emails(self):
+        """Old routed and errored emails are removed, with their attachments"""
+
+        old = timezone.now() - timedelta(days=365)
+        InboundEmail.objects.create(
+            message_id="done", post={}, status="done", datetime_processed=old
+        )
+        InboundEmail.objects.create(
+            message_id="error",
+            post={},
+            status="error",
+            datetime_processed=old,
+            files=[{"key": "file", "name": "a.pdf", "path": "a.pdf"}],
+        )
+        pending = InboundEmail.objects.create(message_id="pending", post={})
+        with patch("muckrock.mailgun.models.inbound_storage") as mock_storage:
+            cleanup_inbound_emails()
+        mock_storage.delete.assert_called_once_with("a.pdf")
+        assert set(InboundEmail.objects.all()) == {pending}
+
     def test_bad_strip(self):
         """Test an improperly stripped message"""
 
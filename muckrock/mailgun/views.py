@@ -4,9 +4,8 @@ Views for mailgun
 
 # Django
 from django.conf import settings
-from django.core.cache import cache
 from django.core.mail import EmailMessage
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.http import HttpResponse, HttpResponseForbidden
 from django.template.loader import render_to_string
 from django.urls import reverse
@@ -19,10 +18,9 @@ import hmac
 import json
 import logging
 import re
-import sys
 import time
 from datetime import datetime
-from email.utils import getaddresses
+from email.utils import getaddresses, parseaddr
 from functools import wraps
 
 # Third Party
@@ -30,6 +28,7 @@ from constance import config
 
 # MuckRock
 from muckrock.agency.models import AgencyEmail
+from muckrock.communication import allowlist
 from muckrock.communication.models import (
     EmailAddress,
     EmailCommunication,
@@ -41,7 +40,8 @@ from muckrock.communication.models import (
 )
 from muckrock.foia.models import FOIACommunication, FOIARequest, RawEmail
 from muckrock.foia.tasks import classify_status
-from muckrock.mailgun.tasks import download_links
+from muckrock.mailgun.models import InboundEmail
+from muckrock.mailgun.tasks import download_links, process_inbound_emails
 from muckrock.task.models import (
     FileDownloadLink,
     FlaggedTask,
@@ -171,25 +171,41 @@ def get_common_webhook_params(allow_empty_email=False):
 @mailgun_verify
 @csrf_exempt
 def route_mailgun(request):
-    """Handle routing of incoming mail with proper header parsing"""
+    """Stage incoming mail to be routed asynchronously"""
 
     post = request.POST
     # The way spam hero is currently set up, all emails are sent to the same
     # address, so we must parse to headers to find the recipient.  This can
     # cause duplicate messages if one email is sent to or CC'd to multiple
-    # addresses @requests.muckrock.com.  To try and avoid this, we will cache
-    # the message id, which should be a unique identifier for the message.
-    # If it exists in the cache, we will stop processing this email.  The
-    # ID will be cached for 5 minutes - duplicates should normally be processed
-    # within seconds of each other.
+    # addresses @requests.muckrock.com, and Mailgun will also retry messages
+    # it does not think were accepted.  The message ID is unique in the
+    # staging table, so any duplicate is rejected here, no matter how long
+    # after the original it arrives.
     message_id = (
-        post.get("Message-ID") or post.get("Message-Id") or post.get("message-id")
-    )
-    if message_id:
-        # cache.add will return False if the key is already present
-        if not cache.add(message_id, 1, 300):
-            return HttpResponse("OK")
+        post.get("Message-ID") or post.get("Message-Id") or post.get("message-id", "")
+    ).strip("<>") or None
+    try:
+        with transaction.atomic():
+            inbound = InboundEmail.objects.create(
+                message_id=message_id, post=dict(post.lists())
+            )
+            if request.FILES:
+                inbound.stage_files(request.FILES)
+                inbound.save(update_fields=["files"])
+    except IntegrityError:
+        logger.info("Duplicate email: %s", message_id)
+        return HttpResponse("OK")
+
+    transaction.on_commit(process_inbound_emails.delay)
+    return HttpResponse("OK")
+
+
+def route_inbound(inbound):
+    """Route a staged email to the requests it was sent to"""
 
+    post = inbound.get_post()
+    files = inbound.open_files()
+    message_id = inbound.message_id
     p_request_email = re.compile(r"(\d+-\d{3,10})@%s" % settings.MAILGUN_SERVER_NAME)
     tos = post.get("To", "") or post.get("to", "")
     ccs = post.get("Cc", "") or post.get("cc", "")
@@ -200,10 +216,9 @@ def route_mailgun(request):
     for _, email in name_emails:
         m_request_email = p_request_email.match(email)
         if m_request_email:
-            _handle_request(request, m_request_email.group(1))
+            _handle_request(post, files, m_request_email.group(1))
         elif email.endswith("@%s" % settings.MAILGUN_SERVER_NAME):
-            _catch_all(request, email)
-    return HttpResponse("OK")
+            _catch_all(post, files, email)
 
 
 def _parse_email_headers(post):
@@ -212,21 +227,25 @@ def _parse_email_headers(post):
     to_ = post.get("To") or post.get("to", "")
     cc_ = post.get("Cc") or post.get("cc", "")
     reply_to = post.get("Reply-To", "")
-    from_email = EmailAddress.objects.fetch(from_)
-    to_emails = EmailAddress.objects.fetch_many(to_)
-    cc_emails = EmailAddress.objects.fetch_many(cc_)
-    reply_to_email = EmailAddress.objects.fetch(reply_to)
+    # resolve all of the addresses at once
+    to_pairs = getaddresses([to_])
+    cc_pairs = getaddresses([cc_])
+    emails = EmailAddress.objects.resolve(
+        [parseaddr(from_), *to_pairs, *cc_pairs, parseaddr(reply_to)]
+    )
+    from_email, reply_to_email = emails[0], emails[-1]
+    to_emails = [e for e in emails[1 : len(to_pairs) + 1] if e is not None]
+    cc_emails = [e for e in emails[len(to_pairs) + 1 : -1] if e is not None]
     return from_email, to_emails, cc_emails, reply_to_email
 
 
-def _handle_request(request, mail_id):
+def _handle_request(post, files, mail_id):
     """Handle incoming mailgun FOI request messages"""
     # this function needs to be refactored
     # pylint: disable=broad-except
     # pylint: disable=too-many-locals
     # pylint: disable=too-many-branches
     # pylint: disable=too-many-statements
-    post = request.POST
     from_email, to_emails, cc_emails, reply_to_email = _parse_email_headers(post)
     subject = post.get("Subject") or post.get("subject", "")
     message_id = (
@@ -238,7 +257,7 @@ def _handle_request(request, mail_id):
 
         # extra logging for next request portals for now
         if foia.portal and foia.portal.type == "nextrequest":
-            _log_mail(request)
+            _log_mail(post)
 
         if foia.deleted:
             if from_email is not None:
@@ -249,7 +268,7 @@ def _handle_request(request, mail_id):
                     to=[str(from_email)],
                     bcc=[settings.DIAGNOSTIC_EMAIL],
                 ).send(fail_silently=False)
-            return HttpResponse("WARNING")
+            return
 
         if from_email is not None:
             email_allowed = from_email.allowed(foia)
@@ -269,16 +288,16 @@ def _handle_request(request, mail_id):
                 subject,
                 message_id,
                 post,
-                request.FILES,
+                files,
                 foia,
             )
             OrphanTask.objects.create(
                 reason=reason, communication=comm, address=mail_id
             )
-            return HttpResponse("WARNING")
+            return
 
         # if this isn't a known email for this agency, add it
-        if not from_email.agencies.filter(pk=foia.agency.pk).exists():
+        if from_email.pk not in allowlist.get_agency_email_ids(foia.agency_id):
             AgencyEmail.objects.create(agency=foia.agency, email=from_email)
 
         # if this request is using a portal, hide the incoming messages
@@ -304,7 +323,7 @@ def _handle_request(request, mail_id):
             email_comm.to_emails.set(to_emails)
             email_comm.cc_emails.set(cc_emails)
             transaction.on_commit(lambda: RawEmail.objects.make(message_id))
-            comm.process_attachments(request.FILES)
+            comm.process_attachments(files)
             transaction.on_commit(lambda: download_links(comm.pk))
 
             if foia.portal:
@@ -367,27 +386,21 @@ def _handle_request(request, mail_id):
             subject,
             message_id,
             post,
-            request.FILES,
+            files,
             foia,
         )
         OrphanTask.objects.create(reason="ia", communication=comm, address=mail_id)
-        return HttpResponse("WARNING")
-    except Exception as exc:
-        # If anything I haven't accounted for happens, at the very least forward
-        # the email to requests so it isn't lost
-        logger.error(
-            "Uncaught Mailgun Exception - %s: %s", mail_id, exc, exc_info=sys.exc_info()
-        )
-        _forward(post, request.FILES, "Uncaught Mailgun Exception", info=True)
-        return HttpResponse("ERROR")
+    except Exception:
+        # If anything I haven't accounted for happens, forward the email to
+        # requests, and let the error be recorded on the staged email so it may
+        # be retried
+        _forward(post, files, "Uncaught Mailgun Exception", info=True)
+        raise
 
-    return HttpResponse("OK")
 
-
-def _catch_all(request, address):
+def _catch_all(post, files, address):
     """Handle emails sent to other addresses"""
 
-    post = request.POST
     from_email, to_emails, cc_emails, _reply_to_email = _parse_email_headers(post)
     subject = post.get("Subject") or post.get("subject", "")
     message_id = (
@@ -407,13 +420,11 @@ def _catch_all(request, address):
             subject,
             message_id,
             post,
-            request.FILES,
+            files,
             foia,
         )
         OrphanTask.objects.create(reason="ia", communication=comm, address=address)
 
-    return HttpResponse("OK")
-
 
 def _find_likely_bounce(subject):
     """Find likely foia for out of office bounces"""
@@ -674,10 +685,10 @@ def _forward(post, files, title="", extra_content="", info=False):
     email.send(fail_silently=False)
 
 
-def _log_mail(request):
+def _log_mail(post):
     """Log a request"""
     body = []
-    for key, value in request.POST.items():
+    for key, value in post.items():
         body.append("\n{}:".format(key))
         body.append(str(value))
     email = EmailMessage(
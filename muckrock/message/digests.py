@@ -5,6 +5,8 @@ Digest objects for the messages app
 # Django
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.mail import get_connection
 from django.db.models import DurationField, F, Q
 from django.db.models.aggregates import Count
 from django.db.models.functions import Cast, Now
@@ -12,11 +14,11 @@ from django.utils import timezone
 
 # Standard Library
 import logging
-from collections import OrderedDict
+import sys
+from collections import OrderedDict, defaultdict
 from datetime import date, timedelta
 
 # Third Party
-from actstream.models import Action
 from dateutil.relativedelta import relativedelta
 from zenpy import Zenpy
 
@@ -105,6 +107,78 @@ class Digest(TemplateEmail):
         return self.user
 
 
+# classifiers are tuples of a key and a verb phrase to filter by
+# e.g. ('no_documents', 'no responsive documents')
+FOLLOWING_REQUEST_CLASSIFIERS = [
+    ("completed", "completed"),
+    ("rejected", "rejected"),
+    ("no_documents", "no responsive documents"),
+    ("require_payment", "payment"),
+    ("require_fix", "require_fix"),
+    ("interim_response", "processing"),
+    ("acknowledged", "acknowledged"),
+    ("received", "sent a communication"),
+]
+MY_REQUEST_CLASSIFIERS = FOLLOWING_REQUEST_CLASSIFIERS + [("note", "added a note")]
+
+
+def load_request_notifications(notifications, since):
+    """Load the unread request notifications since the given time, for use in
+    activity digests.
+
+    All of the notifications, the objects their actions refer to and the owners
+    of the requests are loaded with a constant number of queries, no matter how
+    many users the notifications belong to.  Each notification is marked as
+    `owned` if its action is about one of its user's own requests.
+    """
+    notifications = list(
+        notifications.get_unread()
+        .for_model(FOIARequest)
+        .filter(datetime__gte=since)
+        .select_related("action")
+        .order_by("datetime", "pk")
+    )
+
+    # load all of the objects the actions refer to, grouped by content type
+    refs = defaultdict(set)
+    for notification in notifications:
+        action = notification.action
+        for field in ("actor", "target", "action_object"):
+            content_type_id = getattr(action, f"{field}_content_type_id")
+            if content_type_id is not None:
+                refs[content_type_id].add(getattr(action, f"{field}_object_id"))
+    foia_ct = ContentType.objects.get_for_model(FOIARequest)
+    objects = {}
+    for content_type_id, object_ids in refs.items():
+        if content_type_id == foia_ct.pk:
+            queryset = FOIARequest.objects.select_related(
+                "agency__jurisdiction", "composer"
+            )
+        else:
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            if model is None:
+                continue
+            queryset = model._default_manager.all()  # pylint: disable=protected-access
+        for pk, obj in queryset.in_bulk(object_ids).items():
+            objects[(content_type_id, str(pk))] = obj
+
+    for notification in notifications:
+        action = notification.action
+        owners = set()
+        for field in ("actor", "target", "action_object"):
+            content_type_id = getattr(action, f"{field}_content_type_id")
+            obj = objects.get(
+                (content_type_id, str(getattr(action, f"{field}_object_id")))
+            )
+            if obj is not None:
+                # cache the object on the action's generic foreign key
+                setattr(action, field, obj)
+            if content_type_id == foia_ct.pk and obj is not None:
+                owners.add(obj.composer.user_id)
+        notification.owned = action.public and notification.user_id in owners
+    return notifications
+
+
 class ActivityDigest(Digest):
     """
     An ActivityDigest describes a collection of activity over a duration, which
@@ -114,21 +188,11 @@ class ActivityDigest(Digest):
     text_template = "message/digest/digest.txt"
     html_template = "message/digest/digest.html"
 
-    # Here we scaffold out the activity dictionary.
-    # It is scaffolded to prevent key errors when counting
-    # activity, as well as to provide some guidance for
-    # which activities to filter from the global stream.
-
     # Activity is independent from template context because
     # we use activity counts to influence other parts of the
     # email, like the subject line and whether or not to
     # even send the email at all.
 
-    activity = {
-        "count": 0,
-        "requests": {"count": 0, "mine": None, "following": None},
-    }
-
     # Most of the work re: composing the email takes place
     # at init. This is by design, since digests should require
     # a minimum of configuration outside of their own configuration,
@@ -140,9 +204,20 @@ class ActivityDigest(Digest):
     # less flexible. On the other, this flexibility might not be required
     # beyond specifically-defined subclasses.
 
-    def __init__(self, **kwargs):
-        """Initialize the digest with a dynamic subject."""
+    def __init__(self, notifications=None, **kwargs):
+        """Initialize the digest with a dynamic subject.
+
+        The user's notifications may be passed in if they have already been
+        loaded by `load_request_notifications`, otherwise they are loaded here.
+        """
         logger.info("Activity digest - creating - User: %s", self.user)
+        # Here we scaffold out the activity dictionary.
+        # It is scaffolded to prevent key errors when counting activity.
+        self.activity = {
+            "count": 0,
+            "requests": {"count": 0, "mine": None, "following": None},
+        }
+        self.notifications = notifications
         super().__init__(**kwargs)
         self.subject = self.get_subject()
 
@@ -153,89 +228,42 @@ class ActivityDigest(Digest):
         context["subject"] = self.get_subject()
         return context
 
-    def notifications_for_model(self, notifications, model):
-        """Filter a list of notifications for a specific model,
-        split between objects owned by the user and objects followed by the user."""
-        user = self.get_user()
-        model_notifications = notifications.for_model(model)
-        own_model_actions = Action.objects.owned_by(user, model)
-        own_model_notifications = model_notifications.filter(
-            action__in=own_model_actions
-        )
-        following_model_notifications = model_notifications.exclude(
-            action__in=own_model_actions
-        )
-        return {
-            "count": model_notifications.count(),
-            "mine": own_model_notifications,
-            "following": following_model_notifications,
-        }
-
     def get_activity(self):
         """Returns a list of activities to be sent in the email"""
-        duration = self.get_duration()
-        user = self.get_user()
-        # get unread notifications for the user that are new since the last email
-        notifications = (
-            Notification.objects.for_user(user)
-            .get_unread()
-            .filter(datetime__gte=duration)
-        )
+        notifications = self.notifications
+        if notifications is None:
+            # get unread notifications for the user that are new since the last
+            # email
+            notifications = load_request_notifications(
+                Notification.objects.for_user(self.get_user()), self.get_duration()
+            )
         self.activity["requests"] = self.foia_notifications(notifications)
         self.activity["count"] = self.activity["requests"]["count"]
         return self.activity
 
     def foia_notifications(self, notifications):
-        """Do some heavy filtering and classifying of foia notifications."""
-        filtered_notifications = self.notifications_for_model(
-            notifications, FOIARequest
+        """Classify the foia notifications, split between requests owned by the
+        user and requests followed by the user."""
+        mine = self.classify_request_notifications(
+            [n for n in notifications if n.owned], MY_REQUEST_CLASSIFIERS
         )
-        filtered_notifications["mine"] = self.classify_request_notifications(
-            filtered_notifications["mine"],
-            [
-                ("completed", "completed"),
-                ("rejected", "rejected"),
-                ("no_documents", "no responsive documents"),
-                ("require_payment", "payment"),
-                ("require_fix", "require_fix"),
-                ("interim_response", "processing"),
-                ("acknowledged", "acknowledged"),
-                ("received", "sent a communication"),
-                ("note", "added a note"),
-            ],
+        following = self.classify_request_notifications(
+            [n for n in notifications if not n.owned], FOLLOWING_REQUEST_CLASSIFIERS
         )
-        filtered_notifications["following"] = self.classify_request_notifications(
-            filtered_notifications["following"],
-            [
-                ("completed", "completed"),
-                ("rejected", "rejected"),
-                ("no_documents", "no responsive documents"),
-                ("require_payment", "payment"),
-                ("require_fix", "require_fix"),
-                ("interim_response", "processing"),
-                ("acknowledged", "acknowledged"),
-                ("received", "sent a communication"),
-            ],
-        )
-        filtered_notifications["count"] = (
-            filtered_notifications["mine"]["count"]
-            + filtered_notifications["following"]["count"]
-        )
-        return filtered_notifications
+        return {
+            "count": mine["count"] + following["count"],
+            "mine": mine,
+            "following": following,
+        }
 
     def classify_request_notifications(self, notifications, classifiers):
         """Break a single list of notifications into a classified dictionary."""
         classified = {}
-        # a classifier should be a tuple of a key and a verb phrase to filter by
-        # e.g. ('no_documents', 'no responsive documents')
-        for classifier in classifiers:
-            classified[classifier[0]] = notifications.filter(
-                action__verb__icontains=classifier[1]
-            )
-        activity_count = 0
-        for _, classified_stream in classified.items():
-            activity_count += len(classified_stream)
-        classified["count"] = activity_count
+        for key, verb in classifiers:
+            classified[key] = [
+                n for n in notifications if verb.lower() in n.action.verb.lower()
+            ]
+        classified["count"] = sum(len(c) for c in classified.values())
         return classified
 
     def get_subject(self):
@@ -254,6 +282,56 @@ class ActivityDigest(Digest):
         return super().send(fail_silently)
 
 
+def send_activity_digests(users, subject, interval):
+    """Create and send activity digests for a batch of users
+
+    The notifications for all of the users are loaded in a single pass and
+    classified in memory, and the emails are sent over a single connection,
+    logging any which fail to send
+    """
+    notifications = defaultdict(list)
+    for notification in load_request_notifications(
+        Notification.objects.filter(user__in=users), timezone.now() - interval
+    ):
+        notifications[notification.user_id].append(notification)
+
+    emails = []
+    for user in users:
+        if not notifications[user.pk]:
+            continue
+        email = ActivityDigest(
+            user=user,
+            subject=subject,
+            interval=interval,
+            notifications=notifications[user.pk],
+        )
+        if email.activity["count"] > 0:
+            emails.append(email)
+
+    sent = 0
+    if emails:
+        with get_connection() as connection:
+            # send the emails one at a time, so one failure does not stop
+            # the rest of the batch from being sent
+            for email in emails:
+                try:
+                    sent += connection.send_messages([email])
+                except Exception as exc:  # pylint: disable=broad-except
+                    logger.error(
+                        "Activity digest - failed to send - User: %s Error: %s",
+                        email.user,
+                        exc,
+                        exc_info=sys.exc_info(),
+                    )
+    logger.info(
+        "Activity digests sent - Subject: %s Users: %d Sent: %d",
+        subject,
+        len(users),
+        sent,
+    )
+    return sent
+
+
 class StaffDigest(Digest):
     """An email that digests other site stats for staff members."""
 
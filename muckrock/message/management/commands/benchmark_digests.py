@@ -0,0 +1,70 @@
+"""Compare building activity digests one user at a time against in bulk"""
+
+# Django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Standard Library
+import time
+from unittest.mock import patch
+
+# MuckRock
+from muckrock.message import digests
+from muckrock.message.tasks import DIGEST_INTERVALS
+
+
+class Command(BaseCommand):
+    """Benchmark activity digests without sending any email"""
+
+    help = "Benchmark building activity digests per user against in bulk"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--preference", choices=list(DIGEST_INTERVALS), default="hourly"
+        )
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument(
+            "--skip-individual",
+            action="store_true",
+            help="Only benchmark bulk digests",
+        )
+
+    def handle(self, *args, **kwargs):
+        interval = DIGEST_INTERVALS[kwargs["preference"]]
+        users = list(
+            User.objects.filter(notifications__read=False)
+            .select_related("profile")
+            .distinct()[: kwargs["users"]]
+        )
+        if not users:
+            self.stdout.write("No users with unread notifications")
+            return
+
+        # build the emails, but do not send them, or get autologin tokens
+        with patch(
+            "muckrock.accounts.models.Profile.get_url_auth_token", return_value=None
+        ), patch("muckrock.message.digests.get_connection"):
+            if not kwargs["skip_individual"]:
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    for user in users:
+                        digests.ActivityDigest(
+                            user=user, subject="Benchmark", interval=interval
+                        )
+                    elapsed = time.perf_counter() - start
+                self._report("Individual", len(users), len(queries), elapsed)
+
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                digests.send_activity_digests(users, "Benchmark", interval)
+                elapsed = time.perf_counter() - start
+            self._report("Bulk", len(users), len(queries), elapsed)
+
+    def _report(self, name, num_users, num_queries, elapsed):
+        """Print the results of a benchmark"""
+        self.stdout.write(
+            f"{name}: {num_users} users, {num_queries} queries "
+            f"({num_queries / num_users:.2f} per user), {elapsed:.2f}s"
+        )
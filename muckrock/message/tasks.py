@@ -28,6 +28,17 @@ from muckrock.message.notifications import SlackNotification
 logger = logging.getLogger(__name__)
 
 
+DIGEST_INTERVALS = {
+    "hourly": relativedelta(hours=1),
+    "daily": relativedelta(days=1),
+    "weekly": relativedelta(weeks=1),
+    "monthly": relativedelta(months=1),
+}
+
+# number of users to send activity digests to in a single task
+DIGEST_BATCH_SIZE = 500
+
+
 @shared_task(
     time_limit=600,
     soft_time_limit=570,
@@ -36,12 +47,7 @@ logger = logging.getLogger(__name__)
 def send_activity_digest(user_id, subject, preference):
     """Individual task to create and send an activity digest to a user."""
     user = User.objects.get(id=user_id)
-    interval = {
-        "hourly": relativedelta(hours=1),
-        "daily": relativedelta(days=1),
-        "weekly": relativedelta(weeks=1),
-        "monthly": relativedelta(months=1),
-    }[preference]
+    interval = DIGEST_INTERVALS[preference]
 
     logger.info(
         "Starting activity digest - User: %s Subject: %s Interval: %s",
@@ -67,13 +73,39 @@ def send_activity_digest(user_id, subject, preference):
         )
 
 
+@shared_task(
+    time_limit=1800,
+    soft_time_limit=1770,
+    name="muckrock.message.tasks.send_activity_digests",
+)
+def send_activity_digests(user_ids, subject, preference):
+    """Create and send activity digests to a batch of users."""
+    users = list(User.objects.filter(pk__in=user_ids).select_related("profile"))
+    interval = DIGEST_INTERVALS[preference]
+    try:
+        digests.send_activity_digests(users, subject, interval)
+    except SoftTimeLimitExceeded:
+        logger.error(
+            "Send Activity Digests took too long. Users: %d, Subject: %s, "
+            "Interval %s",
+            len(users),
+            subject,
+            interval,
+        )
+
+
 def send_digests(preference, subject):
     """Helper to send out timed digests"""
-    users = User.objects.filter(
-        profile__email_pref=preference, notifications__read=False
-    ).distinct()
-    for user in users:
-        send_activity_digest.delay(user.pk, subject, preference)
+    user_ids = list(
+        User.objects.filter(profile__email_pref=preference, notifications__read=False)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+        .distinct()
+    )
+    for i in range(0, len(user_ids), DIGEST_BATCH_SIZE):
+        send_activity_digests.delay(
+            user_ids[i : i + DIGEST_BATCH_SIZE], subject, preference
+        )
 
 
 @shared_task
@@ -5,11 +5,15 @@ correctly grabbing site activity.
 """
 
 # Django
+from django.contrib.auth.models import User
+from django.core import mail
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 # Standard Library
 from datetime import date
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 
 # Third Party
 import pytest
@@ -105,6 +109,63 @@ class TestDailyDigest(TestCase):
         assert email.send() == 0, "The email should not send."
 
 
+class TestBulkActivityDigests(TestCase):
+    """Activity digests for many users are built with a constant number of queries"""
+
+    def setUp(self):
+        self.interval = relativedelta(days=1)
+
+    def _send_digests(self, num_users):
+        """Send digests to users who own and follow requests"""
+        users = UserFactory.create_batch(num_users)
+        agency = AgencyFactory()
+        for user in users:
+            own_foia = FOIARequestFactory(composer__user=user, agency=agency)
+            notify(user, new_action(agency, "completed", target=own_foia))
+            other_foia = FOIARequestFactory(agency=agency)
+            notify(user, new_action(agency, "rejected", target=other_foia))
+        users = list(
+            User.objects.filter(pk__in=[u.pk for u in users]).select_related("profile")
+        )
+        with CaptureQueriesContext(connection) as queries:
+            sent = digests.send_activity_digests(users, "Daily Digest", self.interval)
+        assert sent == num_users
+        return len(queries)
+
+    def test_classification(self):
+        """Notifications should be classified by ownership and verb"""
+        user = UserFactory()
+        agency = AgencyFactory()
+        own_foia = FOIARequestFactory(composer__user=user, agency=agency)
+        notify(user, new_action(agency, "completed", target=own_foia))
+        other_foia = FOIARequestFactory(agency=agency)
+        notify(user, new_action(agency, "rejected", target=other_foia))
+        digests.send_activity_digests([user], "Daily Digest", self.interval)
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].subject == "Daily Digest: 2 Updates"
+        assert own_foia.title in mail.outbox[0].body
+        assert other_foia.title in mail.outbox[0].body
+
+    def test_constant_queries(self):
+        """The number of queries should not depend on the number of users"""
+        assert self._send_digests(1) == self._send_digests(5)
+
+    def test_send_failure(self):
+        """A failure sending one digest should not stop the others"""
+        users = UserFactory.create_batch(2)
+        agency = AgencyFactory()
+        for user in users:
+            foia = FOIARequestFactory(composer__user=user, agency=agency)
+            notify(user, new_action(agency, "completed", target=foia))
+        connection_ = MagicMock()
+        connection_.__enter__.return_value = connection_
+        connection_.send_messages.side_effect = [Exception("Error sending"), 1]
+        with patch("muckrock.message.digests.get_connection", return_value=connection_):
+            sent = digests.send_activity_digests(users, "Daily Digest", self.interval)
+        assert sent == 1
+        assert connection_.send_messages.call_count == 2
+
+
 class TestStaffDigest(TestCase):
     """The Staff Digest updates us about the state of the website."""
 
@@ -22,14 +22,26 @@ class TestDailyTask(TestCase):
     def setUp(self):
         self.user = UserFactory()
 
-    @mock.patch("muckrock.message.tasks.send_activity_digest.delay")
+    @mock.patch("muckrock.message.tasks.send_activity_digests.delay")
     def test_when_unread(self, mock_send):
         """The send method should be called when a user has unread notifications."""
         NotificationFactory(user=self.user)
         tasks.daily_digest()
-        mock_send.assert_called_with(self.user.pk, "Daily Digest", "daily")
+        mock_send.assert_called_with([self.user.pk], "Daily Digest", "daily")
+
+    @mock.patch("muckrock.message.tasks.DIGEST_BATCH_SIZE", 2)
+    @mock.patch("muckrock.message.tasks.send_activity_digests.delay")
+    def test_batches(self, mock_send):
+        """Users should be split into batches"""
+        users = [self.user, UserFactory(), UserFactory()]
+        for user in users:
+            NotificationFactory(user=user)
+        tasks.daily_digest()
+        user_ids = sorted(u.pk for u in users)
+        mock_send.assert_any_call(user_ids[:2], "Daily Digest", "daily")
+        mock_send.assert_any_call(user_ids[2:], "Daily Digest", "daily")
 
-    @mock.patch("muckrock.message.tasks.send_activity_digest.delay")
+    @mock.patch("muckrock.message.tasks.send_activity_digests.delay")
     def test_when_no_unread(self, mock_send):
         """The send method should not be called when a user does not have
         unread notifications."""
@@ -18,6 +18,13 @@ class NewsConfig(AppConfig):
         from actstream import registry as action
         from watson import search
 
+        # MuckRock
+        from muckrock.core import fulltext
+
         Article = self.get_model("Article")
         action.register(Article)
         search.register(Article.objects.get_published())
+        fulltext.register(
+            Article.objects.get_published(),
+            {"title": "A", "kicker": "B", "summary": "B", "body": "C"},
+        )
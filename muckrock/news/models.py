@@ -4,6 +4,8 @@ Models for the News application
 
 # Django
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.cache import cache
 from django.core.cache.utils import make_template_fragment_key
 from django.db import models
@@ -90,6 +92,7 @@ class Article(models.Model):
         "Show the sidebar",
         default=True,
     )
+    search_vector = SearchVectorField(null=True, editable=False)
     objects = ArticleQuerySet.as_manager()
     tags = TaggableManager(through=TaggedItemBase, blank=True)
 
@@ -141,6 +144,7 @@ class Article(models.Model):
     class Meta:
         ordering = ["-pub_date"]
         get_latest_by = "pub_date"
+        indexes = [GinIndex(fields=["search_vector"], name="article_search_idx")]
 
 
 class Authorship(models.Model):
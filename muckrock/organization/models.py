@@ -234,9 +234,19 @@ class Organization(models.Model):
     @transaction.atomic
     def merge(self, uuid):
         """Merge this org into another org"""
+        # pylint: disable=import-outside-toplevel
+        # MuckRock
+        from muckrock.foia.models import FOIARequest, FOIARequestAccess
+
         other = Organization.objects.get(uuid=uuid)
         logger.info("Merge orgs: %d %d", self.pk, other.pk)
+        foia_pks = list(
+            FOIARequest.objects.filter(composer__organization=self).values_list(
+                "pk", flat=True
+            )
+        )
         self.composers.update(organization=other)
+        FOIARequestAccess.objects.rebuild(foia_pks)
 
         # add all users not already in the other organization
         self.memberships.exclude(user__in=other.users.all()).update(organization=other)
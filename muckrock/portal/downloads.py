@@ -0,0 +1,111 @@
+"""
+Download documents released through portals
+
+Released records can be hundreds of megabytes, so they are never held in
+memory.  Each is streamed in chunks to a temporary file, which is saved to
+storage when it is attached, and the documents of a single release are
+downloaded concurrently.
+"""
+
+# Django
+from django.core.files import File
+
+# Standard Library
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+
+# MuckRock
+from muckrock.portal.exceptions import PortalError
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+# downloads smaller than this are kept in memory
+SPOOL_SIZE = 5 * 1024 * 1024
+# number of documents from a single release to download at once
+DOWNLOAD_WORKERS = 4
+
+
+class Download:
+    """A document streamed to a temporary file"""
+
+    def __init__(self, name, reply):
+        self.name = name
+        # the file stays open until the download is attached or closed
+        # pylint: disable=consider-using-with
+        self.file = SpooledTemporaryFile(max_size=SPOOL_SIZE)
+        self.size = 0
+        self.sha256 = None
+        try:
+            self.stream(reply)
+        except BaseException:
+            self.close()
+            raise
+
+    def stream(self, reply):
+        """Write the reply to the file, checking that none of it was lost"""
+        digest = hashlib.sha256()
+        for chunk in reply.iter_content(chunk_size=CHUNK_SIZE):
+            self.file.write(chunk)
+            self.size += len(chunk)
+            digest.update(chunk)
+        self.file.seek(0)
+        self.sha256 = digest.hexdigest()
+
+        expected = reply.headers.get("Content-Length")
+        # the length is of the encoded content if the response is compressed
+        if (
+            expected is not None
+            and "Content-Encoding" not in reply.headers
+            and int(expected) != self.size
+        ):
+            raise PortalError(
+                "Download of {} was truncated\n"
+                "Expected {} bytes, received {} bytes".format(
+                    self.name, expected, self.size
+                )
+            )
+
+    def attach(self, comm, source):
+        """Attach the document to a communication, saving it to storage"""
+        logger.info(
+            "Attaching portal download: %s (%d bytes, sha256 %s)",
+            self.name,
+            self.size,
+            self.sha256,
+        )
+        try:
+            return comm.attach_file(
+                file_=File(self.file, name=self.name), name=self.name, source=source
+            )
+        finally:
+            self.close()
+
+    def close(self):
+        """Remove the temporary file"""
+        self.file.close()
+
+
+def download_all(fetch, items, workers=DOWNLOAD_WORKERS):
+    """Download each of the items concurrently
+
+    `fetch(*item)` downloads a single item, returning a `Download`.  The
+    downloads are returned in the same order as the items.  If any of them
+    fail, the rest are discarded and the first error is raised.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(fetch, *item) for item in items]
+    downloads = []
+    error = None
+    for future in futures:
+        try:
+            downloads.append(future.result())
+        except Exception as exc:  # pylint: disable=broad-except
+            error = error or exc
+    if error is not None:
+        for download in downloads:
+            download.close()
+        raise error
+    return downloads
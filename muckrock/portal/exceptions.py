@@ -5,3 +5,7 @@ Exceptions used by the portal app
 
 class PortalError(Exception):
     """An error occurred during automatic Portal interaction"""
+
+
+class SessionExpired(PortalError):
+    """The portal no longer recognizes our logged in session"""
@@ -16,6 +16,8 @@ import requests
 # MuckRock
 from muckrock.communication.models import PortalCommunication
 from muckrock.foia.models import FOIACommunication
+from muckrock.portal.downloads import Download, download_all
+from muckrock.portal.exceptions import PortalError
 from muckrock.portal.portals.automated import PortalAutoReceiveMixin
 from muckrock.portal.portals.manual import ManualPortal
 from muckrock.portal.tasks import portal_task
@@ -61,16 +63,24 @@ class FBIPortal(PortalAutoReceiveMixin, ManualPortal):
         """Download the documents asynchornously"""
         comm = FOIACommunication.objects.get(pk=comm_pk)
         p_document_link = re.compile(r"\* \[(?P<name>[^\]]+)\]\((?P<url>.*)\)")
-        for name, url in p_document_link.findall(comm.communication):
-            reply = requests.get(url, timeout=10)
-            if reply.status_code != 200:
-                ManualPortal.receive_msg(
-                    self, comm, reason="Error downloading file: {}".format(name)
-                )
-                return
-            comm.attach_file(content=reply.content, name=name, source=self.portal.name)
+        try:
+            downloads = download_all(
+                self._download, p_document_link.findall(comm.communication)
+            )
+        except PortalError as exc:
+            ManualPortal.receive_msg(self, comm, reason=exc.args[0])
+            return
+        for download in downloads:
+            download.attach(comm, self.portal.name)
         self._accept_comm(comm, "There are eFOIA files available for you to download.")
 
+    def _download(self, name, url):
+        """Download a single document"""
+        with requests.get(url, stream=True, timeout=10) as reply:
+            if reply.status_code != 200:
+                raise PortalError("Error downloading file: {}".format(name))
+            return Download(name, reply)
+
     def send_msg(self, comm, **kwargs):
         """Send a message via email if it is not a new submission"""
         # need to update communications to ensure we have the correct count
@@ -15,14 +15,16 @@ from datetime import timedelta
 import dateutil
 import requests
 from furl import furl
+from govqa.base import GovQA, UnauthenticatedError
 from smart_open.smart_open_lib import smart_open
 
 # MuckRock
-from govqa.base import GovQA
 from muckrock.core.utils import parse_header
 from muckrock.foia.models.communication import FOIACommunication
 from muckrock.foia.models.file import get_path
+from muckrock.portal.exceptions import SessionExpired
 from muckrock.portal.portals.manual import ManualPortal
+from muckrock.portal.sessions import session_pool
 from muckrock.portal.tasks import portal_task
 from muckrock.task.models import FlaggedTask
 
@@ -85,13 +87,26 @@ class GovQAPortal(ManualPortal):
             comm.pk,
             url,
         )
-        client = GovQA(url, check_login=False)
+        return GovQA(url, check_login=False)
+
+    def login(self, client, comm):
+        """Log a GovQA client in to the request's account"""
         logger.info("[GOVQA] FOIA: %d Comm: %d - Logging In", comm.foia_id, comm.pk)
         client.login(comm.foia.get_request_email(), comm.foia.portal_password)
-        logger.info(
-            "[GOVQA] FOIA: %d Comm: %d - Returning Client", comm.foia_id, comm.pk
+
+    def with_client(self, comm, func):
+        """Call `func` with a GovQA client logged in to the request's account
+
+        The login is shared with other tasks for the same account
+        """
+        return session_pool.run(
+            self.portal,
+            comm.foia.get_request_email(),
+            comm.foia.portal_password,
+            login=lambda client: self.login(client, comm),
+            func=func,
+            create=lambda: self.get_client(comm),
         )
-        return client
 
     def receive_msg(self, comm, **kwargs):
         """Check for attachments upon receiving a communication"""
@@ -121,7 +136,10 @@ class GovQAPortal(ManualPortal):
             comm.foia_id,
             comm.pk,
         )
-        reqs = client.list_requests()
+        try:
+            reqs = client.list_requests()
+        except UnauthenticatedError as exc:
+            raise SessionExpired(str(exc)) from exc
 
         if len(reqs) == 0:
             logger.warning(
@@ -191,9 +209,9 @@ class GovQAPortal(ManualPortal):
                 comm.foia_id,
                 comm_pk,
             )
-            client = self.get_client(comm)
-
-            request = self._get_request(client, comm)
+            request = self.with_client(
+                comm, lambda client: self._get_request(client, comm)
+            )
             if request is None:
                 return
 
@@ -245,7 +263,9 @@ class GovQAPortal(ManualPortal):
             )
 
             # stream the download to not overflow RAM on large files
-            with requests.get(url, stream=True, timeout=10) as resp:
+            with session_pool.slot(self.portal), requests.get(
+                url, stream=True, timeout=10
+            ) as resp:
                 if resp.status_code != 200:
                     logger.warning(
                         "[GOVQA] Communication: %d Download failed: %s %s Status: %d "
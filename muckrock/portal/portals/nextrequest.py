@@ -23,9 +23,11 @@ from furl import furl
 from muckrock.communication.models import PortalCommunication
 from muckrock.foia.models import FOIACommunication
 from muckrock.foia.tasks import prepare_snail_mail
-from muckrock.portal.exceptions import PortalError
+from muckrock.portal.downloads import Download, download_all
+from muckrock.portal.exceptions import PortalError, SessionExpired
 from muckrock.portal.portals.automated import PortalAutoReceiveMixin
 from muckrock.portal.portals.manual import ManualPortal
+from muckrock.portal.sessions import session_pool
 from muckrock.portal.tasks import portal_task
 from muckrock.task.models import PortalTask
 
@@ -84,53 +86,11 @@ class NextRequestPortal(PortalAutoReceiveMixin, ManualPortal):
         comm = FOIACommunication.objects.get(pk=comm_pk)
         try:
             foia = comm.foia
-            user = foia.user
             email = foia.get_request_email()
             password = self.get_new_password()
 
-            session = requests.Session()
-            csrf_token = self._get_csrf_token(session, "requests/new")
-
-            data = {
-                "request[subtitle]": "",  # this must be blank
-                "request[request_text]": linebreaks(comm.communication),
-                "requester[email]": email,
-                "requester[name]": user.profile.full_name,
-                "requester[phone_number]": settings.PHONE_NUMBER,
-                "requester[address]": f"{settings.ADDRESS_DEPT}, "
-                "{settings.ADDRESS_STREET}".format(pk=foia.pk),
-                "requester[city]": settings.ADDRESS_CITY,
-                "requester[state]": settings.ADDRESS_STATE,
-                "requester[zipcode]": settings.ADDRESS_ZIP,
-                "requester[company]": "",
-                "utf8": "✓",
-                "authenticity_token": csrf_token,
-                "commit": "Make Request",
-            }
-            # this doesn't work without this 4 second delay here
-            time.sleep(4)
-            reply = self._post(
-                session,
-                furl(self.portal.url).add(path="requests").url,
-                "Making the initial request",
-                data=data,
-            )
-            csrf_token = self._get_csrf_token(reply=reply)
-
-            data = {
-                "user[email]": email,
-                "user[password]": password,
-                "user[password_confirmation]": password,
-                "utf8": "✓",
-                "authenticity_token": csrf_token,
-                "commit": "Save",
-            }
-            self._post(
-                session,
-                furl(self.portal.url).add(path="passwords").url,
-                "Saving the password",
-                data=data,
-            )
+            with session_pool.slot(self.portal):
+                self._create_request(comm, email, password)
             foia.status = "ack"
             foia.portal_password = password
             foia.save()
@@ -145,30 +105,67 @@ class NextRequestPortal(PortalAutoReceiveMixin, ManualPortal):
             # manual send, with an error message explaining what went wrong
             super().send_msg(comm, reason=exc.args[0], **kwargs)
 
+    def _create_request(self, comm, email, password):
+        """Make the initial request, creating our account for it"""
+        foia = comm.foia
+        session = requests.Session()
+        csrf_token = self._get_csrf_token(session, "requests/new")
+
+        data = {
+            "request[subtitle]": "",  # this must be blank
+            "request[request_text]": linebreaks(comm.communication),
+            "requester[email]": email,
+            "requester[name]": foia.user.profile.full_name,
+            "requester[phone_number]": settings.PHONE_NUMBER,
+            "requester[address]": f"{settings.ADDRESS_DEPT}, "
+            "{settings.ADDRESS_STREET}".format(pk=foia.pk),
+            "requester[city]": settings.ADDRESS_CITY,
+            "requester[state]": settings.ADDRESS_STATE,
+            "requester[zipcode]": settings.ADDRESS_ZIP,
+            "requester[company]": "",
+            "utf8": "✓",
+            "authenticity_token": csrf_token,
+            "commit": "Make Request",
+        }
+        # this doesn't work without this 4 second delay here
+        time.sleep(4)
+        reply = self._post(
+            session,
+            furl(self.portal.url).add(path="requests").url,
+            "Making the initial request",
+            data=data,
+        )
+        csrf_token = self._get_csrf_token(reply=reply)
+
+        data = {
+            "user[email]": email,
+            "user[password]": password,
+            "user[password_confirmation]": password,
+            "utf8": "✓",
+            "authenticity_token": csrf_token,
+            "commit": "Save",
+        }
+        self._post(
+            session,
+            furl(self.portal.url).add(path="passwords").url,
+            "Saving the password",
+            data=data,
+        )
+
     def send_followup_msg_task(self, comm_pk, **kwargs):
         """Send a followup message as a task"""
         comm = FOIACommunication.objects.get(pk=comm_pk)
         try:
             request_id = self._get_request_id(comm)
-            session = requests.Session()
-            self._login(comm, session)
-            csrf_token = self._get_csrf_token(
-                session, ["requests", comm.foia.current_tracking_id()]
+            # the note and the documents are sent with separate sessions, so
+            # that an expired session while sending the documents does not
+            # send the note again
+            self._with_session(
+                comm, lambda session: self._send_followup(comm, session, request_id)
             )
-            headers = {"X-CSRF-Token": csrf_token, "X-Requested-With": "XMLHttpRequest"}
-            data = {
-                "note[note_text]": linebreaks(comm.communication),
-                "note[request_id]": request_id,
-                "type": "external",
-            }
-            self._post(
-                session,
-                furl(self.portal.url).add(path="notes").url,
-                "Sending a followup message",
-                data=data,
-                headers=headers,
+            self._with_session(
+                comm, lambda session: self._send_documents(comm, session, request_id)
             )
-            self._send_documents(comm, session, request_id)
             PortalCommunication.objects.create(
                 communication=comm,
                 sent_datetime=timezone.now(),
@@ -180,6 +177,25 @@ class NextRequestPortal(PortalAutoReceiveMixin, ManualPortal):
             # manual send, with an error message explaining what went wrong
             super().send_msg(comm, reason=exc.args[0], **kwargs)
 
+    def _send_followup(self, comm, session, request_id):
+        """Send a followup message"""
+        csrf_token = self._get_csrf_token(
+            session, ["requests", comm.foia.current_tracking_id()]
+        )
+        headers = {"X-CSRF-Token": csrf_token, "X-Requested-With": "XMLHttpRequest"}
+        data = {
+            "note[note_text]": linebreaks(comm.communication),
+            "note[request_id]": request_id,
+            "type": "external",
+        }
+        self._post(
+            session,
+            furl(self.portal.url).add(path="notes").url,
+            "Sending a followup message",
+            data=data,
+            headers=headers,
+        )
+
     def _get_request_id(self, comm):
         """Get the request id for sending followup messages"""
         if not comm.foia:
@@ -305,9 +321,12 @@ class NextRequestPortal(PortalAutoReceiveMixin, ManualPortal):
             if first_comm.files.exists():
                 try:
                     request_id = self._get_request_id(first_comm)
-                    session = requests.Session()
-                    self._login(first_comm, session)
-                    self._send_documents(first_comm, session, request_id)
+                    self._with_session(
+                        first_comm,
+                        lambda session: self._send_documents(
+                            first_comm, session, request_id
+                        ),
+                    )
                 except PortalError as exc:
                     PortalTask.objects.create(
                         category="u",
@@ -368,34 +387,51 @@ class NextRequestPortal(PortalAutoReceiveMixin, ManualPortal):
         """Download the documents in a task"""
         comm = FOIACommunication.objects.get(pk=comm_pk)
         try:
-            session = requests.Session()
-            self._login(comm, session)
-            reply = self._get(
-                session,
-                furl(self.portal.url)
-                .add(path=["requests", comm.foia.current_tracking_id()])
-                .url,
-                "Getting request page to view list of documents",
-            )
             documents = [d.strip("-* \r") for d in documents.split("\n") if d.strip()]
-            soup = BeautifulSoup(reply.content, "lxml")
-            for document in documents:
-                href = self._find_tag_attr(
+            self._with_session(
+                comm, lambda session: self._download_documents(comm, session, documents)
+            )
+            self._accept_comm(comm, text)
+        except PortalError as exc:
+            ManualPortal.receive_msg(self, comm, reason=exc.args[0])
+
+    def _download_documents(self, comm, session, documents):
+        """Download the released documents and attach them to the communication"""
+        reply = self._get(
+            session,
+            furl(self.portal.url)
+            .add(path=["requests", comm.foia.current_tracking_id()])
+            .url,
+            "Getting request page to view list of documents",
+        )
+        soup = BeautifulSoup(reply.content, "lxml")
+        links = [
+            (
+                document,
+                self._find_tag_attr(
                     soup,
                     {"name": "a", "class": "document-link", "string": document},
                     "href",
                     "Attempting to find the document: {}".format(document),
-                )
-                url = furl(self.portal.url).add(path=href)
-                reply = self._get(
-                    session, url, "Downloading document: {}".format(document)
-                )
-                comm.attach_file(
-                    content=reply.content, name=document, source=self.portal.name
-                )
-            self._accept_comm(comm, text)
-        except PortalError as exc:
-            ManualPortal.receive_msg(self, comm, reason=exc.args[0])
+                ),
+            )
+            for document in documents
+        ]
+        # download everything before attaching anything, so this may be
+        # retried if the session expires
+        downloads = download_all(
+            lambda document, href: self._download(session, document, href), links
+        )
+        for download in downloads:
+            download.attach(comm, self.portal.name)
+
+    def _download(self, session, document, href):
+        """Download a single document"""
+        url = furl(self.portal.url).add(path=href)
+        with self._get(
+            session, url, "Downloading document: {}".format(document), stream=True
+        ) as reply:
+            return Download(document, reply)
 
     def status_update(self, comm, status):
         """A status update message"""
@@ -467,6 +503,16 @@ class NextRequestPortal(PortalAutoReceiveMixin, ManualPortal):
             "Attempting to get CSRF token",
         )
 
+    def _with_session(self, comm, func):
+        """Call `func` with a session logged in to the request's account"""
+        return session_pool.run(
+            self.portal,
+            comm.foia.get_request_email(),
+            comm.foia.portal_password,
+            login=lambda session: self._login(comm, session),
+            func=func,
+        )
+
     def _login(self, comm, session):
         """Login to the portal"""
         csrf_token = self._get_csrf_token(session, "users/sign_in")
@@ -493,6 +539,15 @@ class NextRequestPortal(PortalAutoReceiveMixin, ManualPortal):
         """Make a request and check the status code"""
         method = getattr(session, type_)
         reply = method(url, **kwargs)
+        if reply.status_code == 401 or (
+            reply.history
+            and str(furl(reply.url).path).endswith("/users/sign_in")
+            and not str(furl(url).path).endswith("/users/sign_in")
+        ):
+            # we were sent to sign in again
+            raise SessionExpired(
+                "Session expired while fetching: {url}\n{msg}".format(url=url, msg=msg)
+            )
         if reply.status_code != expected_status:
             raise PortalError(
                 "Error fetching: {url}\n"
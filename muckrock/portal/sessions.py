@@ -0,0 +1,122 @@
+"""
+Logged in portal sessions, shared between tasks
+
+Logging in to a portal takes several requests, and a burst of replies from
+one portal would otherwise log in once for each task, which can trigger the
+portal's rate limiting.  The cookies for each portal account are kept in the
+cache once logged in and loaded into new sessions, which only log in again
+once the portal reports the session has expired.  The number of tasks using
+a single portal at once is also limited, across all workers.
+"""
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+
+# Standard Library
+import hashlib
+import logging
+import time
+from contextlib import contextmanager
+
+# Third Party
+import requests
+
+# MuckRock
+from muckrock.portal.exceptions import PortalError, SessionExpired
+
+logger = logging.getLogger(__name__)
+
+# how long to wait between checks for a free slot
+SLOT_POLL = 1
+# slots are released when a task finishes, this only guards against a worker
+# dying while holding one
+SLOT_TIMEOUT = 30 * 60
+
+
+class SessionPool:
+    """Logged in sessions for portal accounts, keyed by portal and account"""
+
+    def __init__(self, timeout=None, concurrency=None, wait=None):
+        self.timeout = timeout or settings.PORTAL_SESSION_TIMEOUT
+        self.concurrency = concurrency or settings.PORTAL_CONCURRENCY
+        self.wait = wait if wait is not None else settings.PORTAL_CONCURRENCY_WAIT
+
+    def key(self, portal, account, password):
+        """Cache key for an account's cookies
+
+        The password is included so changing it invalidates the session
+        """
+        digest = hashlib.sha256(f"{account}:{password}".encode()).hexdigest()
+        return f"portal_session:{portal.pk}:{digest}"
+
+    @contextmanager
+    def slot(self, portal):
+        """Wait for one of the portal's limited slots to be free
+
+        If the cache is unavailable the slots are not enforced
+        """
+        deadline = time.monotonic() + self.wait
+        while True:
+            for i in range(self.concurrency):
+                key = f"portal_slot:{portal.pk}:{i}"
+                added = cache.add(key, True, SLOT_TIMEOUT)
+                if added is None:
+                    # the cache errored - run without a slot rather than
+                    # failing every task using the portal
+                    logger.warning("Could not take a portal slot: %s", key)
+                    yield
+                    return
+                if added:
+                    try:
+                        yield
+                    finally:
+                        cache.delete(key)
+                    return
+            if time.monotonic() > deadline:
+                raise PortalError(
+                    "Timed out waiting for other tasks using {}".format(portal.name)
+                )
+            time.sleep(SLOT_POLL)
+
+    def run(self, portal, account, password, *, login, func, create=requests.Session):
+        """Call `func` with a session logged in to the portal account
+
+        `create` makes a new session and `login(session)` logs it in, which is
+        only done if no cookies are cached for the account.  If `func` raises
+        `SessionExpired` with cached cookies, the session logs in again and
+        `func` is retried once, so it should detect an expired session before
+        making any changes on the portal, and make at most one change.
+        """
+        key = self.key(portal, account, password)
+        with self.slot(portal):
+            cookies = cache.get(key)
+            session = self._session(create, login, cookies)
+            try:
+                result = func(session)
+            except SessionExpired:
+                if cookies is None:
+                    raise
+                logger.info("Portal session expired, logging in again: %s", key)
+                cache.delete(key)
+                session = self._session(create, login, None)
+                result = func(session)
+            # cookies may be updated by the portal on any request
+            cache.set(key, session.cookies, self.timeout)
+            return result
+
+    def _session(self, create, login, cookies):
+        """Create a session, either logging in or using the cached cookies"""
+        session = create()
+        if cookies is None:
+            login(session)
+        else:
+            session.cookies.update(cookies)
+        return session
+
+    def clear(self, portal, account, password):
+        """Forget the session for an account"""
+        cache.delete(self.key(portal, account, password))
+
+
+session_pool = SessionPool()
@@ -4,11 +4,14 @@ Tests for the portal application
 """
 
 # Django
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 # Standard Library
+import threading
+import uuid
 from datetime import date
-from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
 
 # Third Party
 import pytest
@@ -17,7 +20,10 @@ import requests_mock
 # MuckRock
 from muckrock.foia.factories import FOIACommunicationFactory
 from muckrock.foia.models.communication import FOIACommunication
+from muckrock.portal.downloads import Download
+from muckrock.portal.exceptions import PortalError, SessionExpired
 from muckrock.portal.models import Portal
+from muckrock.portal.sessions import SessionPool
 from muckrock.task.models import PortalTask
 
 
@@ -159,3 +165,195 @@ class TestFBIPortal(TestCase):
         assert comm.files.all()[1].ffile.read() == b"File 2 Content"
         assert comm.portals.count() == 1
         assert comm.responsetask_set.count() == 1
+
+    @requests_mock.Mocker()
+    def test_document_reply_truncated(self, mock_requests):
+        """A truncated download is not attached"""
+        mock_requests.get("https://www.example.com/file1.pdf", text="File 1 Content")
+        mock_requests.get(
+            "https://www.example.com/file2.pdf",
+            content=b"File 2",
+            headers={"Content-Length": "14"},
+        )
+        comm = FOIACommunicationFactory(
+            subject="eFOIA files available",
+            communication="There are eFOIA files available for you to download\n"
+            "* [file1.pdf](https://www.example.com/file1.pdf)\n"
+            "* [file2.pdf](https://www.example.com/file2.pdf)\n",
+        )
+        self.portal.receive_msg(comm)
+        assert comm.files.count() == 0
+        task = PortalTask.objects.get(communication=comm)
+        assert "truncated" in task.reason
+
+
+class TestDownload(TestCase):
+    """Portal downloads are streamed to temporary files"""
+
+    @patch("muckrock.portal.downloads.SpooledTemporaryFile")
+    def test_error_closes_file(self, mock_file):
+        """The temporary file is closed if the download fails"""
+        reply = Mock(headers={})
+        reply.iter_content.side_effect = ConnectionError
+        with self.assertRaises(ConnectionError):
+            Download("file.pdf", reply)
+        mock_file.return_value.close.assert_called_once_with()
+
+    @patch("muckrock.portal.downloads.SpooledTemporaryFile")
+    def test_truncated_closes_file(self, mock_file):
+        """The temporary file is closed if the download was truncated"""
+        reply = Mock(headers={"Content-Length": "10"})
+        reply.iter_content.return_value = [b"12345"]
+        with self.assertRaises(PortalError):
+            Download("file.pdf", reply)
+        mock_file.return_value.close.assert_called_once_with()
+
+
+class FakeNextRequestHandler(BaseHTTPRequestHandler):
+    """A local stand in for a NextRequest portal's sign in and request pages"""
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Do not log requests"""
+
+    def _send(self, status, body="", headers=None):
+        """Send a response"""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        body = body.encode()
+        self.send_header("Content-Length", len(body))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        """Show the sign in page, or the request page if signed in"""
+        # pylint: disable=invalid-name
+        if self.path == "/users/sign_in":
+            self._send(200, '<meta name="csrf-token" content="token">')
+        elif self.headers.get("Cookie", "").split("=")[-1] in self.server.sessions:
+            self._send(200, "Request page")
+        else:
+            self._send(302, headers={"Location": "/users/sign_in"})
+
+    def do_POST(self):
+        """Sign in"""
+        # pylint: disable=invalid-name
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.logins += 1
+        session = uuid.uuid4().hex
+        self.server.sessions.add(session)
+        self._send(
+            200,
+            '<span class="notice">Signed in successfully.</span>',
+            {"Set-Cookie": f"session={session}; Path=/"},
+        )
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestSessionPool(TestCase):
+    """Portal sessions are shared between tasks"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeNextRequestHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.logins = 0
+        self.server.sessions = set()
+        self.portal = Portal.objects.create(
+            url="http://127.0.0.1:{}".format(self.server.server_port),
+            name="Test Portal",
+            type="nextrequest",
+        )
+        self.pool = SessionPool(wait=0)
+
+    def login(self, session):
+        """Sign in to the fake portal"""
+        session.post(
+            self.portal.url + "/users/sign_in", data={"authenticity_token": "token"}
+        )
+
+    def get_page(self, session):
+        """Fetch the request page, which redirects to sign in if logged out"""
+        reply = session.get(self.portal.url + "/requests/1")
+        if reply.url.endswith("/users/sign_in"):
+            raise SessionExpired
+        return reply.text
+
+    def fetch(self):
+        """Fetch the request page with a shared session"""
+        return self.pool.run(
+            self.portal,
+            "user@example.com",
+            "password",
+            login=self.login,
+            func=self.get_page,
+        )
+
+    def test_shared_login(self):
+        """Only log in once for many tasks"""
+        for _ in range(3):
+            assert self.fetch() == "Request page"
+        assert self.server.logins == 1
+
+    def test_expired(self):
+        """Log in again when the portal expires our session"""
+        self.fetch()
+        self.server.sessions.clear()
+        assert self.fetch() == "Request page"
+        assert self.server.logins == 2
+
+    def test_concurrency(self):
+        """Wait for a slot when too many tasks are using the portal"""
+        pool = SessionPool(concurrency=1, wait=0)
+        with pool.slot(self.portal):
+            with self.assertRaises(PortalError):
+                with pool.slot(self.portal):
+                    pass
+        with pool.slot(self.portal):
+            pass
+
+    def test_slot_cache_unavailable(self):
+        """Do not block tasks when the cache is unavailable"""
+        pool = SessionPool(concurrency=1, wait=0)
+        with patch("muckrock.portal.sessions.cache.add", return_value=None):
+            with pool.slot(self.portal):
+                with pool.slot(self.portal):
+                    pass
+
+    def test_followup_expired(self):
+        """An expired session while sending documents does not resend the note"""
+        nextrequest = self.portal.portal_type
+        calls = []
+
+        def send_documents(comm, session, request_id):
+            """Expire the session the first time documents are sent"""
+            # pylint: disable=unused-argument
+            calls.append("documents")
+            if len(calls) == 2:
+                raise SessionExpired("Session expired")
+
+        with patch.object(
+            nextrequest,
+            "_send_followup",
+            side_effect=lambda comm, session, request_id: calls.append("note"),
+        ), patch.object(
+            nextrequest, "_send_documents", side_effect=send_documents
+        ), patch.object(
+            nextrequest, "_get_request_id", return_value="1"
+        ), patch(
+            "muckrock.portal.portals.nextrequest.session_pool", self.pool
+        ):
+            nextrequest.send_followup_msg_task(self.comm.pk)
+        assert calls == ["note", "documents", "documents"]
+        assert self.server.logins == 2
@@ -18,6 +18,13 @@ class ProjectConfig(AppConfig):
         from actstream import registry as action
         from watson import search
 
+        # MuckRock
+        from muckrock.core import fulltext
+
         Project = self.get_model("Project")
         action.register(Project)
         search.register(Project.objects.get_public())
+        fulltext.register(
+            Project.objects.get_public(),
+            {"title": "A", "summary": "B", "description": "C"},
+        )
@@ -3,6 +3,8 @@ Models for the project application.
 """
 
 # Django
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.cache import cache
 from django.core.cache.utils import make_template_fragment_key
 from django.db import models
@@ -140,6 +142,7 @@ class Project(models.Model):
         default=date.today,
     )
     date_approved = models.DateField(blank=True, null=True)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     def __str__(self):
         return str(self.title)
@@ -204,6 +207,9 @@ class Project(models.Model):
         key = make_template_fragment_key("project_detail_objects", [self.pk])
         cache.delete(key)
 
+    class Meta:
+        indexes = [GinIndex(fields=["search_vector"], name="project_search_idx")]
+
 
 class ProjectCrowdfunds(models.Model):
     """Project to Crowdfund through model"""
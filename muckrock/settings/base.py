@@ -356,6 +356,10 @@ CELERY_BEAT_SCHEDULE = {
         "task": "muckrock.agency.tasks.stale",
         "schedule": crontab(day_of_week="sunday", hour=4, minute=0),
     },
+    "update_stale_request_stats": {
+        "task": "muckrock.agency.tasks.update_stale_request_stats",
+        "schedule": crontab(minute=15),
+    },
     "close_expired": {
         "task": "muckrock.crowdfund.tasks.close_expired",
         "schedule": crontab(hour=0, minute=0),
@@ -388,6 +392,14 @@ CELERY_BEAT_SCHEDULE = {
             "soft_time_limit": 35700,
         },
     },
+    "process_inbound_emails": {
+        "task": "muckrock.mailgun.tasks.process_inbound_emails",
+        "schedule": crontab(minute="*"),  # every minute
+    },
+    "cleanup_inbound_emails": {
+        "task": "muckrock.mailgun.tasks.cleanup_inbound_emails",
+        "schedule": crontab(hour=3, minute=30),
+    },
     "hourly_digest": {
         "task": "muckrock.message.tasks.hourly_digest",
         "schedule": crontab(hour="*/1", minute=0),  # every hour
@@ -569,6 +581,8 @@ MAILGUN_SERVER_NAME = os.environ.get("MAILGUN_SERVER_NAME", "requests.muckrock.c
 MAILGUN_API_URL = os.environ.get(
     "MAILGUN_API_URL", f"https://api.mailgun.net/v3/{MAILGUN_SERVER_NAME}"
 )
+# number of email address rows to keep in process, per process
+EMAIL_ADDRESS_CACHE_SIZE = int(os.environ.get("EMAIL_ADDRESS_CACHE_SIZE", 1000))
 
 
 EMAIL_SUBJECT_PREFIX = "[Muckrock]"
@@ -777,6 +791,10 @@ OPENSEARCH_DESCRIPTION = "Search MuckRock for public documents and news"
 
 # for generating pdfs using FPDF
 FONT_PATH = "/usr/share/fonts/truetype/dejavu/"
+# the most snail mail tasks to include in a single bulk PDF
+SNAIL_MAIL_BULK_LIMIT = int(os.environ.get("SNAIL_MAIL_BULK_LIMIT", 250))
+# number of snail mail PDFs to prepare concurrently for a bulk PDF
+SNAIL_MAIL_BULK_WORKERS = int(os.environ.get("SNAIL_MAIL_BULK_WORKERS", 8))
 
 CHECK_EMAIL = os.environ.get("CHECK_EMAIL", "")
 CHECK_LIMIT = int(os.environ.get("CHECK_LIMIT", 200))
@@ -787,6 +805,10 @@ CONSTANCE_SUPERUSER_ONLY = False
 CONSTANCE_CONFIG = OrderedDict(
     [
         ("GIVEBUTTER_CAMPAIGN_ID", ("g6R32g", "GiveButter Campaign ID")),
+        (
+            "ENABLE_FULLTEXT_SEARCH",
+            (False, "Use Postgres full text search instead of watson"),
+        ),
         ("ENABLE_FOLLOWUP", (True, "Enable automated followups")),
         (
             "ENABLE_WEEKEND_FOLLOWUP",
@@ -879,7 +901,7 @@ CONSTANCE_CONFIG = OrderedDict(
     ]
 )
 CONSTANCE_CONFIG_FIELDSETS = {
-    "General Options": ("GIVEBUTTER_CAMPAIGN_ID",),
+    "General Options": ("GIVEBUTTER_CAMPAIGN_ID", "ENABLE_FULLTEXT_SEARCH"),
     "FOIA Options": (
         "ENABLE_FOLLOWUP",
         "ENABLE_WEEKEND_FOLLOWUP",
@@ -1001,6 +1023,12 @@ SECURE_CROSS_ORIGIN_OPENER_POLICY = os.environ.get(
 GOVQA_DISABLE_TIME_LIMIT = os.environ.get("GOVQA_DISABLE_TIME_LIMIT", 5)
 GOVQA_DISABLE_AMOUNT = os.environ.get("GOVQA_DISABLE_AMOUNT", 3)
 
+# Portal sessions are shared between tasks, and the number of tasks using a
+# single portal at once is limited
+PORTAL_SESSION_TIMEOUT = int(os.environ.get("PORTAL_SESSION_TIMEOUT", 4 * 60 * 60))
+PORTAL_CONCURRENCY = int(os.environ.get("PORTAL_CONCURRENCY", 2))
+PORTAL_CONCURRENCY_WAIT = int(os.environ.get("PORTAL_CONCURRENCY_WAIT", 5 * 60))
+
 # APIv1 Killswitch
 ENABLE_API_V1 = boolcheck(os.environ.get("ENABLE_API_V1", True))
 
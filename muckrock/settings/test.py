@@ -43,6 +43,9 @@ CELERY_TASK_EAGER_PROPAGATES = True
 
 STORAGES["default"]["BACKEND"] = "inmemorystorage.InMemoryStorage"
 
+# rows cached in process would outlive each test's transaction
+EMAIL_ADDRESS_CACHE_SIZE = 0
+
 LOGGING = {}
 
 TEMPLATES[0]["OPTIONS"]["debug"] = True
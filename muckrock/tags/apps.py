@@ -17,5 +17,9 @@ class TagConfig(AppConfig):
         # Third Party
         from watson import search
 
+        # MuckRock
+        from muckrock.core import fulltext
+
         Tag = self.get_model("Tag")
         search.register(Tag)
+        fulltext.register(Tag.objects.all(), {"name": "A"})
@@ -9,6 +9,7 @@ from django.core.files.base import ContentFile
 from django.utils import timezone
 
 # Standard Library
+import hashlib
 import logging
 import os.path
 import subprocess
@@ -27,6 +28,8 @@ from pypdf.errors import PdfReadError
 
 # MuckRock
 from muckrock.communication.models import MailCommunication
+from muckrock.core.storage import PrivateMediaRootS3BotoStorage
+from muckrock.foia.models import FOIAFileAnalysis
 
 # These are the dimensions of a standard sized PDF page
 # in whatever units pypdf are using
@@ -37,6 +40,9 @@ PDF_HEIGHT = 792
 
 logger = logging.getLogger(__name__)
 
+# copies of attachments with their fonts embedded, as they are mailed
+embedded_storage = PrivateMediaRootS3BotoStorage()
+
 
 def walk(obj, fnt, emb):
     """
@@ -135,29 +141,110 @@ ALLOWED_FONTS = [
 ]
 
 
-def needs_embedding(pdf):
+def needs_embedding(fonts):
     """We need to embed fonts if it contains a non-embedded font not in the list"""
-    fonts, _embedded, _unembedded = get_fonts(pdf)
     return any(font.strip("/") not in ALLOWED_FONTS for font in fonts)
 
 
-def handle_embedding(file):
-    """Check if the file needs fonts embedded, and then embed them if it does"""
-    pdf = PdfReader(file.ffile)
-    if needs_embedding(pdf):
-        with TemporaryDirectory() as tmp:
-            input_path = os.path.join(tmp, "input.pdf")
-            with open(input_path, "wb") as input_file:
-                file.ffile.seek(0)
-                input_file.write(file.ffile.read())
-            output_path = os.path.join(tmp, "output.pdf")
-            subprocess.run(
-                "gs -q -dNOPAUSE -dBATCH -dPDFSETTINGS=/prepress -sDEVICE=pdfwrite "
-                f"-sOutputFile={output_path} {input_path}".split(),
-                check=True,
-            )
-            with open(output_path, "rb") as output_file:
-                file.ffile.save(file.name(), ContentFile(output_file.read()))
+def content_hash(file_obj):
+    """Hash the contents of a file, reading it in chunks"""
+    digest = hashlib.sha256()
+    for chunk in file_obj.chunks():
+        digest.update(chunk)
+    file_obj.seek(0)
+    return digest.hexdigest()
+
+
+def is_standard_size(width, height, rotation):
+    """Is a page with these dimensions already a portrait letter page"""
+    if rotation % 180 == 90:
+        width, height = height, width
+    return (width, height) == (PDF_WIDTH, PDF_HEIGHT)
+
+
+def embed_fonts(file, digest):
+    """Embed the fonts in a copy of the file by running it through Ghostscript
+
+    The stored file is left unchanged, and the copy is returned to be mailed.
+    The copy is kept under the hash of the file it was made from, so files
+    with the same contents, such as an attachment copied to each request of a
+    multirequest, are only run through Ghostscript once.
+    """
+    name = f"embedded_pdfs/{digest}.pdf"
+    if embedded_storage.exists(name):
+        with embedded_storage.open(name) as embedded_file:
+            return BytesIO(embedded_file.read())
+    with TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "input.pdf")
+        with open(input_path, "wb") as input_file:
+            for chunk in file.ffile.chunks():
+                input_file.write(chunk)
+        output_path = os.path.join(tmp, "output.pdf")
+        subprocess.run(
+            "gs -q -dNOPAUSE -dBATCH -dPDFSETTINGS=/prepress -sDEVICE=pdfwrite "
+            f"-sOutputFile={output_path} {input_path}".split(),
+            check=True,
+        )
+        with open(output_path, "rb") as output_file:
+            embedded = BytesIO(output_file.read())
+    embedded_storage.save(name, ContentFile(embedded.getvalue()))
+    return embedded
+
+
+def analyze_pdf(pdf):
+    """Collect the fields of a file analysis from a PDF"""
+    fonts, _embedded, _unembedded = get_fonts(pdf)
+    return {
+        "pages": len(pdf.pages),
+        "fonts": sorted(str(font).strip("/") for font in fonts),
+        "needs_embedding": needs_embedding(fonts),
+        "page_sizes": [
+            [
+                float(page.mediabox.width),
+                float(page.mediabox.height),
+                int(page.get("/Rotate", 0)),
+            ]
+            for page in pdf.pages
+        ],
+    }
+
+
+def analyze_file(file):
+    """Analyze a PDF file
+
+    Files with the same contents, such as clones, share the results of the
+    first analysis
+    """
+    digest = content_hash(file.ffile)
+    fields = (
+        FOIAFileAnalysis.objects.filter(content_hash=digest, error="")
+        .exclude(file=file)
+        .values("pages", "fonts", "needs_embedding", "page_sizes")
+        .first()
+    )
+    if fields is None:
+        try:
+            fields = analyze_pdf(PdfReader(file.ffile))
+            fields["error"] = ""
+        except (PdfReadError, ValueError) as exc:
+            fields = {"error": str(exc) or type(exc).__name__}
+    analysis, _ = FOIAFileAnalysis.objects.update_or_create(
+        file=file,
+        defaults={"ffile_name": file.ffile.name, "content_hash": digest, **fields},
+    )
+    file.analysis = analysis
+    return analysis
+
+
+def get_analysis(file):
+    """Get the analysis of a PDF file, analyzing it if it has changed"""
+    try:
+        analysis = file.analysis
+    except FOIAFileAnalysis.DoesNotExist:
+        analysis = None
+    if analysis is not None and analysis.is_current():
+        return analysis
+    return analyze_file(file)
 
 
 class PDF(FPDF):
@@ -270,8 +357,13 @@ class MailPDF(PDF):
                 else:
                     page.scale_to(PDF_WIDTH, PDF_HEIGHT)
 
-    def _handle_file(self, file_, files, merger):
-        """Determine if we can attach the file"""
+    def _handle_file(self, file_, files, merger, resize):
+        """Determine if we can attach the file
+
+        The indices of any attached pages which are not already letter sized
+        are added to `resize`
+        """
+        # pylint: disable=too-many-arguments
         img_exts = ["jpg", "jpeg", "png"]
         total_pages = self.page
 
@@ -281,23 +373,35 @@ class MailPDF(PDF):
                 # too long, skip
                 files.append((file_, "skipped", 1))
             else:
+                resize.append(len(merger.pages))
                 merger.append(mem_file)
                 files.append((file_, "attached", 1))
                 total_pages += 1
         elif file_.get_extension() == "pdf":
-            try:
-                # detect un-embedded fonts
-                handle_embedding(file_)
-                pages = len(PdfReader(file_.ffile).pages)
-                if pages + total_pages > self.page_limit:
-                    # too long, skip
-                    files.append((file_, "skipped", pages))
-                else:
-                    merger.append(file_.ffile)
-                    files.append((file_, "attached", pages))
-                    total_pages += pages
-            except (PdfReadError, ValueError, subprocess.CalledProcessError):
+            # the analysis counts the pages and checks for un-embedded fonts
+            analysis = get_analysis(file_)
+            if analysis.error:
                 files.append((file_, "error", 0))
+            elif analysis.pages + total_pages > self.page_limit:
+                # too long, skip
+                files.append((file_, "skipped", analysis.pages))
+            else:
+                try:
+                    offset = len(merger.pages)
+                    if analysis.needs_embedding:
+                        merger.append(embed_fonts(file_, analysis.content_hash))
+                    else:
+                        merger.append(file_.ffile)
+                except (PdfReadError, ValueError, subprocess.CalledProcessError):
+                    files.append((file_, "error", 0))
+                else:
+                    resize.extend(
+                        offset + i
+                        for i, size in enumerate(analysis.page_sizes)
+                        if not is_standard_size(*size)
+                    )
+                    files.append((file_, "attached", analysis.pages))
+                    total_pages += analysis.pages
         else:
             files.append((file_, "skipped", 0))
 
@@ -334,12 +438,13 @@ class MailPDF(PDF):
         writer = PdfWriter(strict=False)
         writer.append(BytesIO(self.output(dest="S").encode("latin-1")))
         files = []
-        for file_ in self.comm.files.all():
-            total_pages = self._handle_file(file_, files, writer)
+        resize = []
+        for file_ in self.comm.files.select_related("analysis"):
+            total_pages = self._handle_file(file_, files, writer, resize)
 
         single_pdf = BytesIO()
         try:
-            self._resize_pages(writer.pages)
+            self._resize_pages(writer.pages[i] for i in resize)
             writer.write(single_pdf)
         except (PdfReadError, TypeError):
             return (None, None, files, None)
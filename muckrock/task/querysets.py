@@ -93,7 +93,6 @@ class CommunicationTaskMixin(PreloadFileQuerysetMixin):
     """Mixin for preloading tasks with a communication"""
 
     files_path = "communication__files"
-    comm_id = "communication_id"
 
     def preload_communication(self):
         """Preload models on the communication"""
@@ -113,6 +112,10 @@ class CommunicationTaskMixin(PreloadFileQuerysetMixin):
         queryset = super().preload_files(limit=limit)
         return queryset.select_related("communication")
 
+    def _get_communication(self, obj):
+        """Get the communication for each record"""
+        return obj.communication
+
     def _process_preloaded_files(self, obj, files):
         """What to do with the preloaded files for each record"""
         obj.communication.display_files = files.get(obj.communication.pk, [])
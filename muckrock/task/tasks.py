@@ -6,19 +6,22 @@ Celery tasks for the task application
 from celery import shared_task
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import connection
 from django.utils import timezone
 
 # Standard Library
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from io import BytesIO
 from random import randint
+from tempfile import TemporaryFile
 
 # Third Party
 import boto3
 from fpdf import FPDF
-from pypdf import PdfReader, PdfWriter
+from pypdf import PdfWriter
 from requests.exceptions import RequestException
 from zenpy.lib.exception import APIException, ZenpyException
 
@@ -67,37 +70,49 @@ def submit_review_update(foia_pks, reply_text, **kwargs):
     time_limit=900,
     name="muckrock.task.tasks.snail_mail_bulk_pdf_task",
 )
-def snail_mail_bulk_pdf_task(pdf_name, get, **kwargs):
-    """Save a PDF file for all open snail mail tasks"""
+def snail_mail_bulk_pdf_task(pdf_name, get, workers=None, **kwargs):
+    """Save a PDF file for all open snail mail tasks
+
+    The PDFs for each task are prepared concurrently, as fetching the
+    attachments from storage and embedding their fonts are both waiting on
+    I/O or Ghostscript.  They are merged in order as they finish, and the bulk
+    PDF is written to a temporary file and uploaded in parts.
+    """
     # pylint: disable=too-many-locals
+    if workers is None:
+        workers = settings.SNAIL_MAIL_BULK_WORKERS
     cover_info = []
     bulk_merger = PdfWriter(strict=False)
 
-    snails = SnailMailTaskFilterSet(
-        get,
-        queryset=SnailMailTask.objects.filter(resolved=False)
-        .order_by("-amount", "communication__foia__agency")
-        .preload_pdf(),
-    ).qs[:100]
+    snails = list(
+        SnailMailTaskFilterSet(
+            get,
+            queryset=SnailMailTask.objects.filter(resolved=False)
+            .order_by("-amount", "communication__foia__agency")
+            .preload_pdf(),
+        ).qs[: settings.SNAIL_MAIL_BULK_LIMIT]
+    )
 
     blank_pdf = FPDF()
     blank_pdf.add_page()
     blank = BytesIO(blank_pdf.output(dest="S").encode("latin-1"))
-    for snail in snails.iterator():
-        # generate the pdf and merge all pdf attachments
-        pdf = SnailMailPDF(
-            snail.communication, snail.category, snail.switch, snail.amount
-        )
-        prepared_pdf, page_count, files, _mail = pdf.prepare()
-        cover_info.append((snail, page_count, files))
-
-        if prepared_pdf is not None:
-            # append to the bulk pdf
-            bulk_merger.append(prepared_pdf)
-            # ensure we align for double sided printing
-            if PdfReader(prepared_pdf).get_num_pages() % 2 == 1:
-                blank.seek(0)
-                bulk_merger.append(blank)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        if workers > 1:
+            prepared = executor.map(_prepare_snail_mail_pdf_thread, snails)
+        else:
+            # run in the calling thread, using its database connection
+            prepared = map(_prepare_snail_mail_pdf, snails)
+        for snail, (prepared_pdf, page_count, files, _mail) in zip(snails, prepared):
+            cover_info.append((snail, page_count, files))
+
+            if prepared_pdf is not None:
+                # append to the bulk pdf
+                pages = len(bulk_merger.pages)
+                bulk_merger.append(prepared_pdf)
+                # ensure we align for double sided printing
+                if (len(bulk_merger.pages) - pages) % 2 == 1:
+                    blank.seek(0)
+                    bulk_merger.append(blank)
 
     # preprend the cover sheet
     cover_pdf = CoverPDF(cover_info)
@@ -106,17 +121,32 @@ def snail_mail_bulk_pdf_task(pdf_name, get, **kwargs):
         cover_pdf.add_page()
     bulk_merger.merge(0, BytesIO(cover_pdf.output(dest="S").encode("latin-1")))
 
-    bulk_pdf = BytesIO()
-    bulk_merger.write(bulk_pdf)
-    bulk_pdf.seek(0)
+    with TemporaryFile() as bulk_pdf:
+        bulk_merger.write(bulk_pdf)
+        bulk_pdf.seek(0)
+        s3 = boto3.client("s3")
+        s3.upload_fileobj(
+            bulk_pdf,
+            settings.AWS_MEDIA_BUCKET_NAME,
+            pdf_name,
+            ExtraArgs={"ACL": settings.AWS_DEFAULT_ACL},
+        )
 
-    s3 = boto3.client("s3")
-    s3.upload_fileobj(
-        bulk_pdf,
-        settings.AWS_MEDIA_BUCKET_NAME,
-        pdf_name,
-        ExtraArgs={"ACL": settings.AWS_DEFAULT_ACL},
-    )
+
+def _prepare_snail_mail_pdf(snail):
+    """Generate the PDF for a snail mail task and merge its attachments"""
+    return SnailMailPDF(
+        snail.communication, snail.category, snail.switch, snail.amount
+    ).prepare()
+
+
+def _prepare_snail_mail_pdf_thread(snail):
+    """Prepare a snail mail PDF on a worker thread"""
+    try:
+        return _prepare_snail_mail_pdf(snail)
+    finally:
+        # each thread opens its own database connection
+        connection.close()
 
 
 @shared_task(
@@ -3,13 +3,27 @@ Tests for PDF generation
 """
 
 # Django
-from django.test import TestCase
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+# Standard Library
+from io import BytesIO
+from unittest.mock import patch
+
+# Third Party
+import boto3
+from fpdf import FPDF
+from moto import mock_aws
+from pypdf import PdfReader
 
 # MuckRock
 from muckrock.communication.models import MailCommunication
-from muckrock.foia.factories import FOIACommunicationFactory
+from muckrock.foia.factories import FOIACommunicationFactory, FOIAFileFactory
+from muckrock.foia.models import FOIAFile
 from muckrock.task.factories import SnailMailTaskFactory
-from muckrock.task.pdf import LobPDF, SnailMailPDF
+from muckrock.task.pdf import LobPDF, SnailMailPDF, embed_fonts, get_analysis
+from muckrock.task.tasks import snail_mail_bulk_pdf_task
 
 
 class PDFTests(TestCase):
@@ -36,3 +50,135 @@ class PDFTests(TestCase):
         assert page_count == 1
         assert files == []
         assert isinstance(mail, MailCommunication)
+
+    def test_file_analysis(self):
+        """PDF attachments are analyzed once and the analysis is reused"""
+        letter = FPDF("P", "pt", "Letter")
+        letter.add_page()
+        letter.set_font("Times", "", 12)
+        letter.cell(0, 10, "Enclosed are the records")
+        foia_file = FOIAFileFactory(
+            ffile__data=letter.output(dest="S").encode("latin-1"),
+            ffile__filename="records.pdf",
+        )
+        analysis = get_analysis(foia_file)
+        assert not analysis.error
+        assert analysis.pages == 1
+        assert analysis.page_sizes == [[612.0, 792.0, 0]]
+        assert "Times-Roman" in analysis.fonts
+        assert not analysis.needs_embedding
+
+        foia_file = FOIAFile.objects.select_related("analysis").get(pk=foia_file.pk)
+        with self.assertNumQueries(0):
+            assert get_analysis(foia_file) == analysis
+
+        pdf = SnailMailPDF(foia_file.comm, "n", False, 0)
+        _prepared_pdf, page_count, files, _mail = pdf.prepare()
+        assert page_count == 2
+        assert files == [(foia_file, "attached", 1)]
+
+    def test_file_embedding(self):
+        """Fonts are embedded in the mailed copy, leaving the stored file alone"""
+        letter = FPDF("P", "pt", "Letter")
+        letter.add_page()
+        letter.set_font("Times", "", 12)
+        letter.cell(0, 10, "Enclosed are the records")
+        data = letter.output(dest="S").encode("latin-1")
+        foia_file = FOIAFileFactory(ffile__data=data, ffile__filename="records.pdf")
+        name = foia_file.ffile.name
+
+        with patch("muckrock.task.pdf.needs_embedding", return_value=True), patch(
+            "muckrock.task.pdf.embed_fonts", return_value=BytesIO(data)
+        ) as mock_embed:
+            assert get_analysis(foia_file).needs_embedding
+            mock_embed.assert_not_called()
+            pdf = SnailMailPDF(foia_file.comm, "n", False, 0)
+            _prepared_pdf, _page_count, files, _mail = pdf.prepare()
+        mock_embed.assert_called_once_with(foia_file, foia_file.analysis.content_hash)
+        assert files == [(foia_file, "attached", 1)]
+
+        foia_file = FOIAFile.objects.get(pk=foia_file.pk)
+        assert foia_file.ffile.name == name
+        assert foia_file.ffile.read() == data
+
+    @mock_aws
+    def test_embed_fonts_shared(self):
+        """Files with the same contents share one embedded copy"""
+        s3 = boto3.client("s3")
+        s3.create_bucket(Bucket=settings.AWS_MEDIA_BUCKET_NAME)
+        data = b"%PDF-1.4 original"
+        embedded = b"%PDF-1.4 embedded"
+
+        def run_ghostscript(args, **kwargs):
+            """Write the embedded output"""
+            # pylint: disable=unused-argument
+            output = args[-2][len("-sOutputFile=") :]
+            with open(output, "wb") as output_file:
+                output_file.write(embedded)
+
+        files = FOIAFileFactory.create_batch(
+            2, ffile__data=data, ffile__filename="records.pdf"
+        )
+        with patch(
+            "muckrock.task.pdf.subprocess.run", side_effect=run_ghostscript
+        ) as mock_run:
+            for foia_file in files:
+                assert embed_fonts(foia_file, "digest").read() == embedded
+        mock_run.assert_called_once()
+        for foia_file in files:
+            foia_file.ffile.open()
+            assert foia_file.ffile.read() == data
+
+    def test_file_analysis_error(self):
+        """Unreadable PDF attachments are recorded as errors"""
+        foia_file = FOIAFileFactory(
+            ffile__data=b"not a pdf", ffile__filename="records.pdf"
+        )
+        pdf = SnailMailPDF(foia_file.comm, "n", False, 0)
+        _prepared_pdf, page_count, files, _mail = pdf.prepare()
+        assert page_count == 1
+        assert files == [(foia_file, "error", 0)]
+        assert foia_file.analysis.error
+
+    @mock_aws
+    def test_snail_mail_bulk_pdf(self):
+        """Generate and upload a bulk PDF of snail mail tasks"""
+        s3 = boto3.client("s3")
+        s3.create_bucket(Bucket=settings.AWS_MEDIA_BUCKET_NAME)
+        SnailMailTaskFactory.create_batch(3)
+        snail_mail_bulk_pdf_task("snail_mail_pdfs/bulk.pdf", {}, workers=1)
+        bulk_pdf = BytesIO(
+            s3.get_object(
+                Bucket=settings.AWS_MEDIA_BUCKET_NAME, Key="snail_mail_pdfs/bulk.pdf"
+            )["Body"].read()
+        )
+        # an even length cover sheet, and each letter padded to two pages
+        pages = len(PdfReader(bulk_pdf).pages)
+        assert pages % 2 == 0
+        assert pages >= 2 + 3 * 2
+
+
+class BulkPDFThreadTests(TransactionTestCase):
+    """Test preparing the bulk PDF on worker threads
+
+    The worker threads use their own database connections, so the test data
+    must be committed for them to see it
+    """
+
+    @mock_aws
+    def test_snail_mail_bulk_pdf_workers(self):
+        """Each worker thread closes its database connection"""
+        s3 = boto3.client("s3")
+        s3.create_bucket(Bucket=settings.AWS_MEDIA_BUCKET_NAME)
+        SnailMailTaskFactory.create_batch(3)
+        with patch("muckrock.task.tasks.connection", wraps=connection) as mock_conn:
+            snail_mail_bulk_pdf_task("snail_mail_pdfs/bulk.pdf", {}, workers=2)
+        assert mock_conn.close.call_count == 3
+        bulk_pdf = BytesIO(
+            s3.get_object(
+                Bucket=settings.AWS_MEDIA_BUCKET_NAME, Key="snail_mail_pdfs/bulk.pdf"
+            )["Body"].read()
+        )
+        pages = len(PdfReader(bulk_pdf).pages)
+        assert pages % 2 == 0
+        assert pages >= 2 + 3 * 2